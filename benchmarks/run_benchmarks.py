@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner
+Times each pipeline stage on synthetic schedules and checks for regressions
+
+Usage (from the repository root):
+    python3 -m benchmarks.run_benchmarks --output bench.json
+    python3 -m benchmarks.run_benchmarks --sizes 1000000x120 --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src import (
+    __version__,
+    load_schedule_data,
+    get_event_dates,
+    get_calendar_months,
+    group_events_by_month,
+    generate_calendars,
+    generate_month_table,
+    write_latex_document,
+    compile_pdf_async,
+    WarmPool,
+    config,
+)
+from src.event_processor import resolve_event
+from src.latex_header import PDF_MODES
+from src.records import Event, format_event_date, load_subjects
+from .synthetic import write_synthetic_schedule
+
+DEFAULT_SIZES = '10x1,1000x12,10000x24,100000x60'
+FULL_SIZES = DEFAULT_SIZES + ',1000000x120'
+THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'thresholds.json')
+
+
+def parse_sizes(spec: str) -> List[Tuple[int, int]]:
+    """
+    Parse a size list such as '10x1,1000x12' into (events, months) pairs.
+
+    Args:
+        spec: Comma-separated EVENTSxMONTHS entries
+
+    Returns:
+        List of (num_events, num_months) tuples
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    sizes = []
+    for entry in spec.split(','):
+        try:
+            events, months = entry.lower().split('x')
+            sizes.append((int(events), int(months)))
+        except ValueError:
+            raise ValueError(f"Invalid size '{entry}' (use EVENTSxMONTHS, e.g. 1000x12)")
+    return sizes
+
+
+def measure(func: Callable[[], Any], track_memory: bool = True) -> Tuple[Dict[str, float], Any]:
+    """
+    Time a stage and, optionally, measure its peak Python memory.
+
+    Timing and memory are taken in separate runs because tracemalloc slows
+    down allocation-heavy code considerably.
+
+    Args:
+        func: Stage to run
+        track_memory: Also run the stage under tracemalloc
+
+    Returns:
+        Tuple of ({'seconds', 'peak_bytes'}, return value of the timed run)
+    """
+    gc.collect()
+    started = time.perf_counter()
+    result = func()
+    stats = {'seconds': time.perf_counter() - started}
+
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return stats, result
+
+
+def retained_bytes(func: Callable[[], Any]) -> int:
+    """
+    Measure the Python memory still held by the result of func.
+
+    Args:
+        func: Builds the data structure to measure
+
+    Returns:
+        Bytes allocated by func that are alive when it returns
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return held
+
+
+def _dict_events(events: List[Dict[str, Any]], subjects: Dict[str, Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Table events in the per-event dictionary shape used before Event records."""
+    table_events = []
+    for event in events:
+        date_str = event.get('date', '')
+        if event.get('section') == 'Exam Period' or not date_str or date_str == 'TBA':
+            continue
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+        subject_info = subjects.get(event['subject'], {})
+        table_events.append({
+            'date': date_obj,
+            'time': event.get('time', ''),
+            'type': event['type'],
+            'subject_name': subject_info.get('name', event['subject']),
+            'subject_code': subject_info.get('code', ''),
+            'room': event.get('room') or subject_info.get('default_room', ''),
+            'date_str': date_obj.strftime('%d %b (%a)')
+        })
+    return table_events
+
+
+def _record_events(events: List[Dict[str, Any]], subjects: Dict[str, Dict[str, str]]) -> List[Event]:
+    """Table events as Event records, built the way ScheduleIndex builds them."""
+    subject_records = load_subjects(subjects)
+    table_events = []
+    for event in events:
+        date_str = event.get('date', '')
+        if event.get('section') == 'Exam Period' or not date_str or date_str == 'TBA':
+            continue
+        table_events.append(resolve_event(event, datetime.strptime(date_str, '%Y-%m-%d'), subject_records))
+    return table_events
+
+
+def compare_event_memory(events: List[Dict[str, Any]], subjects: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Compare the memory held by table events as dictionaries and as Event records.
+
+    Args:
+        events: Raw events from the JSON data
+        subjects: Dictionary of subject information
+
+    Returns:
+        Dictionary with 'dict_bytes', 'record_bytes' and their 'ratio'
+    """
+    format_event_date.cache_clear()
+    dict_bytes = retained_bytes(lambda: _dict_events(events, subjects))
+    record_bytes = retained_bytes(lambda: _record_events(events, subjects))
+    return {
+        'dict_bytes': dict_bytes,
+        'record_bytes': record_bytes,
+        'ratio': record_bytes / dict_bytes if dict_bytes else 0.0,
+    }
+
+
+def viewer_load_seconds(pdf_file: str) -> Optional[float]:
+    """
+    Time a viewer needs to open a PDF and render its first page.
+
+    Poppler's pdftoppm stands in for the viewer: like a viewer it parses the
+    cross-reference data and the form before drawing the page.
+
+    Args:
+        pdf_file: Path to the PDF
+
+    Returns:
+        Seconds, or None if pdftoppm is not installed or fails
+    """
+    if shutil.which('pdftoppm') is None:
+        return None
+    started = time.perf_counter()
+    completed = subprocess.run(['pdftoppm', '-f', '1', '-l', '1', '-r', '72', '-png', pdf_file,
+                                os.path.splitext(pdf_file)[0] + '-page'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    if completed.returncode != 0:
+        return None
+    return time.perf_counter() - started
+
+
+def compare_pdf_modes(data: Dict[str, Any], work_dir: str, name: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Compile the same schedule in every PDF mode and measure the output.
+
+    Args:
+        data: Loaded schedule data with the events as a list
+        work_dir: Directory for the generated files
+        name: Base name of the generated files
+
+    Returns:
+        Per mode: PDF size in bytes, compile seconds and viewer load seconds
+    """
+    modes: Dict[str, Dict[str, Any]] = {}
+    for pdf_mode in PDF_MODES:
+        tex_file = os.path.join(work_dir, f"{name}-{pdf_mode}.tex")
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            _quiet(lambda: write_latex_document(data, f, pdf_mode=pdf_mode))
+        compiled = asyncio.run(compile_pdf_async(tex_file))
+        modes[pdf_mode] = {
+            'success': compiled.success,
+            'compile_seconds': compiled.duration,
+            'pdf_bytes': os.path.getsize(compiled.pdf_file) if compiled.success else None,
+            'load_seconds': viewer_load_seconds(compiled.pdf_file) if compiled.success else None,
+        }
+    return modes
+
+
+def _consume(lines: Any) -> int:
+    return sum(1 for _ in lines)
+
+
+def benchmark_size(num_events: int, num_months: int, work_dir: str, compile_pdf: bool = False,
+                   track_memory: bool = True, seed: int = 0) -> Dict[str, Any]:
+    """
+    Run every stage once on a synthetic schedule of the given size.
+
+    Args:
+        num_events: Number of events in the synthetic schedule
+        num_months: Length of the schedule period in months
+        work_dir: Directory for the generated files
+        compile_pdf: Also time pdflatex on the generated document
+        track_memory: Measure peak memory of each stage
+        seed: Random seed for the synthetic data
+
+    Returns:
+        Dictionary with the size and per-stage statistics
+    """
+    name = f"{num_events}x{num_months}"
+    json_file = write_synthetic_schedule(os.path.join(work_dir, f"{name}.json"), num_events, num_months, seed)
+    tex_file = os.path.join(work_dir, f"{name}.tex")
+    stages: Dict[str, Dict[str, float]] = {}
+
+    stages['load_schedule_data'], data = measure(lambda: load_schedule_data(json_file), track_memory)
+    schedule_info, subjects, events = data['schedule_info'], data['subjects'], data['events']
+
+    stages['group_events_by_month'], grouped = measure(lambda: group_events_by_month(events, subjects), track_memory)
+    events_by_month, _ = grouped
+
+    months = get_calendar_months(schedule_info['start_date'], schedule_info['end_date'])
+    event_dates = get_event_dates(events)
+    stages['generate_calendars'], _ = measure(lambda: _consume(generate_calendars(months, event_dates)), track_memory)
+
+    def month_tables() -> int:
+        lines = 0
+        for idx, month in enumerate(months):
+            month_events = events_by_month.get((month['year'], month['month']))
+            if month_events:
+                lines += _consume(generate_month_table(month['name'], month['year'], month_events, subjects, idx == 0))
+        return lines
+
+    stages['generate_month_table'], _ = measure(month_tables, track_memory)
+
+    def write_document() -> int:
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            return write_latex_document(data, f)
+
+    stages['write'], lines_written = measure(lambda: _quiet(write_document), track_memory)
+    if num_events >= config.PARALLEL_FRAGMENTS_MIN_EVENTS:
+        # 'write' rendered the fragments in a process pool; time the single-process path as well
+        stages['write_serial'], _ = measure(lambda: _quiet(lambda: _serial_fragments(write_document)), track_memory)
+
+    result: Dict[str, Any] = {
+        'events': num_events,
+        'months': num_months,
+        'lines': lines_written,
+        'tex_bytes': os.path.getsize(tex_file),
+        'stages': stages,
+    }
+
+    if track_memory:
+        result['event_memory'] = compare_event_memory(events, subjects)
+
+    if compile_pdf:
+        compiled = asyncio.run(compile_pdf_async(tex_file))
+        stages['compile_pdf'] = {'seconds': compiled.duration}
+        result['compile_success'] = compiled.success
+        
+        # Same document on a worker that loaded the preamble before the clock started
+        with WarmPool(1) as pool:
+            pool.wait_ready()
+            compiled = asyncio.run(compile_pdf_async(tex_file, pool=pool))
+        stages['compile_pdf_warm'] = {'seconds': compiled.duration}
+        result['compile_success'] = result['compile_success'] and compiled.success
+        result['pdf_modes'] = compare_pdf_modes(data, work_dir, name)
+    return result
+
+
+def _serial_fragments(func: Callable[[], Any]) -> Any:
+    threshold = config.PARALLEL_FRAGMENTS_MIN_EVENTS
+    config.PARALLEL_FRAGMENTS_MIN_EVENTS = sys.maxsize
+    try:
+        return func()
+    finally:
+        config.PARALLEL_FRAGMENTS_MIN_EVENTS = threshold
+
+
+def _quiet(func: Callable[[], Any]) -> Any:
+    """Run func with stdout discarded, so progress prints don't skew timings."""
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            return func()
+        finally:
+            sys.stdout = stdout
+
+
+def check_regressions(results: Dict[str, Any], baseline: Dict[str, Any], thresholds: Dict[str, Any]) -> List[str]:
+    """
+    Compare results against a baseline run.
+
+    A stage regresses when its time or peak memory grows by more than the
+    configured ratio. Stages faster than 'min_seconds' in the baseline are
+    not compared, since their timings are mostly noise.
+
+    Args:
+        results: Output of this run
+        baseline: Output of an earlier run
+        thresholds: Threshold configuration (see thresholds.json)
+
+    Returns:
+        List of human-readable regression messages (empty if none)
+    """
+    default = thresholds.get('default', {})
+    per_stage = thresholds.get('stages', {})
+    min_seconds = thresholds.get('min_seconds', 0.0)
+    baseline_runs = {(run['events'], run['months']): run for run in baseline.get('results', [])}
+
+    regressions = []
+    for run in results['results']:
+        base_run = baseline_runs.get((run['events'], run['months']))
+        if base_run is None:
+            continue
+        for stage, stats in run['stages'].items():
+            base_stats = base_run['stages'].get(stage)
+            if base_stats is None:
+                continue
+            limits = dict(default, **per_stage.get(stage, {}))
+            label = f"{run['events']}x{run['months']} {stage}"
+
+            time_ratio = limits.get('time_ratio')
+            if time_ratio and base_stats['seconds'] >= min_seconds:
+                ratio = stats['seconds'] / base_stats['seconds']
+                if ratio > time_ratio:
+                    regressions.append(f"{label}: time {base_stats['seconds']:.4f}s -> {stats['seconds']:.4f}s "
+                                       f"(x{ratio:.2f} > x{time_ratio})")
+
+            memory_ratio = limits.get('memory_ratio')
+            if memory_ratio and base_stats.get('peak_bytes') and 'peak_bytes' in stats:
+                ratio = stats['peak_bytes'] / base_stats['peak_bytes']
+                if ratio > memory_ratio:
+                    regressions.append(f"{label}: peak memory {base_stats['peak_bytes']} -> {stats['peak_bytes']} bytes "
+                                       f"(x{ratio:.2f} > x{memory_ratio})")
+    return regressions
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """
+    Print a table of stage timings and peak memory.
+
+    Args:
+        results: Output of run_benchmarks
+    """
+    for run in results['results']:
+        print(f"\n{run['events']} events over {run['months']} months ({run['lines']} lines, {run['tex_bytes']} bytes)")
+        for stage, stats in run['stages'].items():
+            memory = f"{stats['peak_bytes'] / 1024 / 1024:9.2f} MiB" if 'peak_bytes' in stats else ''
+            print(f"  {stage:<24} {stats['seconds']:10.4f}s {memory}".rstrip())
+        if 'event_memory' in run:
+            memory = run['event_memory']
+            print(f"  {'event records':<24} {memory['record_bytes'] / 1024 / 1024:.2f} MiB vs "
+                  f"{memory['dict_bytes'] / 1024 / 1024:.2f} MiB as dicts (x{memory['ratio']:.2f})")
+        for pdf_mode, stats in run.get('pdf_modes', {}).items():
+            if not stats['success']:
+                print(f"  {'pdf ' + pdf_mode:<24} compilation failed")
+                continue
+            load = 'n/a (needs pdftoppm)' if stats['load_seconds'] is None else f"{stats['load_seconds']:.4f}s"
+            print(f"  {'pdf ' + pdf_mode:<24} {stats['pdf_bytes'] / 1024:10.1f} KiB, "
+                  f"compile {stats['compile_seconds']:.4f}s, load {load}")
+
+
+def run_benchmarks(sizes: List[Tuple[int, int]], compile_pdf: bool = False, track_memory: bool = True,
+                   seed: int = 0) -> Dict[str, Any]:
+    """
+    Benchmark every requested size.
+
+    Args:
+        sizes: List of (num_events, num_months) pairs
+        compile_pdf: Also time pdflatex
+        track_memory: Measure peak memory of each stage
+        seed: Random seed for the synthetic data
+
+    Returns:
+        JSON-serializable results
+    """
+    with tempfile.TemporaryDirectory(prefix='schedule-bench-') as work_dir:
+        runs = [benchmark_size(num_events, num_months, work_dir, compile_pdf, track_memory, seed)
+                for num_events, num_months in sizes]
+    return {
+        'generator_version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': runs,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the schedule generator pipeline stage by stage.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help="comma-separated EVENTSxMONTHS list (default: %(default)s)")
+    parser.add_argument('--full', action='store_true', help=f"use the full size list ({FULL_SIZES})")
+    parser.add_argument('--compile', action='store_true', help="also time pdflatex")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc peak-memory runs")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for synthetic data")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="fail if a stage regresses against this results file")
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE,
+                        help="regression threshold configuration (default: benchmarks/thresholds.json)")
+    args = parser.parse_args(argv)
+
+    sizes = parse_sizes(FULL_SIZES if args.full else args.sizes)
+    results = run_benchmarks(sizes, args.compile, not args.no_memory, args.seed)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.thresholds, 'r', encoding='utf-8') as f:
+            thresholds = json.load(f)
+        regressions = check_regressions(results, baseline, thresholds)
+        if regressions:
+            print("\nRegressions detected:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Synthetic Schedules
+Generates schedule JSON data shaped like schedule_data.json for benchmarking
+"""
+
+import json
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+EVENT_TYPES = [
+    'Midterm', 'Retake Midterm', 'Homework Submission', 'Laboratory',
+    'Short Test', 'Project Work', 'Quiz & Review', 'Presentation',
+]
+TIMES = ['', '8:00', '8:15', '10:15', '12:00', '12:15', '14:00', '16:15', '18:00', '23:59']
+ROOMS = ['404', 'R4K', 'E1C', 'Lab 1', 'QBF10', 'IB025']
+
+
+def _add_months(start: date, months: int) -> date:
+    month_index = start.month - 1 + months
+    return date(start.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def generate_synthetic_schedule(num_events: int, num_months: int, seed: int = 0,
+                                start: date = date(2025, 1, 1)) -> Dict[str, Any]:
+    """
+    Generate a random schedule with the same structure as schedule_data.json.
+
+    About 1% of events are TBA and 2% belong to the exam period, so every
+    code path of the generators is exercised.
+
+    Args:
+        num_events: Number of events to generate
+        num_months: Length of the schedule period in months
+        seed: Random seed, so runs are reproducible
+        start: First day of the schedule period
+
+    Returns:
+        Dictionary with schedule_info, subjects and events
+    """
+    rng = random.Random(seed)
+    end = _add_months(start, num_months) - timedelta(days=1)
+    span_days = (end - start).days + 1
+
+    num_subjects = max(5, min(200, num_events // 50))
+    subjects = {
+        f"subject_{i}": {
+            'name': f"Subject {i}",
+            'code': f"BMEVI{i:06d}",
+            'default_room': rng.choice(ROOMS + [''] * 4),
+        }
+        for i in range(num_subjects)
+    }
+    subject_keys = list(subjects)
+
+    events: List[Dict[str, Any]] = []
+    for _ in range(num_events):
+        roll = rng.random()
+        event: Dict[str, Any] = {
+            'date': 'TBA' if roll < 0.01 else (start + timedelta(days=rng.randrange(span_days))).isoformat(),
+            'time': rng.choice(TIMES),
+            'subject': rng.choice(subject_keys),
+            'type': f"{rng.choice(EVENT_TYPES)} {rng.randint(1, 6)}",
+            'room': rng.choice([None, None, None] + ROOMS),
+        }
+        if roll > 0.98:
+            event['section'] = 'Exam Period'
+        events.append(event)
+
+    return {
+        'schedule_info': {
+            'title': 'Synthetic Schedule',
+            'period': f"{start.isoformat()} -- {end.isoformat()}",
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+        },
+        'subjects': subjects,
+        'events': events,
+    }
+
+
+def write_synthetic_schedule(path: str, num_events: int, num_months: int, seed: int = 0) -> str:
+    """
+    Generate a synthetic schedule and write it as JSON.
+
+    Args:
+        path: Output file path
+        num_events: Number of events to generate
+        num_months: Length of the schedule period in months
+        seed: Random seed
+
+    Returns:
+        The output path
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(generate_synthetic_schedule(num_events, num_months, seed), f)
+    return path
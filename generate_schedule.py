@@ -8,114 +8,252 @@ This is the refactored version with separated modules for better organization.
 
 import sys
 import os
+import argparse
+import atexit
+import time
 from typing import Optional
 
 from src import (
-    load_schedule_data,
-    get_event_dates,
-    get_calendar_months,
-    group_events_by_month,
-    generate_latex_header,
-    generate_calendars,
-    generate_month_table,
-    generate_exam_period_table,
+    __version__,
+    generate_latex_from_json,
     compile_pdf,
+    BuildCache,
+    run_batch,
+    run_cohort,
+    print_batch_summary,
+    watch_schedule,
+    generate_draft_pdf_from_json,
+    compile_pdf_split,
+    serve,
+    find_clashes,
+    load_schedule_stream,
+    parse_date_window,
+    DateWindow,
+    start_tracing,
+    stop_tracing,
+    config,
 )
+from src.tracing import span
+from src.build_cache import document_variant
+from src.pdf_draft import draft_pdf_path
+from src.clash_detection import print_clash_report
+from src.latex_header import PDF_MODES
+from src.date_window import filter_events
+from src.compile_progress import terminal_progress
 
 
-def generate_latex_from_json(json_file: str = 'schedule_data.json', output_file: str = 'Academic Schedule.tex') -> str:
+def build_schedule(json_file: str, output_file: str, cache: Optional[BuildCache] = None,
+                   use_format: bool = config.USE_PREAMBLE_FORMAT, backend: str = config.EVENT_BACKEND,
+                   renderer: str = config.RENDERER, split: bool = False,
+                   compile_jobs: Optional[int] = None, externalize: bool = config.EXTERNALIZE_CALENDARS,
+                   mark_clashes: bool = False, pdf_mode: str = config.PDF_MODE,
+                   window: Optional[DateWindow] = None) -> bool:
     """
-    Main function to generate LaTeX from JSON.
+    Generate and compile a schedule, reusing cached output when possible.
+    
+    The draft renderer writes the PDF next to output_file directly and
+    bypasses both pdflatex and the build cache.
     
     Args:
         json_file: Path to input JSON file with schedule data
         output_file: Path to output .tex file
+        cache: Optional build cache; a hit skips generation and compilation. Without
+               it the parsed-schedule cache is not used either
+        use_format: Compile from the precompiled preamble format
+        backend: Event grouping backend ('dict' or 'columnar')
+        renderer: 'latex' or 'draft'
+        split: Compile the document as parallel sub-documents and merge the PDFs
+        compile_jobs: Maximum concurrent pdflatex processes when splitting
+        externalize: Include the calendars as cached per-month PDF graphics
+        mark_clashes: Report room and subject clashes and highlight the clashing rows
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+        window: Only render the events and calendar months inside this date range
         
     Returns:
-        Path to the generated .tex file
-        
-    Raises:
-        FileNotFoundError: If JSON file doesn't exist
-        ValueError: If JSON data is invalid or missing required fields
+        True if the PDF is available, False otherwise
     """
-    print(f"Reading {json_file}...")
-    data = load_schedule_data(json_file)
-    
-    schedule_info = data['schedule_info']
-    subjects = data['subjects']
-    events = data['events']
-    
-    print(f"Loaded {len(events)} events and {len(subjects)} subjects")
+    if renderer == 'draft':
+        generate_draft_pdf_from_json(json_file, draft_pdf_path(output_file), backend, cache is not None, window)
+        return True
     
-    # Get event dates and months
-    event_dates = get_event_dates(events)
-    months = get_calendar_months(schedule_info['start_date'], schedule_info['end_date'])
+    if cache is None:
+        if split:
+            return compile_pdf_split(json_file, output_file, jobs=compile_jobs, use_format=use_format, backend=backend,
+                                     externalize=externalize, mark=mark_clashes, parsed_cache=False, pdf_mode=pdf_mode,
+                                     window=window)
+        generate_latex_from_json(json_file, output_file, backend=backend, externalize=externalize, mark=mark_clashes,
+                                 parsed_cache=False, pdf_mode=pdf_mode, window=window)
+        return compile_pdf(output_file, use_format=use_format)
     
-    print(f"Schedule spans {len(months)} months")
+    with span('restore_document'):
+        key = cache.document_key(json_file, document_variant(externalize, mark_clashes, pdf_mode, window))
+        restored = cache.restore_document(key, output_file)
+    if restored:
+        print(f"Build cache hit: restored {output_file} and its PDF")
+        return True
     
-    # Group events
-    events_by_month, exam_events = group_events_by_month(events, subjects)
-    
-    print(f"Events grouped by month")
-    
-    # Start generating LaTeX
-    latex_lines = []
-    
-    # Header
-    latex_lines.extend(generate_latex_header())
+    if split:
+        success = compile_pdf_split(json_file, output_file, cache, compile_jobs, use_format, backend, externalize,
+                                    mark_clashes, pdf_mode=pdf_mode, window=window)
+    else:
+        generate_latex_from_json(json_file, output_file, cache, backend, externalize, mark_clashes, pdf_mode=pdf_mode,
+                                 window=window)
+        success = compile_pdf(output_file, use_format=use_format)
+    if success:
+        cache.store_document(key, output_file)
+    return success
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    """
+    Parse command-line arguments.
     
-    # Begin document
-    latex_lines.append(r"\begin{document}")
-    latex_lines.append(r"\begin{Form}")
-    latex_lines.append("")
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+        
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(description="Generate an academic schedule PDF from JSON data.")
+    parser.add_argument('json_file', nargs='?', default=config.DEFAULT_JSON_FILE,
+                        help="input JSON file (default: %(default)s)")
+    parser.add_argument('output_file', nargs='?', default=config.DEFAULT_OUTPUT_FILE,
+                        help="output .tex file (default: %(default)s)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always reparse, regenerate and recompile, ignoring the build and parsed-schedule caches")
+    parser.add_argument('--cache-dir', default=config.BUILD_CACHE_DIR,
+                        help="build cache directory (default: %(default)s)")
+    parser.add_argument('--precompiled-preamble', action='store_true', default=config.USE_PREAMBLE_FORMAT,
+                        help="compile from a dumped .fmt of the preamble, rebuilt when the header changes")
+    parser.add_argument('--event-backend', choices=['dict', 'columnar'], default=config.EVENT_BACKEND,
+                        help="event grouping backend; 'columnar' needs NumPy (default: %(default)s)")
+    parser.add_argument('--renderer', choices=['latex', 'draft'], default=config.RENDERER,
+                        help="'draft' writes a quick preview PDF in pure Python without pdflatex (default: %(default)s)")
+    parser.add_argument('--split', action='store_true',
+                        help="compile month tables as parallel sub-documents and merge the PDFs (needs qpdf or pdfunite)")
+    parser.add_argument('--pdf-mode', choices=list(PDF_MODES), default=config.PDF_MODE,
+                        help="'lean' compresses object streams and shares checkbox appearances; 'glyph' also prints "
+                             "plain boxes instead of form fields (default: %(default)s)")
+    parser.add_argument('--warm-pool', action='store_true', default=config.WARM_POOL,
+                        help="in batch, cohort and watch mode, keep pdflatex processes waiting with the preamble loaded")
+    parser.add_argument('--externalize-calendars', action='store_true', default=config.EXTERNALIZE_CALENDARS,
+                        help="compile each month's calendar once into a PDF graphic shared across builds")
+    parser.add_argument('--from', dest='from_date', metavar='YYYY-MM-DD',
+                        help="only render events and calendar months from this date on")
+    parser.add_argument('--to', dest='to_date', metavar='YYYY-MM-DD',
+                        help="only render events and calendar months up to this date")
+    parser.add_argument('--next-weeks', type=int, metavar='N',
+                        help="only render the next N weeks, starting today or at --from")
+    parser.add_argument('--check-clashes', action='store_true',
+                        help="report double-booked rooms and overlapping events of a subject, then exit (status 1 if any)")
+    parser.add_argument('--mark-clashes', action='store_true',
+                        help="report clashes and highlight the clashing rows in the generated tables")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and rebuild changed months whenever the JSON file is saved")
+    parser.add_argument('--batch', metavar='SOURCE',
+                        help="render every schedule in a directory or manifest file instead of a single JSON")
+    parser.add_argument('--cohort', metavar='SELECTION',
+                        help="render one schedule per student from json_file as the master schedule; SELECTION "
+                             "maps student names to subject keys")
+    parser.add_argument('--no-compile', action='store_true',
+                        help="with --cohort, only write the .tex files")
+    parser.add_argument('--serve', action='store_true',
+                        help="run an HTTP render service: POST schedule JSON to /render, see /health and /metrics")
+    parser.add_argument('--host', default=config.SERVICE_HOST,
+                        help="interface for --serve (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=config.SERVICE_PORT,
+                        help="port for --serve (default: %(default)s)")
+    parser.add_argument('--output-dir', default=config.BATCH_OUTPUT_DIR,
+                        help="output directory for batch and cohort mode (default: %(default)s)")
+    parser.add_argument('--jobs', type=int, default=config.BATCH_RENDER_WORKERS,
+                        help="generator processes in batch mode and worker processes for --serve (default: CPU count)")
+    parser.add_argument('--compile-jobs', type=int, default=config.BATCH_COMPILE_JOBS,
+                        help="maximum concurrent pdflatex processes in batch, cohort and split mode (default: CPU count)")
+    parser.add_argument('--profile', nargs='?', const=config.PROFILE_OUTPUT_FILE, metavar='TRACE_FILE',
+                        help="record stage timings as Chrome trace JSON (default file: %(const)s)")
+    args = parser.parse_args(argv)
+    if args.renderer == 'draft':
+        # The draft renderer has no clash highlighting and only one PDF layout
+        ignored = [option for option, used in (('--mark-clashes', args.mark_clashes),
+                                               ('--pdf-mode', args.pdf_mode != config.PDF_MODE)) if used]
+        if ignored:
+            parser.error(f"{' and '.join(ignored)} cannot be combined with --renderer draft "
+                         f"(LaTeX output only)")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    json_file = args.json_file
+    output_file = args.output_file
+    cache = None if args.no_cache else BuildCache(args.cache_dir, __version__)
     
-    # Title
-    latex_lines.append(r"\begin{center}")
-    latex_lines.append(f"{{\\LARGE\\bfseries {schedule_info['title']}}}\\\\[0.2em]")
-    latex_lines.append(f"{{\\large {schedule_info['period']}}}")
-    latex_lines.append(r"\end{center}")
-    latex_lines.append("")
-    latex_lines.append(r"\vspace{0.5em}")
-    latex_lines.append("")
+    if args.profile:
+        # Written on every exit path, including failed builds
+        start_tracing()
+        atexit.register(stop_tracing, args.profile)
     
-    # Calendars
-    latex_lines.extend(generate_calendars(months, event_dates))
+    try:
+        window = parse_date_window(args.from_date, args.to_date, args.next_weeks)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if window is not None and (args.watch or args.serve):
+        print("Error: --from, --to and --next-weeks cannot be combined with --watch or --serve")
+        sys.exit(1)
     
-    # Month tables
-    first_table = True
-    for month in months:
-        month_key = (month['year'], month['month'])
-        if month_key in events_by_month:
-            month_events = events_by_month[month_key]
-            latex_lines.extend(generate_month_table(month['name'], month['year'], month_events, subjects, first_table))
-            first_table = False
+    if args.check_clashes:
+        try:
+            header, events = load_schedule_stream(json_file)
+            if window is not None:
+                events = filter_events(events, window)
+            clashes = find_clashes(events, header['subjects'])
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print_clash_report(clashes)
+        sys.exit(1 if clashes else 0)
     
-    # Exam period
-    latex_lines.extend(generate_exam_period_table(exam_events, subjects))
+    if args.batch:
+        started = time.perf_counter()
+        try:
+            results = run_batch(args.batch, args.output_dir, args.jobs, args.compile_jobs,
+                                None if args.no_cache else args.cache_dir, __version__,
+                                args.precompiled_preamble, args.renderer, args.externalize_calendars, args.warm_pool,
+                                args.pdf_mode, window, terminal_progress())
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print_batch_summary(results, time.perf_counter() - started)
+        sys.exit(0 if all(result.success for result in results) else 1)
     
-    # End document
-    latex_lines.append(r"\end{Form}")
-    latex_lines.append(r"\end{document}")
+    if args.cohort:
+        started = time.perf_counter()
+        try:
+            results = run_cohort(json_file, args.cohort, args.output_dir, args.compile_jobs,
+                                 args.precompiled_preamble, not args.no_compile, args.warm_pool, args.pdf_mode,
+                                 window, terminal_progress())
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print_batch_summary(results, time.perf_counter() - started)
+        sys.exit(0 if all(result.success for result in results) else 1)
     
-    # Write to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(latex_lines))
+    if args.serve:
+        serve(args.host, args.port, args.jobs, use_format=args.precompiled_preamble, version=__version__)
+        sys.exit(0)
     
-    print(f"\nGenerated {output_file}")
-    print(f"Total lines: {len(latex_lines)}")
-    return output_file
-
-
-if __name__ == "__main__":
-    json_file = sys.argv[1] if len(sys.argv) > 1 else 'schedule_data.json'
-    output_file = sys.argv[2] if len(sys.argv) > 2 else 'Academic Schedule.tex'
+    if args.watch:
+        watch_schedule(json_file, output_file, cache, args.precompiled_preamble, args.event_backend,
+                       renderer=args.renderer, externalize=args.externalize_calendars, warm_pool=args.warm_pool,
+                       pdf_mode=args.pdf_mode)
+        sys.exit(0)
     
     try:
-        # Generate LaTeX from JSON
-        generate_latex_from_json(json_file, output_file)
-        
-        # Automatically compile PDF
-        success = compile_pdf(output_file)
+        # Generate LaTeX from JSON and compile the PDF
+        success = build_schedule(json_file, output_file, cache, args.precompiled_preamble, args.event_backend,
+                                 args.renderer, args.split, args.compile_jobs, args.externalize_calendars,
+                                 args.mark_clashes, args.pdf_mode, window)
         if not success:
             sys.exit(1)
             
@@ -131,6 +269,9 @@ if __name__ == "__main__":
         print(f"Error: Missing required field in JSON: {e}")
         print("Please verify all required fields are present in your JSON file.")
         sys.exit(1)
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"Unexpected error: {e}")
         print("Please check your input files and try again.")
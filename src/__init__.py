@@ -5,12 +5,29 @@ This package provides modular components for generating academic schedules
 from JSON data to professional PDF documents with LaTeX.
 """
 
-from .data_loader import load_schedule_data, get_event_dates, get_calendar_months
+from .data_loader import load_schedule_data, get_event_dates, get_calendar_months, ScheduleIndex
+from .stream_loader import load_schedule_stream
+from .parsed_cache import load_schedule_index
+from .date_window import DateWindow, parse_date_window
 from .event_processor import group_events_by_month
+from .records import Event, Subject
 from .latex_header import generate_latex_header
 from .calendar_generator import generate_calendars
 from .table_generators import generate_month_table, generate_exam_period_table
-from .pdf_compiler import compile_pdf
+from .pdf_compiler import compile_pdf, compile_pdf_async, compile_pdfs_async, CompileResult
+from .compile_progress import CompileProgress, TerminalProgress
+from .warm_pool import WarmPool
+from .document_builder import generate_latex_from_json, write_latex_document
+from .latex_writer import LatexWriter
+from .build_cache import BuildCache, FragmentStore
+from .batch import run_batch, print_batch_summary
+from .cohort import CohortRenderer, run_cohort
+from .watcher import watch_schedule
+from .clash_detection import Clash, IntervalIndex, find_clashes
+from .tracing import Tracer, start_tracing, stop_tracing
+from .pdf_draft import render_draft_pdf, generate_draft_pdf_from_json
+from .split_compile import compile_pdf_split
+from .render_service import RenderService, serve
 from . import config
 
 __version__ = '1.0.0'
@@ -20,11 +37,45 @@ __all__ = [
     'load_schedule_data',
     'get_event_dates',
     'get_calendar_months',
+    'ScheduleIndex',
+    'load_schedule_stream',
+    'load_schedule_index',
+    'DateWindow',
+    'parse_date_window',
     'group_events_by_month',
+    'Event',
+    'Subject',
     'generate_latex_header',
     'generate_calendars',
     'generate_month_table',
     'generate_exam_period_table',
     'compile_pdf',
+    'compile_pdf_async',
+    'compile_pdfs_async',
+    'WarmPool',
+    'CompileResult',
+    'CompileProgress',
+    'TerminalProgress',
+    'generate_latex_from_json',
+    'write_latex_document',
+    'LatexWriter',
+    'BuildCache',
+    'FragmentStore',
+    'run_batch',
+    'print_batch_summary',
+    'CohortRenderer',
+    'run_cohort',
+    'watch_schedule',
+    'Clash',
+    'IntervalIndex',
+    'find_clashes',
+    'Tracer',
+    'start_tracing',
+    'stop_tracing',
+    'render_draft_pdf',
+    'generate_draft_pdf_from_json',
+    'compile_pdf_split',
+    'RenderService',
+    'serve',
     'config',
 ]
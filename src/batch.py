@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Batch Renderer
+Renders many schedule JSON files in parallel with a bounded pdflatex pool
+"""
+
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from . import config
+from .build_cache import BuildCache, document_variant
+from .compile_progress import ProgressCallback
+from .date_window import DateWindow
+from .document_builder import generate_latex_from_json
+from .pdf_compiler import compile_pdf
+from .pdf_draft import generate_draft_pdf_from_json
+from .preamble_format import ensure_preamble_format
+from .warm_pool import WarmPool
+
+
+class BatchJobResult(NamedTuple):
+    """Outcome of rendering a single schedule in a batch."""
+    json_file: str
+    pdf_file: str
+    success: bool
+    cached: bool
+    error: str
+    seconds: float
+
+
+def discover_jobs(source: str) -> List[str]:
+    """
+    Collect the schedule JSON files for a batch run.
+
+    Args:
+        source: Directory of .json files, or a manifest file listing one
+                JSON path per line (blank lines and '#' comments are ignored)
+
+    Returns:
+        List of JSON file paths in a stable order
+
+    Raises:
+        FileNotFoundError: If the source doesn't exist
+        ValueError: If two jobs would write to the same output name
+    """
+    if os.path.isdir(source):
+        json_files = [
+            os.path.join(source, name)
+            for name in sorted(os.listdir(source))
+            if name.endswith('.json')
+        ]
+    elif os.path.isfile(source):
+        base_dir = os.path.dirname(source)
+        json_files = []
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = line.strip()
+                if entry and not entry.startswith('#'):
+                    json_files.append(os.path.join(base_dir, entry))
+    else:
+        raise FileNotFoundError(f"Batch source '{source}' not found")
+
+    seen: Dict[str, str] = {}
+    for json_file in json_files:
+        stem = _job_name(json_file)
+        if stem in seen:
+            raise ValueError(f"Batch jobs '{seen[stem]}' and '{json_file}' share the output name '{stem}'")
+        seen[stem] = json_file
+    return json_files
+
+
+def _job_name(json_file: str) -> str:
+    return os.path.splitext(os.path.basename(json_file))[0]
+
+
+def _render_tex(json_file: str, tex_file: str, cache_dir: Optional[str], version: str,
+                externalize: bool, pdf_mode: str, window: Optional[DateWindow]) -> Tuple[Optional[str], bool]:
+    """
+    Process-pool worker: restore a cached document or generate the .tex file.
+
+    Returns:
+        Tuple of (document cache key or None, whether the PDF was restored from cache)
+    """
+    cache = BuildCache(cache_dir, version) if cache_dir else None
+    key = None
+    if cache is not None:
+        key = cache.document_key(json_file, document_variant(externalize, pdf_mode=pdf_mode, window=window))
+        if cache.restore_document(key, tex_file):
+            return key, True
+
+    # Worker output would interleave across processes, so drop it
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_latex_from_json(json_file, tex_file, cache, externalize=externalize, pdf_mode=pdf_mode, window=window)
+    return key, False
+
+
+def _render_draft(json_file: str, pdf_file: str, window: Optional[DateWindow]) -> None:
+    """Process-pool worker: render a draft PDF directly, without pdflatex."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_draft_pdf_from_json(json_file, pdf_file, window=window)
+
+
+def _compile_tex(tex_file: str, cache_dir: Optional[str], key: Optional[str], version: str,
+                 use_format: bool, pool: Optional[WarmPool] = None,
+                 progress: Optional[ProgressCallback] = None) -> bool:
+    """
+    Thread-pool worker: compile a .tex file in the output directory.
+
+    Job names are unique, so each job's build directory is private and
+    pdflatex auxiliary files from concurrent jobs never collide. The build
+    directories persist, so the next batch run starts from their .aux files.
+    """
+    if not compile_pdf(tex_file, quiet=True, use_format=use_format, pool=pool, progress=progress):
+        return False
+
+    if cache_dir and key:
+        BuildCache(cache_dir, version).store_document(key, tex_file)
+    return True
+
+
+def run_batch(source: str, output_dir: str, workers: Optional[int] = None,
+              compile_jobs: Optional[int] = None, cache_dir: Optional[str] = None,
+              version: str = '', use_format: bool = config.USE_PREAMBLE_FORMAT,
+              renderer: str = config.RENDERER,
+              externalize: bool = config.EXTERNALIZE_CALENDARS,
+              warm_pool: bool = config.WARM_POOL, pdf_mode: str = config.PDF_MODE,
+              window: Optional[DateWindow] = None,
+              progress: Optional[ProgressCallback] = None) -> List[BatchJobResult]:
+    """
+    Render every schedule in a directory or manifest.
+
+    The .tex files are generated in a process pool. As each one finishes it is
+    handed to a bounded pool of pdflatex jobs, so generation and compilation
+    overlap. With the draft renderer the PDFs are written directly by the
+    process pool and pdflatex is not used.
+
+    Args:
+        source: Directory of schedule JSON files or a manifest file
+        output_dir: Directory for the generated .tex and .pdf files
+        workers: Number of generator processes (defaults to CPU count)
+        compile_jobs: Maximum concurrent pdflatex processes (defaults to CPU count)
+        cache_dir: Build cache directory, or None to disable caching
+        version: Generator version used in cache keys
+        use_format: Compile from the precompiled preamble format
+        renderer: 'latex' or 'draft'
+        externalize: Include the calendars as per-month PDF graphics from the
+                     shared calendar cache, so schedules with identical months
+                     compile each calendar only once
+        warm_pool: Compile on pdflatex processes that have already loaded
+                   the preamble while earlier jobs were running
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+        window: Only render the events and calendar months inside this date range
+        progress: Receives the CompileProgress of every pdflatex job, from
+                  the compile threads; tell jobs apart by tex_file
+
+    Returns:
+        List of per-job results in input order
+    """
+    json_files = discover_jobs(source)
+    os.makedirs(output_dir, exist_ok=True)
+
+    workers = workers or config.BATCH_RENDER_WORKERS or os.cpu_count() or 1
+    compile_jobs = compile_jobs or config.BATCH_COMPILE_JOBS or os.cpu_count() or 1
+
+    # Dump the format once up front rather than racing to build it in every job
+    if use_format and renderer == 'latex' and ensure_preamble_format(pdf_mode=pdf_mode) is None:
+        use_format = False
+
+    results: Dict[str, BatchJobResult] = {}
+    started: Dict[str, float] = {}
+    pool = WarmPool(compile_jobs, pdf_mode=pdf_mode) if warm_pool and renderer == 'latex' else None
+
+    def record(json_file: str, success: bool, cached: bool = False, error: str = '') -> None:
+        pdf_file = os.path.join(output_dir, _job_name(json_file) + '.pdf')
+        results[json_file] = BatchJobResult(json_file, pdf_file, success, cached, error,
+                                            time.perf_counter() - started[json_file])
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as render_pool, \
+                ThreadPoolExecutor(max_workers=compile_jobs) as compile_pool:
+            render_futures: Dict[Future, str] = {}
+            for json_file in json_files:
+                tex_file = os.path.join(output_dir, _job_name(json_file) + '.tex')
+                started[json_file] = time.perf_counter()
+                if renderer == 'draft':
+                    pdf_file = os.path.join(output_dir, _job_name(json_file) + '.pdf')
+                    draft_future: Future[None] = render_pool.submit(_render_draft, json_file, pdf_file, window)
+                    render_futures[draft_future] = json_file
+                else:
+                    tex_future: Future[Tuple[Optional[str], bool]] = render_pool.submit(
+                        _render_tex, json_file, tex_file, cache_dir, version, externalize, pdf_mode, window)
+                    render_futures[tex_future] = json_file
+
+            compile_futures: Dict[Future, str] = {}
+            for future in as_completed(render_futures):
+                json_file = render_futures[future]
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    record(json_file, False, error=f"{type(e).__name__}: {e}")
+                    continue
+                if renderer == 'draft':
+                    record(json_file, True)
+                    continue
+                key, cached = rendered
+                if cached:
+                    record(json_file, True, cached=True)
+                    continue
+                tex_file = os.path.join(output_dir, _job_name(json_file) + '.tex')
+                compile_future = compile_pool.submit(_compile_tex, tex_file, cache_dir, key, version, use_format,
+                                                     pool, progress)
+                compile_futures[compile_future] = json_file
+
+            for future in as_completed(compile_futures):
+                json_file = compile_futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    record(json_file, False, error=f"{type(e).__name__}: {e}")
+                    continue
+                record(json_file, success, error='' if success else 'PDF compilation failed')
+    finally:
+        if pool is not None:
+            pool.close()
+
+    return [results[json_file] for json_file in json_files]
+
+
+def print_batch_summary(results: List[BatchJobResult], elapsed: float) -> None:
+    """
+    Print throughput and failure summary for a batch run.
+
+    Args:
+        results: Per-job results from run_batch
+        elapsed: Wall-clock duration of the whole batch in seconds
+    """
+    total = len(results)
+    failures = [result for result in results if not result.success]
+    cached = sum(1 for result in results if result.cached)
+    throughput = total / elapsed if elapsed > 0 else 0.0
+
+    print(f"\nBatch finished: {total} schedules in {elapsed:.2f}s ({throughput:.2f} schedules/s)")
+    print(f"Succeeded: {total - len(failures)} ({cached} from cache), failed: {len(failures)}")
+    for result in failures:
+        print(f"  FAILED {result.json_file}: {result.error}")
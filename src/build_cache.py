@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Build Cache
+Content-addressed cache for generated documents and LaTeX fragments
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from . import config
+from .date_window import DateWindow
+from .latex_header import generate_latex_header
+
+
+def _hash_text(*parts: str) -> str:
+    """
+    Hash a sequence of strings into a single hex digest.
+
+    Args:
+        *parts: Strings to include in the digest
+
+    Returns:
+        SHA-256 hex digest of all parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def config_fingerprint() -> str:
+    """
+    Build a fingerprint of every setting in the config module.
+
+    Returns:
+        SHA-256 hex digest of the public configuration values
+    """
+    settings = {
+        name: repr(getattr(config, name))
+        for name in sorted(dir(config))
+        if name.isupper()
+    }
+    return _hash_text(json.dumps(settings, sort_keys=True))
+
+
+class FragmentStore(Protocol):
+    """
+    Store of rendered LaTeX fragments.
+
+    BuildCache keeps fragments on disk across builds; the cohort renderer's
+    SharedFragments keeps them in memory across the documents of one run.
+    The generators only use this interface.
+    """
+    hits: int
+    misses: int
+
+    def fragment(self, kind: str, payload: Any, render: Callable[[], Iterable[str]]) -> Iterator[str]:
+        """
+        Stream the lines of a fragment, rendering them if they are not stored.
+
+        Args:
+            kind: Fragment kind (e.g. 'month_table', 'calendar')
+            payload: JSON-serializable data the fragment is rendered from
+            render: Callable producing the fragment lines
+
+        Returns:
+            Iterator over the fragment lines
+        """
+        ...
+
+    def has_fragment(self, kind: str, payload: Any) -> bool:
+        """
+        Whether a fragment is stored, so fragment() would not render it.
+
+        Args:
+            kind: Fragment kind (e.g. 'month_table', 'calendar')
+            payload: JSON-serializable data the fragment is rendered from
+
+        Returns:
+            True if the fragment is stored
+        """
+        ...
+
+
+def document_variant(externalize: bool = False, mark_clashes: bool = False, pdf_mode: str = config.PDF_MODE,
+                     window: Optional[DateWindow] = None) -> str:
+    """
+    Name the options that change a generated document, for BuildCache.document_key.
+
+    Args:
+        externalize: The calendars are included as externalized PDF graphics
+        mark_clashes: Clashing rows are highlighted
+        pdf_mode: 'standard', 'lean' or 'glyph' output
+        window: Date window the document is limited to
+
+    Returns:
+        The enabled options joined with '+', or '' for the defaults
+    """
+    return '+'.join(name for name, enabled in (('externalized', externalize), ('clashes', mark_clashes),
+                                               (pdf_mode, pdf_mode != 'standard'),
+                                               (window.label if window else '', window is not None)) if enabled)
+
+
+def _atomic_write(path: str, content: bytes) -> None:
+    """
+    Write bytes to a file atomically so concurrent runs never see partial entries.
+
+    Args:
+        path: Destination file path
+        content: Bytes to write
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class BuildCache:
+    """
+    Content-addressed build cache.
+
+    Whole documents are keyed by the input JSON bytes, the generator version,
+    the configuration and the LaTeX header. Month fragments are keyed by the
+    data they are rendered from, so editing one event only re-renders the
+    month it belongs to. Documents and fragments each have a size budget
+    (see prune_documents and prune_fragments).
+    """
+
+    def __init__(self, cache_dir: str = config.BUILD_CACHE_DIR, version: str = '') -> None:
+        """
+        Args:
+            cache_dir: Directory holding cached documents and fragments
+            version: Generator version, part of every cache key
+        """
+        self.cache_dir = cache_dir
+        self.version = version
+        self._config_hash = config_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._pruned = False
+        self._documents_pruned = False
+
+    def _path(self, kind: str, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, kind, f"{key}{ext}")
+
+    def _fragment_path(self, kind: str, payload: Any) -> str:
+        key = _hash_text(
+            kind,
+            json.dumps(payload, sort_keys=True, default=str),
+            self.version,
+            self._config_hash,
+        )
+        return self._path('fragments', key, '.tex')
+
+    def document_key(self, json_file: str, variant: str = '') -> str:
+        """
+        Compute the cache key for a whole document.
+
+        Args:
+            json_file: Path to input JSON file with schedule data
+            variant: Options that change the generated .tex (see document_variant)
+
+        Returns:
+            Hex digest identifying the generated document
+
+        Raises:
+            FileNotFoundError: If JSON file doesn't exist
+        """
+        source_digest = hashlib.sha256()
+        try:
+            with open(json_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(config.STREAM_CHUNK_SIZE), b''):
+                    source_digest.update(chunk)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Schedule file '{json_file}' not found")
+        return _hash_text(
+            'document',
+            source_digest.hexdigest(),
+            self.version,
+            self._config_hash,
+            '\n'.join(generate_latex_header()),
+            variant,
+        )
+
+    def restore_document(self, key: str, tex_file: str) -> bool:
+        """
+        Restore a cached .tex and .pdf pair to the output location.
+
+        Args:
+            key: Document cache key
+            tex_file: Path the .tex file should be restored to
+
+        Returns:
+            True on a cache hit, False if either file is missing
+        """
+        cached_tex = self._path('documents', key, '.tex')
+        cached_pdf = self._path('documents', key, '.pdf')
+        if not (os.path.exists(cached_tex) and os.path.exists(cached_pdf)):
+            self.misses += 1
+            return False
+
+        base_name = os.path.splitext(tex_file)[0]
+        shutil.copyfile(cached_tex, tex_file)
+        shutil.copyfile(cached_pdf, f"{base_name}.pdf")
+        self.hits += 1
+        for path in (cached_tex, cached_pdf):
+            try:
+                # Mark the document as recently used for prune_documents
+                os.utime(path)
+            except OSError:
+                pass
+        return True
+
+    def store_document(self, key: str, tex_file: str) -> None:
+        """
+        Store a generated .tex file and its compiled PDF under a key.
+
+        The first document a BuildCache stores prunes the stored documents
+        (see prune_documents).
+
+        Args:
+            key: Document cache key
+            tex_file: Path to the generated .tex file
+        """
+        base_name = os.path.splitext(tex_file)[0]
+        pdf_file = f"{base_name}.pdf"
+        if not os.path.exists(pdf_file):
+            return
+        if not self._documents_pruned:
+            self._documents_pruned = True
+            self.prune_documents()
+        for source, ext in ((tex_file, '.tex'), (pdf_file, '.pdf')):
+            with open(source, 'rb') as f:
+                _atomic_write(self._path('documents', key, ext), f.read())
+
+    def fragment(self, kind: str, payload: Any, render: Callable[[], Iterable[str]]) -> Iterator[str]:
+        """
+        Stream cached LaTeX lines for a fragment, rendering them on a miss.
+
+        On a miss the rendered lines are passed through as they are produced
+        and written to the cache at the same time, so a fragment is never held
+        in memory as a whole. The first miss of a BuildCache prunes the
+        stored fragments (see prune_fragments).
+
+        Args:
+            kind: Fragment kind (e.g. 'month_table', 'calendar')
+            payload: JSON-serializable data the fragment is rendered from
+            render: Callable producing the fragment lines on a miss
+
+        Yields:
+            LaTeX lines for the fragment
+        """
+        path = self._fragment_path(kind, payload)
+        try:
+            cached = open(path, 'r', encoding='utf-8', newline='\n')
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            try:
+                # Mark the fragment as recently used for prune_fragments
+                os.utime(path)
+            except OSError:
+                pass
+            with cached:
+                for line in cached:
+                    yield line[:-1]
+            return
+
+        self.misses += 1
+        if not self._pruned:
+            # Once per build, before it adds fragments
+            self._pruned = True
+            self.prune_fragments()
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            # Every line is newline-terminated so empty fragments round-trip
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                for line in render():
+                    f.write(line + '\n')
+                    yield line
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def has_fragment(self, kind: str, payload: Any) -> bool:
+        """
+        Whether a fragment is cached, without counting a hit or miss.
+
+        Args:
+            kind: Fragment kind (e.g. 'month_table', 'calendar')
+            payload: JSON-serializable data the fragment is rendered from
+
+        Returns:
+            True if fragment() would stream the fragment from the cache
+        """
+        return os.path.exists(self._fragment_path(kind, payload))
+
+    def prune_fragments(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Evict the least recently used fragments until the rest fit in max_bytes.
+
+        A fragment's modification time is refreshed on every hit, so the
+        oldest files are the ones that have gone unused the longest.
+
+        Args:
+            max_bytes: Size to prune to (defaults to config.BUILD_CACHE_MAX_FRAGMENT_BYTES;
+                       None there keeps every fragment)
+
+        Returns:
+            Number of fragments removed
+        """
+        if max_bytes is None:
+            max_bytes = config.BUILD_CACHE_MAX_FRAGMENT_BYTES
+            if max_bytes is None:
+                return 0
+        return self._prune('fragments', ('.tex',), max_bytes)
+
+    def prune_documents(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Evict the least recently used documents until the rest fit in max_bytes.
+
+        A document's .tex and PDF are evicted together. Their modification
+        times are refreshed on every restore.
+
+        Args:
+            max_bytes: Size to prune to (defaults to config.BUILD_CACHE_MAX_DOCUMENT_BYTES;
+                       None there keeps every document)
+
+        Returns:
+            Number of documents removed
+        """
+        if max_bytes is None:
+            max_bytes = config.BUILD_CACHE_MAX_DOCUMENT_BYTES
+            if max_bytes is None:
+                return 0
+        return self._prune('documents', ('.tex', '.pdf'), max_bytes)
+
+    def _prune(self, kind: str, extensions: Tuple[str, ...], max_bytes: int) -> int:
+        # Files of one entry share their key; the entry was last used at its newest file's mtime
+        entries: Dict[str, Tuple[int, int, List[str]]] = {}
+        total = 0
+        try:
+            with os.scandir(os.path.join(self.cache_dir, kind)) as scan:
+                for entry in scan:
+                    key, ext = os.path.splitext(entry.name)
+                    if ext in extensions and entry.is_file():
+                        stat = entry.stat()
+                        used, size, paths = entries.get(key, (0, 0, []))
+                        entries[key] = (max(used, stat.st_mtime_ns), size + stat.st_size, paths + [entry.path])
+                        total += stat.st_size
+        except FileNotFoundError:
+            return 0
+
+        removed = 0
+        for _, size, paths in sorted(entries.values()):
+            if total <= max_bytes:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Pruned by a concurrent build
+                    pass
+            total -= size
+            removed += 1
+        return removed
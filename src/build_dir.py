@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Build Directory
+Per-document pdflatex output directory that keeps aux state between builds
+"""
+
+import hashlib
+import os
+import shutil
+from typing import List, Optional
+
+from . import config
+
+# Stamp of the source and command of the last converged build
+STAMP_SUFFIX = '.stamp'
+
+# Files a pass leaves behind; the first two are read again by the next pass
+PASS_OUTPUT_EXTENSIONS = ('.aux', '.out', '.log', '.pdf')
+AUX_STATE_EXTENSIONS = PASS_OUTPUT_EXTENSIONS[:2]
+
+
+def _file_digest(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class BuildDir:
+    """
+    Output directory of one document, reused by every build of it.
+
+    pdflatex writes the .aux, .log, .out and PDF files here instead of next
+    to the .tex file. Keeping the .aux means longtable column widths and
+    hyperref data from the last build are already in place, so a rebuild
+    usually converges in a single pass. The directory is a hidden sibling
+    of the .tex file, e.g. '.Academic Schedule.build'.
+
+    A pass is repeated while the .aux file changes or the log asks for a
+    rerun, up to config.COMPILE_MAX_PASSES. When the source and command are
+    unchanged since the last converged build, no pass is needed at all.
+    """
+
+    def __init__(self, tex_file: str, command: List[str]) -> None:
+        """
+        Args:
+            tex_file: Path to the .tex file
+            command: pdflatex command line without the output directory option
+        """
+        tex_dir, tex_name = os.path.split(tex_file)
+        self.base = os.path.splitext(tex_name)[0]
+        self.name = f".{self.base}{config.COMPILE_BUILD_DIR_SUFFIX}"
+        self.path = os.path.join(tex_dir, self.name)
+        self.tex_file = tex_file
+        self.command = command
+        self.passes = 0
+
+    def _file(self, ext: str) -> str:
+        return os.path.join(self.path, f"{self.base}{ext}")
+
+    @property
+    def pdf_file(self) -> str:
+        """PDF written by the last pass."""
+        return self._file('.pdf')
+
+    @property
+    def log_file(self) -> str:
+        """Log of the last pass."""
+        return self._file('.log')
+
+    @property
+    def output_option(self) -> str:
+        """pdflatex option directing output here, relative to the .tex file's directory."""
+        return f"-output-directory={self.name}"
+
+    def _stamp(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.tex_file, 'rb') as f:
+            digest.update(f.read())
+        digest.update('\0'.join(self.command).encode('utf-8'))
+        return digest.hexdigest()
+
+    def up_to_date(self) -> bool:
+        """Whether the PDF from the last converged build matches the current source."""
+        stamp_file = self._file(STAMP_SUFFIX)
+        if not (os.path.exists(self.pdf_file) and os.path.exists(stamp_file)):
+            return False
+        with open(stamp_file, 'r', encoding='utf-8') as f:
+            return f.read() == self._stamp()
+
+    def begin(self) -> None:
+        """Prepare for a new build: keep the aux state, drop the old PDF and stamp."""
+        os.makedirs(self.path, exist_ok=True)
+        for path in (self.pdf_file, self._file(STAMP_SUFFIX)):
+            if os.path.exists(path):
+                os.remove(path)
+        self.passes = 0
+
+    def export_state(self, work_dir: str, job_name: str) -> None:
+        """
+        Copy the aux state to a directory where a pass runs under another job name.
+
+        Warm pool workers compile in their own directory, so their pass
+        starts from the same .aux and .out files as a pass run here.
+
+        Args:
+            work_dir: Directory pdflatex runs in
+            job_name: pdflatex job name of that run
+        """
+        for ext in AUX_STATE_EXTENSIONS:
+            if os.path.exists(self._file(ext)):
+                shutil.copyfile(self._file(ext), os.path.join(work_dir, f"{job_name}{ext}"))
+
+    def import_pass(self, work_dir: str, job_name: str) -> None:
+        """
+        Move the output of a pass run elsewhere (see export_state) into this directory.
+
+        Args:
+            work_dir: Directory the pass ran in
+            job_name: pdflatex job name of the pass
+        """
+        for ext in PASS_OUTPUT_EXTENSIONS:
+            source = os.path.join(work_dir, f"{job_name}{ext}")
+            if os.path.exists(source):
+                shutil.move(source, self._file(ext))
+            elif ext not in AUX_STATE_EXTENSIONS and os.path.exists(self._file(ext)):
+                # The pass stopped before writing it; don't report an older one
+                os.remove(self._file(ext))
+
+    def aux_digest(self) -> Optional[str]:
+        """Hash of the current .aux file, or None if there is none."""
+        return _file_digest(self._file('.aux'))
+
+    def log(self) -> str:
+        """Contents of the last pass's log, or an empty string."""
+        if not os.path.exists(self.log_file):
+            return ''
+        with open(self.log_file, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+    def rerun_reason(self, aux_before: Optional[str]) -> Optional[str]:
+        """
+        Decide whether the pass that just finished must be repeated.
+
+        A new .aux file on a cold build only counts when the log asks for a
+        rerun, as documents without references or long tables converge in
+        one pass.
+
+        Args:
+            aux_before: aux_digest() from before the pass
+
+        Returns:
+            Why another pass is needed, or None if the build has converged
+        """
+        self.passes += 1
+        log = self.log()
+        for pattern in config.RERUN_LOG_PATTERNS:
+            if pattern in log:
+                return f"log asks to rerun ({pattern})"
+        if aux_before is not None and self.aux_digest() != aux_before:
+            return "aux file changed"
+        return None
+
+    def finish(self, pdf_file: str, converged: bool) -> bool:
+        """
+        Copy the PDF next to the .tex file and record the build.
+
+        Args:
+            pdf_file: Destination path of the PDF
+            converged: The last pass did not ask for a rerun
+
+        Returns:
+            True if a PDF was produced
+        """
+        if not os.path.exists(self.pdf_file):
+            return False
+        shutil.copyfile(self.pdf_file, pdf_file)
+        if converged:
+            with open(self._file(STAMP_SUFFIX), 'w', encoding='utf-8') as f:
+                f.write(self._stamp())
+        return True
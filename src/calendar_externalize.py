@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Calendar Externalization
+Compiles each month's mini calendar once into a cached PDF graphic
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import config
+from .calendar_generator import calendar_picture_begin, calendar_section_end, generate_month_calendar
+from .data_loader import ScheduleIndex
+from .latex_header import generate_latex_header
+from .pdf_compiler import compile_pdfs_async
+from .tracing import span
+
+MonthKey = Tuple[int, int]
+
+
+def _eventday_macro() -> List[str]:
+    """The \\eventday definition from the document header."""
+    header = generate_latex_header()
+    start = header.index(r"\newcommand{\eventday}[1]{%")
+    return header[start:start + 3]
+
+
+def calendar_source(month: Dict[str, Any], month_event_dates: List[date]) -> str:
+    """
+    Standalone LaTeX source of a single month's calendar.
+
+    The source depends only on the month and its event days, never on the
+    student or the calendar's position, so it doubles as the cache key.
+
+    Args:
+        month: Month dictionary (year, month, name, date_obj)
+        month_event_dates: Sorted dates with scheduled events in this month
+
+    Returns:
+        Complete .tex source
+    """
+    lines = [
+        r"\documentclass[tikz,10pt]{standalone}",
+        r"\usepackage[T1]{fontenc}",
+        r"\usetikzlibrary{calendar,shapes.geometric}",
+    ]
+    lines += _eventday_macro()
+    lines.append(r"\begin{document}")
+    lines += calendar_picture_begin()
+    lines += generate_month_calendar(0, month, month_event_dates)
+    lines += [r"\end{tikzpicture}", r"\end{document}", ""]
+    return '\n'.join(lines)
+
+
+def externalize_calendars(index: ScheduleIndex, cache_dir: str = config.CALENDAR_CACHE_DIR,
+                          jobs: Optional[int] = None) -> Optional[Dict[MonthKey, str]]:
+    """
+    Make sure every month's calendar exists as a PDF graphic in the shared cache.
+
+    Graphics are keyed by a hash of their standalone source, so unchanged
+    months are reused across builds and across schedules that share the
+    same calendar. Missing graphics are compiled in parallel.
+
+    Args:
+        index: Parsed and bucketed schedule data
+        cache_dir: Directory shared by all builds for calendar graphics
+        jobs: Maximum concurrent pdflatex processes (defaults to CPU count)
+
+    Returns:
+        Absolute PDF path per (year, month), or None if a graphic could not
+        be compiled and the calendars should be drawn inline instead
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    graphics: Dict[MonthKey, str] = {}
+    missing: Dict[str, str] = {}
+    for month in index.months:
+        month_key = (month['year'], month['month'])
+        source = calendar_source(month, index.event_dates_by_month.get(month_key, []))
+        key = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        pdf_file = os.path.join(cache_dir, f"{key}.pdf")
+        graphics[month_key] = pdf_file
+        if not os.path.exists(pdf_file):
+            missing[key] = source
+
+    reused = len(set(graphics.values())) - len(missing)
+    if missing:
+        os.makedirs(cache_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix='.calendars-', dir=cache_dir)
+        try:
+            tex_files = []
+            for key, source in missing.items():
+                tex_file = os.path.join(build_dir, f"{key}.tex")
+                with open(tex_file, 'w', encoding='utf-8') as f:
+                    f.write(source)
+                tex_files.append(tex_file)
+
+            jobs = jobs or os.cpu_count() or 1
+            with span('externalize_calendars', compiled=len(tex_files)):
+                try:
+                    results = asyncio.run(compile_pdfs_async(tex_files, max_concurrency=jobs, use_format=False))
+                except FileNotFoundError:
+                    results = []
+            if len(results) < len(tex_files) or not all(result.success for result in results):
+                print("Calendar externalization failed, drawing calendars inline")
+                return None
+            for result in results:
+                # Atomic, so concurrent builds sharing the cache never see partial graphics
+                os.replace(result.pdf_file, os.path.join(cache_dir, os.path.basename(result.pdf_file)))
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    print(f"Calendar graphics: {reused} reused, {len(missing)} compiled")
+    return graphics
+
+
+def generate_externalized_calendars(months: List[Dict[str, Any]], graphics: Dict[MonthKey, str]) -> Iterator[str]:
+    """
+    Generate the calendar section from cached calendar graphics.
+
+    The graphics are placed on the same grid as the inline calendars.
+
+    Args:
+        months: List of month dictionaries (year, month, name, date_obj)
+        graphics: PDF path per (year, month), from externalize_calendars
+
+    Yields:
+        LaTeX lines for calendar section
+    """
+    yield r"% Mini Calendars (externalized)"
+    yield r"\begin{center}"
+    yield r"\begin{tikzpicture}"
+    for idx, month in enumerate(months):
+        x_pos = (idx % config.CALENDARS_PER_ROW) * config.CALENDAR_X_SPACING
+        y_pos = -(idx // config.CALENDARS_PER_ROW) * config.CALENDAR_Y_SPACING
+        pdf_file = graphics[(month['year'], month['month'])]
+        yield f"% {month['name']} {month['year']}"
+        yield f"\\node[anchor=north west, inner sep=0pt] at ({x_pos}cm,{y_pos}cm) {{\\includegraphics{{{pdf_file}}}}};"
+    yield from calendar_section_end()
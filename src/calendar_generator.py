@@ -4,61 +4,154 @@ Calendar Generator
 Generates mini calendar visualizations with event highlighting
 """
 
+from collections import defaultdict
+from concurrent.futures import Future
 from datetime import date
-from typing import List, Set, Dict, Any
+from typing import List, Set, Dict, Any, Optional, Iterator, Tuple, Callable, Iterable
 
+from .build_cache import FragmentStore
 
-def generate_calendars(months: List[Dict[str, Any]], event_dates: Set[date]) -> List[str]:
+
+def generate_month_calendar(idx: int, month: Dict[str, Any], month_event_dates: List[date]) -> Iterator[str]:
     """
-    Generate mini calendars section with highlighted event days.
+    Generate the calendar entry for a single month.
     
     Args:
-        months: List of month dictionaries (year, month, name, date_obj)
-        event_dates: Set of dates with scheduled events
+        idx: Position of the month within the calendar section
+        month: Month dictionary (year, month, name, date_obj)
+        month_event_dates: Sorted dates with scheduled events in this month
         
+    Yields:
+        LaTeX lines for the month's calendar
+    """
+    yield f"% {month['name']} {month['year']}"
+    
+    # Position calculation (3 calendars per row)
+    x_pos = (idx % 3) * 10
+    y_pos = -(idx // 3) * 10
+    
+    at_clause = f", at={{({x_pos}cm,{y_pos}cm)}}" if idx > 0 else ""
+    
+    yield f"\\calendar[dates={month['year']}-{month['month']:02d}-01 to {month['year']}-{month['month']:02d}-last, name={month['name'].lower()}{at_clause},"
+    yield r"          every day/.style={anchor=base}]"
+    
+    # Add event days for this month
+    for event_date in month_event_dates:
+        yield f"  \\eventday{{{event_date.year}-{event_date.month:02d}-{event_date.day:02d}}}"
+    
+    yield ";"
+    yield ""
+
+
+def calendar_payload(idx: int, month: Dict[str, Any], month_event_dates: List[date]) -> List[Any]:
+    """
+    Data a month's calendar fragment is rendered from, its fragment cache payload.
+
+    Args:
+        idx: Position of the month in the calendar grid
+        month: Month dictionary (year, month, name, date_obj)
+        month_event_dates: Sorted dates with events in this month
+
     Returns:
-        List of LaTeX lines for calendar section
+        JSON-serializable payload
+    """
+    return [idx, month['name'], month['year'], month['month'], month_event_dates]
+
+
+def group_dates_by_month(event_dates: Set[date]) -> Dict[Tuple[int, int], List[date]]:
     """
-    lines = []
-    lines.append(r"% Mini Calendars")
-    lines.append(r"\begin{center}")
-    lines.append(r"\begin{tikzpicture}[every calendar/.style={")
-    lines.append(r"    week list, ")
-    lines.append(r"    month label above centered, ")
-    lines.append(r"    month text=\textbf{\%mt \%y0},")
-    lines.append(r"    day xshift=2.2em,")
-    lines.append(r"    day yshift=1.8em")
-    lines.append(r"}]")
-    lines.append("")
+    Sort event dates once and bucket them by month.
     
-    for idx, month in enumerate(months):
-        lines.append(f"% {month['name']} {month['year']}")
-        
-        # Position calculation (3 calendars per row)
-        x_pos = (idx % 3) * 10
-        y_pos = -(idx // 3) * 10
-        
-        at_clause = f", at={{({x_pos}cm,{y_pos}cm)}}" if idx > 0 else ""
-        
-        lines.append(f"\\calendar[dates={month['year']}-{month['month']:02d}-01 to {month['year']}-{month['month']:02d}-last, name={month['name'].lower()}{at_clause},")
-        lines.append(r"          every day/.style={anchor=base}]")
+    Args:
+        event_dates: Set of dates with scheduled events
         
-        # Add event days for this month
-        for event_date in sorted(event_dates):
-            if event_date.year == month['year'] and event_date.month == month['month']:
-                lines.append(f"  \\eventday{{{event_date.year}-{event_date.month:02d}-{event_date.day:02d}}}")
+    Returns:
+        Sorted dates keyed by (year, month)
+    """
+    dates_by_month: Dict[Tuple[int, int], List[date]] = defaultdict(list)
+    for event_date in sorted(event_dates):
+        dates_by_month[(event_date.year, event_date.month)].append(event_date)
+    return dates_by_month
+
+
+def calendar_picture_begin() -> List[str]:
+    """
+    Opening lines of the tikzpicture holding the mini calendars.
+    
+    Returns:
+        List of LaTeX lines
+    """
+    return [
+        r"\begin{tikzpicture}[every calendar/.style={",
+        r"    week list, ",
+        r"    month label above centered, ",
+        r"    month text=\textbf{\%mt \%y0},",
+        r"    day xshift=2.2em,",
+        r"    day yshift=1.8em",
+        r"}]",
+        "",
+    ]
+
+
+def calendar_section_end() -> List[str]:
+    """
+    Lines closing the calendar section, including the legend.
+    
+    Returns:
+        List of LaTeX lines
+    """
+    return [
+        r"\end{tikzpicture}",
+        "",
+        r"\vspace{0.5em}",
+        "",
+        r"\small{\textit{Red circles indicate days with scheduled events}}",
+        r"\end{center}",
+        "",
+        r"\vspace{0.8em}",
+        "",
+    ]
+
+
+def generate_calendars(months: List[Dict[str, Any]], event_dates: Set[date], cache: Optional[FragmentStore] = None,
+                       event_dates_by_month: Optional[Dict[Tuple[int, int], List[date]]] = None,
+                       pending: Optional[Dict[Tuple[int, int], Future]] = None) -> Iterator[str]:
+    """
+    Generate mini calendars section with highlighted event days.
+    
+    Args:
+        months: List of month dictionaries (year, month, name, date_obj)
+        event_dates: Set of dates with scheduled events
+        cache: Optional fragment store, such as a BuildCache, for per-month calendar fragments
+        event_dates_by_month: Pre-sorted dates keyed by (year, month), e.g. from
+                              ScheduleIndex; derived from event_dates if omitted
+        pending: Calendars already being rendered in a process pool, keyed by
+                 (year, month); their lines are used instead of rendering here
         
-        lines.append(";")
-        lines.append("")
+    Yields:
+        LaTeX lines for calendar section
+    """
+    yield r"% Mini Calendars"
+    yield r"\begin{center}"
+    yield from calendar_picture_begin()
+    
+    if event_dates_by_month is None:
+        event_dates_by_month = group_dates_by_month(event_dates)
     
-    lines.append(r"\end{tikzpicture}")
-    lines.append("")
-    lines.append(r"\vspace{0.5em}")
-    lines.append("")
-    lines.append(r"\small{\textit{Red circles indicate days with scheduled events}}")
-    lines.append(r"\end{center}")
-    lines.append("")
-    lines.append(r"\vspace{0.8em}")
-    lines.append("")
+    for idx, month in enumerate(months):
+        month_event_dates = event_dates_by_month.get((month['year'], month['month']), [])
+        future = pending.get((month['year'], month['month'])) if pending else None
+        render: Callable[[], Iterable[str]]
+        if future is not None:
+            render = future.result
+        else:
+            render = lambda: generate_month_calendar(idx, month, month_event_dates)
+        if cache is not None:
+            yield from cache.fragment('calendar', calendar_payload(idx, month, month_event_dates), render)
+            if future is not None:
+                # Stored by a concurrent build after the pool started: its copy is not needed
+                future.cancel()
+        else:
+            yield from render()
     
-    return lines
+    yield from calendar_section_end()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Clash Detection
+Finds double-booked rooms and overlapping events of the same subject
+"""
+
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from . import config
+from .event_processor import parse_event_date, resolve_event, resolve_exam_event
+from .records import Event, load_subjects
+from .table_generators import event_row
+
+
+class TimedEvent(NamedTuple):
+    """An event with a known start time, as an interval."""
+    position: int
+    start: datetime
+    end: datetime
+    event: Dict[str, Any]
+
+
+class Clash(NamedTuple):
+    """Two events that overlap in the same room or for the same subject."""
+    kind: str  # 'room' or 'subject'
+    key: str  # Room name or subject key
+    first: TimedEvent
+    second: TimedEvent
+
+
+class IntervalIndex:
+    """
+    Intervals grouped by key, for finding every overlapping pair.
+
+    Each group is sorted by start once and swept with a heap of the
+    intervals still running, so n intervals with k overlapping pairs take
+    O(n log n + k) time rather than comparing every pair.
+    """
+
+    def __init__(self) -> None:
+        self._groups: Dict[str, List[TimedEvent]] = defaultdict(list)
+
+    def add(self, key: str, interval: TimedEvent) -> None:
+        """
+        Add an interval to a group.
+
+        Args:
+            key: Group key, such as a room name or subject key
+            interval: Timed event
+        """
+        self._groups[key].append(interval)
+
+    def overlaps(self) -> Iterator[Tuple[str, TimedEvent, TimedEvent]]:
+        """
+        Find every pair of overlapping intervals within each group.
+
+        Intervals that only touch (one ends when the other starts) do not
+        overlap, so zero-length events never clash. The pairs of an
+        interval come in heap order, not sorted, so callers that need a
+        stable order sort the result.
+
+        Yields:
+            Tuples of (key, earlier interval, later interval)
+        """
+        for key, intervals in self._groups.items():
+            intervals.sort(key=lambda interval: (interval.start, interval.end, interval.position))
+            running: List[Tuple[datetime, int, TimedEvent]] = []
+            for interval in intervals:
+                while running and running[0][0] <= interval.start:
+                    heapq.heappop(running)
+                if interval.start < interval.end:
+                    for _, _, earlier in running:
+                        yield key, earlier, interval
+                    heapq.heappush(running, (interval.end, interval.position, interval))
+
+
+@lru_cache(maxsize=65536)
+def _event_start(date_str: str, time_str: str) -> Optional[datetime]:
+    # Schedules repeat the same few dates and times, so each pair is parsed once
+    date_obj = parse_event_date(date_str)
+    if date_obj is None:
+        return None
+    try:
+        start_time = datetime.strptime(time_str, config.TIME_FORMAT)
+    except ValueError:
+        return None
+    return date_obj.replace(hour=start_time.hour, minute=start_time.minute)
+
+
+def find_clashes(events: Iterable[Dict[str, Any]], subjects: Dict[str, Dict[str, str]],
+                 default_duration: int = config.DEFAULT_EVENT_DURATION) -> List[Clash]:
+    """
+    Find double-booked rooms and overlapping events of the same subject.
+
+    Events without a valid date and time cannot clash. An event lasts its
+    'duration' in minutes, or default_duration if it has none; events
+    without a room (and no default room) are only checked per subject.
+
+    Args:
+        events: Iterable of event dictionaries, consumed in a single pass
+        subjects: Dictionary of subject information
+        default_duration: Minutes assumed for events without a 'duration'
+
+    Returns:
+        Clashes ordered by start time
+    """
+    rooms = IntervalIndex()
+    subject_intervals = IntervalIndex()
+    for position, event in enumerate(events):
+        start = _event_start(event.get('date', ''), event.get('time') or '')
+        if start is None:
+            continue
+        duration = event.get('duration')
+        if duration is None:
+            duration = default_duration
+        interval = TimedEvent(position, start, start + timedelta(minutes=duration), event)
+
+        subject_key = event['subject']
+        subject_intervals.add(subject_key, interval)
+        room = event.get('room') or subjects.get(subject_key, {}).get('default_room', '')
+        if room:
+            rooms.add(room, interval)
+
+    clashes = [Clash('room', room, first, second) for room, first, second in rooms.overlaps()]
+    clashes += [Clash('subject', key, first, second) for key, first, second in subject_intervals.overlaps()]
+    clashes.sort(key=lambda clash: (clash.second.start, clash.first.position, clash.second.position, clash.kind))
+    return clashes
+
+
+def _describe(interval: TimedEvent) -> str:
+    event = interval.event
+    return (f"#{interval.position + 1} {interval.start:%Y-%m-%d %H:%M}-{interval.end:%H:%M} "
+            f"{event['type']} ({event['subject']})")
+
+
+def format_clash(clash: Clash) -> str:
+    """
+    Describe a clash on a single line.
+
+    Args:
+        clash: Clash from find_clashes
+
+    Returns:
+        Human-readable description
+    """
+    label = f"Room '{clash.key}'" if clash.kind == 'room' else f"Subject '{clash.key}'"
+    return f"{label}: {_describe(clash.first)} overlaps {_describe(clash.second)}"
+
+
+def print_clash_report(clashes: List[Clash]) -> None:
+    """
+    Print every clash, or a note that there are none.
+
+    Args:
+        clashes: Clashes from find_clashes
+    """
+    if not clashes:
+        print("No clashes found")
+        return
+    print(f"Found {len(clashes)} clash{'es' if len(clashes) != 1 else ''}:")
+    for clash in clashes:
+        print(f"  {format_clash(clash)}")
+
+
+def clashing_events(clashes: Iterable[Clash], subjects: Dict[str, Any]) -> Set[Event]:
+    """
+    Event records of every event involved in a clash.
+
+    Args:
+        clashes: Clashes from find_clashes
+        subjects: Dictionary of subject information or Subject records
+
+    Returns:
+        Set of records equal to the ones the tables are generated from
+    """
+    subject_records = load_subjects(subjects)
+    records = set()
+    for clash in clashes:
+        for interval in (clash.first, clash.second):
+            event = interval.event
+            date_obj = parse_event_date(event['date'])
+            if date_obj is None:
+                # Only events with a valid date and time can clash
+                continue
+            if event.get('section') == 'Exam Period':
+                records.add(resolve_exam_event(event, date_obj, subject_records))
+            else:
+                records.add(resolve_event(event, date_obj, subject_records))
+    return records
+
+
+def clash_row_renderer(clashing: Set[Event]) -> Callable[[Event], str]:
+    """
+    Row renderer that marks clashing events.
+
+    Args:
+        clashing: Records from clashing_events
+
+    Returns:
+        Callable to pass as the row renderer of the table generators
+    """
+    def row(event: Event) -> str:
+        return event_row(event, event in clashing)
+    return row
+
+
+def mark_clashes(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Callable[[Event], str]]:
+    """
+    Detect clashes in loaded schedule data and build a marking row renderer.
+
+    The events are read into a list first, since they are needed both for
+    clash detection and for the document.
+
+    Args:
+        data: Schedule data; 'events' may be a lazy iterator
+
+    Returns:
+        Tuple of (data with the events as a list, row renderer)
+    """
+    events = list(data['events'])
+    clashes = find_clashes(events, data['subjects'])
+    print_clash_report(clashes)
+    return dict(data, events=events), clash_row_renderer(clashing_events(clashes, data['subjects']))
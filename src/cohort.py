@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Cohort Renderer
+Renders one schedule per student from a master schedule, sharing fragments
+"""
+
+import asyncio
+import heapq
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from . import config
+from .batch import BatchJobResult
+from .compile_progress import ProgressCallback
+from .data_loader import ScheduleIndex, get_calendar_months
+from .date_window import DateWindow, filter_events, window_schedule_info
+from .document_builder import write_schedule_index
+from .event_processor import parse_event_date, resolve_event, resolve_exam_event
+from .pdf_compiler import compile_pdfs_async
+from .preamble_format import ensure_preamble_format
+from .records import Event, load_subjects
+from .stream_loader import load_schedule_stream
+from .table_generators import event_row
+from .tracing import span, counter
+from .warm_pool import WarmPool
+
+
+class SharedFragments:
+    """
+    In-memory fragment store shared by the documents of a cohort.
+
+    It implements FragmentStore, like BuildCache. Only calendars are
+    stored whole, since many students share a month's event days; month
+    tables differ per student and are assembled from shared rows instead.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._fragments: Dict[str, List[str]] = {}
+
+    def fragment(self, kind: str, payload: Any, render: Callable[[], Iterable[str]]) -> Iterator[str]:
+        """
+        Return a stored calendar fragment, rendering it on first use.
+
+        Args:
+            kind: Fragment kind (e.g. 'month_table', 'calendar')
+            payload: JSON-serializable data the fragment is rendered from
+            render: Callable producing the fragment lines
+
+        Returns:
+            Iterator over the fragment lines
+        """
+        if kind != 'calendar':
+            return iter(render())
+        key = json.dumps(payload, default=str)
+        lines = self._fragments.get(key)
+        if lines is None:
+            self.misses += 1
+            lines = self._fragments[key] = list(render())
+        else:
+            self.hits += 1
+        return iter(lines)
+
+    def has_fragment(self, kind: str, payload: Any) -> bool:
+        """
+        Whether a calendar fragment has been rendered for an earlier document.
+
+        Args:
+            kind: Fragment kind (e.g. 'month_table', 'calendar')
+            payload: JSON-serializable data the fragment is rendered from
+
+        Returns:
+            True if fragment() would return stored lines
+        """
+        return kind == 'calendar' and json.dumps(payload, default=str) in self._fragments
+
+
+class CohortRenderer:
+    """
+    Renders per-student schedules from one master schedule.
+
+    The master events are parsed, resolved and sorted once. Every distinct
+    event row and calendar month is rendered once and shared by all the
+    documents that contain it; a student's document is assembled by merging
+    the pre-sorted events of their subjects. Each document is byte-identical
+    to rendering a schedule that contains only that student's subjects.
+
+    Attributes:
+        schedule_info: Schedule title, period and date range
+        subjects: Subject records keyed by subject key
+        months: Calendar months in the schedule period
+        fragments: Calendar fragments shared across students
+    """
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """
+        Args:
+            data: Master schedule data as returned by load_schedule_data;
+                  'events' may be any iterable
+        """
+        self.schedule_info: Dict[str, Any] = data['schedule_info']
+        self.subjects = load_subjects(data['subjects'])
+        self.months = get_calendar_months(self.schedule_info['start_date'], self.schedule_info['end_date'])
+        self.fragments = SharedFragments()
+        self._rows: Dict[Event, str] = {}
+
+        table_events: List[Tuple[Event, int, str]] = []
+        self._exam_events: Dict[str, List[Tuple[int, Event]]] = defaultdict(list)
+        self._event_counts: Dict[str, int] = defaultdict(int)
+        with span('index_master_events'):
+            for position, event in enumerate(data['events']):
+                subject_key = event['subject']
+                self._event_counts[subject_key] += 1
+                date_obj = parse_event_date(event.get('date', ''))
+                if event.get('section') == 'Exam Period':
+                    self._exam_events[subject_key].append((position, resolve_exam_event(event, date_obj, self.subjects)))
+                elif date_obj is not None:
+                    table_events.append((resolve_event(event, date_obj, self.subjects), position, subject_key))
+
+            # One global (date, time) order; ties keep input order like the per-document sort
+            table_events.sort(key=lambda item: (item[0].date, item[0].time, item[1]))
+            self._events: List[Event] = [event for event, _, _ in table_events]
+            self._ranks: Dict[str, List[int]] = defaultdict(list)
+            for rank, (_, _, subject_key) in enumerate(table_events):
+                self._ranks[subject_key].append(rank)
+        counter('cohort_events', table=len(self._events), distinct=len(set(self._events)))
+
+    @property
+    def distinct_rows(self) -> int:
+        """Number of table rows rendered so far."""
+        return len(self._rows)
+
+    def row(self, event: Event) -> str:
+        """
+        Table row of an event, rendered once per distinct event.
+
+        Args:
+            event: Event record
+
+        Returns:
+            Row text as produced by event_row
+        """
+        text = self._rows.get(event)
+        if text is None:
+            text = self._rows[event] = event_row(event)
+        return text
+
+    def student_index(self, subject_keys: Iterable[str]) -> ScheduleIndex:
+        """
+        Index of the master events that belong to the given subjects.
+
+        Args:
+            subject_keys: Subject keys the student is enrolled in
+
+        Returns:
+            ScheduleIndex for the student's schedule
+
+        Raises:
+            ValueError: If a subject key is not in the master subjects table
+        """
+        subject_keys = list(dict.fromkeys(subject_keys))
+        for subject_key in subject_keys:
+            if subject_key not in self.subjects:
+                raise ValueError(f"Unknown subject '{subject_key}'")
+
+        events_by_month: Dict[Tuple[int, int], List[Event]] = defaultdict(list)
+        event_dates = set()
+        for rank in heapq.merge(*(self._ranks.get(key, []) for key in subject_keys)):
+            event = self._events[rank]
+            date_obj = event.date
+            if date_obj is None:
+                # Only dated events are indexed for the tables
+                continue
+            events_by_month[(date_obj.year, date_obj.month)].append(event)
+            event_dates.add(date_obj.date())
+
+        exam_events = [event for _, event in heapq.merge(*(self._exam_events.get(key, []) for key in subject_keys))]
+        for event in exam_events:
+            if event.date is not None:
+                event_dates.add(event.date.date())
+
+        return ScheduleIndex.from_records(
+            self.schedule_info, self.subjects, self.months, events_by_month, exam_events, event_dates,
+            sum(self._event_counts.get(key, 0) for key in subject_keys),
+        )
+
+    def write_student(self, subject_keys: Iterable[str], sink: TextIO, pdf_mode: str = config.PDF_MODE) -> int:
+        """
+        Stream one student's LaTeX document to a file-like sink.
+
+        Args:
+            subject_keys: Subject keys the student is enrolled in
+            sink: File-like object the document is written to
+            pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+
+        Returns:
+            Number of lines written
+
+        Raises:
+            ValueError: If a subject key is not in the master subjects table
+        """
+        index = self.student_index(subject_keys)
+        return write_schedule_index(index, sink, self.fragments, row=self.row, pdf_mode=pdf_mode)
+
+
+def load_cohort_selection(selection_file: str) -> Dict[str, List[str]]:
+    """
+    Load the per-student subject selection.
+
+    The file is a JSON object mapping each student name to the list of
+    subject keys they are enrolled in. Names become output file names.
+
+    Args:
+        selection_file: Path to the selection JSON file
+
+    Returns:
+        Subject keys per student, in file order
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file is not a valid selection
+    """
+    if not os.path.exists(selection_file):
+        raise FileNotFoundError(f"Cohort selection file '{selection_file}' not found")
+    with open(selection_file, 'r', encoding='utf-8') as f:
+        try:
+            selection = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON format in '{selection_file}': {e}")
+
+    if not isinstance(selection, dict):
+        raise ValueError("Cohort selection must be an object mapping student names to subject lists")
+    for student, subject_keys in selection.items():
+        if not student or student != os.path.basename(student) or student.startswith('.'):
+            raise ValueError(f"Student name '{student}' cannot be used as a file name")
+        if not isinstance(subject_keys, list) or not all(isinstance(key, str) for key in subject_keys):
+            raise ValueError(f"Subjects of student '{student}' must be a list of subject keys")
+    return selection
+
+
+def run_cohort(json_file: str, selection_file: str, output_dir: str, compile_jobs: Optional[int] = None,
+               use_format: bool = config.USE_PREAMBLE_FORMAT, compile_pdf: bool = True,
+               warm_pool: bool = config.WARM_POOL, pdf_mode: str = config.PDF_MODE,
+               window: Optional[DateWindow] = None,
+               progress: Optional[ProgressCallback] = None) -> List[BatchJobResult]:
+    """
+    Render a schedule for every student in a cohort.
+
+    Args:
+        json_file: Master schedule JSON or JSON Lines file with every subject
+        selection_file: JSON object mapping student names to subject keys
+        output_dir: Directory for the generated <student>.tex and .pdf files
+        compile_jobs: Maximum concurrent pdflatex processes (defaults to CPU count)
+        use_format: Compile from the precompiled preamble format
+        compile_pdf: Also compile the documents with pdflatex
+        warm_pool: Compile on pdflatex processes that have already loaded the preamble
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+        window: Only render the events and calendar months inside this date range
+        progress: Receives the CompileProgress of every pdflatex job
+
+    Returns:
+        Per-student results in selection order; the json_file field holds
+        the student name
+
+    Raises:
+        FileNotFoundError: If an input file doesn't exist
+        ValueError: If the input data or selection is invalid, or the window
+                    lies outside the schedule period
+    """
+    selection = load_cohort_selection(selection_file)
+    header, events = load_schedule_stream(json_file)
+    if window is not None:
+        # Narrowing the master schedule once keeps every student's document in the window
+        header = dict(header, schedule_info=window_schedule_info(header['schedule_info'], window))
+        events = filter_events(events, window)
+    renderer = CohortRenderer(dict(header, events=events))
+    os.makedirs(output_dir, exist_ok=True)
+
+    results: Dict[str, BatchJobResult] = {}
+    tex_files: Dict[str, str] = {}
+    seconds: Dict[str, float] = {}
+    with span('render_cohort', students=len(selection)):
+        for student, subject_keys in selection.items():
+            started = time.perf_counter()
+            tex_file = os.path.join(output_dir, f"{student}.tex")
+            pdf_file = os.path.join(output_dir, f"{student}.pdf")
+            try:
+                with open(tex_file, 'w', encoding='utf-8') as f:
+                    renderer.write_student(subject_keys, f, pdf_mode)
+            except ValueError as e:
+                os.remove(tex_file)
+                results[student] = BatchJobResult(student, pdf_file, False, False, str(e),
+                                                  time.perf_counter() - started)
+                continue
+            tex_files[student] = tex_file
+            seconds[student] = time.perf_counter() - started
+    print(f"Rendered {len(tex_files)} documents, {renderer.distinct_rows} distinct rows, "
+          f"calendar fragments: {renderer.fragments.misses} rendered, {renderer.fragments.hits} shared")
+
+    if compile_pdf and tex_files:
+        if use_format and ensure_preamble_format(pdf_mode=pdf_mode) is None:
+            use_format = False
+        jobs = compile_jobs or config.BATCH_COMPILE_JOBS or os.cpu_count() or 1
+        print(f"\nCompiling {len(tex_files)} documents with up to {jobs} pdflatex processes...")
+        if warm_pool:
+            with WarmPool(jobs, pdf_mode=pdf_mode) as pool:
+                compiled = asyncio.run(compile_pdfs_async(list(tex_files.values()), max_concurrency=jobs, pool=pool,
+                                                          progress=progress))
+        else:
+            compiled = asyncio.run(compile_pdfs_async(list(tex_files.values()), max_concurrency=jobs,
+                                                      use_format=use_format, progress=progress, pdf_mode=pdf_mode))
+        for student, result in zip(tex_files, compiled):
+            error = '' if result.success else ('PDF compilation timed out' if result.timed_out else 'PDF compilation failed')
+            results[student] = BatchJobResult(student, result.pdf_file, result.success, False, error,
+                                              seconds[student] + result.duration)
+    else:
+        for student, tex_file in tex_files.items():
+            results[student] = BatchJobResult(student, os.path.splitext(tex_file)[0] + '.pdf', True, False, '',
+                                              seconds[student])
+
+    return [results[student] for student in selection]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Columnar Event Backend
+Vectorized event grouping and sorting with NumPy for very large schedules
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Set, Tuple
+
+from .event_processor import parse_event_date, resolve_exam_event
+from .records import Event, Subject, format_event_date, intern_text, load_subjects, unknown_subject
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+
+class _Interner:
+    """Maps strings to dense integer codes."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def _parse_days(date_strs: List[str]) -> 'np.ndarray':
+    """
+    Parse YYYY-MM-DD strings into a datetime64[D] array, with NaT for TBA and invalid dates.
+
+    Uniformly formatted input is converted in one vectorized call. Anything
+    else falls back to strptime per element so the accepted inputs match the
+    dict backend exactly.
+    """
+    cleaned = ['NaT' if not s or s == 'TBA' else s for s in date_strs]
+    if not cleaned:
+        return np.array([], dtype='datetime64[D]')
+    strings = np.array(cleaned)
+    well_formed = (np.char.str_len(strings) == 10) | (strings == 'NaT')
+    if well_formed.all():
+        try:
+            return strings.astype('datetime64[D]')
+        except ValueError:
+            pass
+
+    days = np.empty(len(cleaned), dtype='datetime64[D]')
+    for i, date_str in enumerate(cleaned):
+        try:
+            days[i] = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            days[i] = np.datetime64('NaT')
+    return days
+
+
+class ColumnarEvents:
+    """
+    Column-oriented store of schedule events.
+
+    Dates are held as datetime64[D] arrays, times as a rank that preserves
+    the string ordering used by the dict backend, and subjects, rooms and
+    event types as interned integer codes. Month grouping, the (date, time)
+    sort and the set of event dates are computed with vectorized operations;
+    Python objects are only created for the final table rows.
+
+    Attributes:
+        event_count: Number of events in the input
+        exam_events: Exam period event records in input order
+        days: Event dates of table events (NaT for TBA/invalid)
+        time_rank: Position of each time string in sorted string order
+        subject_codes: Interned subject keys of table events
+        room_codes: Interned resolved rooms of table events
+        type_codes: Interned event types of table events
+    """
+
+    def __init__(self, events: Iterable[Dict[str, Any]], subjects: Mapping[str, Any]) -> None:
+        """
+        Args:
+            events: Iterable of event dictionaries, consumed in a single pass
+            subjects: Dictionary of subject information or Subject records
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if not HAS_NUMPY:
+            raise ImportError("The columnar event backend requires NumPy (pip install numpy)")
+
+        self.subjects: Dict[str, Subject] = load_subjects(subjects)
+        self.event_count = 0
+        self.exam_events: List[Event] = []
+        self._subjects = _Interner()
+        self._rooms = _Interner()
+        self._types = _Interner()
+
+        date_strs: List[str] = []
+        exam_date_strs: List[str] = []
+        times: List[str] = []
+        subject_codes: List[int] = []
+        room_codes: List[int] = []
+        type_codes: List[int] = []
+
+        for event in events:
+            self.event_count += 1
+            # Handle exam period separately
+            if event.get('section') == 'Exam Period':
+                self.exam_events.append(resolve_exam_event(event, parse_event_date(event.get('date', '')), self.subjects))
+                exam_date_strs.append(event.get('date', ''))
+                continue
+
+            subject_key = event['subject']
+            subject = self.subjects.get(subject_key) or unknown_subject(subject_key)
+            date_strs.append(event['date'])
+            times.append(intern_text(event.get('time', '')))
+            subject_codes.append(self._subjects.code(subject_key))
+            room_codes.append(self._rooms.code(intern_text(event.get('room')) or subject.default_room))
+            type_codes.append(self._types.code(intern_text(event['type'])))
+
+        self.days = _parse_days(date_strs)
+        self._exam_days = _parse_days(exam_date_strs)
+        self._times = times
+        if times:
+            _, inverse = np.unique(np.array(times), return_inverse=True)
+            self.time_rank = inverse.reshape(-1).astype(np.int32)
+        else:
+            self.time_rank = np.array([], dtype=np.int32)
+        self.subject_codes = np.array(subject_codes, dtype=np.int32)
+        self.room_codes = np.array(room_codes, dtype=np.int32)
+        self.type_codes = np.array(type_codes, dtype=np.int32)
+
+    def sorted_rows(self) -> 'np.ndarray':
+        """
+        Row indices of dated table events in (date, time) order.
+
+        Ties keep input order, matching Python's stable sort.
+
+        Returns:
+            Array of row indices
+        """
+        rows = np.flatnonzero(~np.isnat(self.days))
+        order = np.lexsort((rows, self.time_rank[rows], self.days[rows]))
+        return rows[order]
+
+    def event_dates(self) -> Set[date]:
+        """
+        Set of all dates with events, including the exam period.
+
+        Returns:
+            Set of date objects, equal to get_event_dates()
+        """
+        all_days = np.concatenate([self.days, self._exam_days])
+        unique_days = np.unique(all_days[~np.isnat(all_days)])
+        return set(unique_days.tolist())
+
+    def events_by_month(self) -> Dict[Tuple[int, int], List[Event]]:
+        """
+        Table events grouped by month and sorted by (date, time).
+
+        Returns:
+            Dictionary equal to the first element of group_events_by_month()
+        """
+        rows = self.sorted_rows()
+        if len(rows) == 0:
+            return {}
+        months = self.days[rows].astype('datetime64[M]').astype(np.int64)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(months)) + 1])
+        ends = np.concatenate([starts[1:], [len(rows)]])
+
+        day_values = self.days[rows].tolist()
+        subject_records = [self.subjects.get(key) or unknown_subject(key) for key in self._subjects.values]
+        date_cache: Dict[date, Tuple[datetime, str]] = {}
+
+        grouped: Dict[Tuple[int, int], List[Event]] = {}
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            month_value = int(months[start])
+            month_key = (1970 + month_value // 12, month_value % 12 + 1)
+            month_events = []
+            for pos in range(start, end):
+                row = int(rows[pos])
+                day = day_values[pos]
+                cached = date_cache.get(day)
+                if cached is None:
+                    date_obj = datetime(day.year, day.month, day.day)
+                    cached = (date_obj, format_event_date(date_obj))
+                    date_cache[day] = cached
+                subject = subject_records[self.subject_codes[row]]
+                month_events.append(Event(
+                    cached[0],
+                    self._times[row],
+                    self._types.values[self.type_codes[row]],
+                    subject.name,
+                    subject.code,
+                    self._rooms.values[self.room_codes[row]],
+                    cached[1],
+                ))
+            grouped[month_key] = month_events
+        return grouped
+
+
+def group_events_by_month_columnar(events: Iterable[Dict[str, Any]], subjects: Mapping[str, Any]) -> Tuple[Dict[Tuple[int, int], List[Event]], List[Event]]:
+    """
+    Columnar equivalent of group_events_by_month.
+
+    Args:
+        events: Iterable of event dictionaries
+        subjects: Dictionary of subject information or Subject records
+
+    Returns:
+        Tuple of (events_by_month dict, exam_period_events list) of Event records
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    columns = ColumnarEvents(events, subjects)
+    return columns.events_by_month(), columns.exam_events
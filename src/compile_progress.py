@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Compile Progress
+Tracks pdflatex progress from the pages it ships out and reports it to callbacks
+"""
+
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO
+
+from . import config
+
+# pdflatex prints '[<page>' when it ships a page out
+PAGE_MARKER = re.compile(r'\[(\d+)(?=\D)')
+
+# Page count reported at the end of a pdflatex log
+PAGE_COUNT = re.compile(r'Output written on .*?\((\d+) pages?', re.DOTALL)
+
+# A document's month headings, e.g. '% November 2025', in the calendars and before each table
+MONTH_COMMENT = re.compile(r'% [A-Z][a-z]+ \d{4}$')
+
+
+class CompileProgress(NamedTuple):
+    """Progress of one pdflatex job."""
+    tex_file: str
+    page: int
+    expected_pages: int
+    pass_number: int
+    elapsed: float
+    done: bool = False
+
+    @property
+    def fraction(self) -> float:
+        """Share of the pass completed; below 1 until pdflatex has finished."""
+        if self.done:
+            return 1.0
+        return min(self.page / max(self.expected_pages, 1), 0.99)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left in this pass at the rate so far, or None before the first page."""
+        if self.done:
+            return 0.0
+        if not self.page:
+            return None
+        return self.elapsed * (1 - self.fraction) / self.fraction
+
+
+# Receives every progress update; may be called from a worker thread
+ProgressCallback = Callable[[CompileProgress], None]
+
+
+def expected_pages(calendar_months: int, table_rows: List[int]) -> int:
+    """
+    Number of pages a schedule is expected to have.
+
+    The calendars fill config.CALENDARS_PER_ROW months per row and
+    config.PROGRESS_CALENDAR_ROWS_PER_PAGE rows per page, and the first
+    table starts below them. Every later table starts a new page. Tables
+    hold about config.PROGRESS_ROWS_PER_PAGE rows per page.
+
+    Args:
+        calendar_months: Months shown in the calendars
+        table_rows: Rows of each table, in document order
+
+    Returns:
+        Estimated page count, at least 1
+    """
+    per_page = config.CALENDARS_PER_ROW * config.PROGRESS_CALENDAR_ROWS_PER_PAGE
+    pages = max(1, math.ceil(calendar_months / per_page))
+    for number, rows in enumerate(table_rows):
+        table_pages = max(1, math.ceil(rows / config.PROGRESS_ROWS_PER_PAGE))
+        pages += table_pages - 1 if number == 0 else table_pages
+    return pages
+
+
+def estimate_pages(tex_file: str, last_log: str = '') -> int:
+    """
+    Number of pages expected when compiling a generated document.
+
+    The page count from the last build's log is used when there is one;
+    otherwise the calendar months and table rows of the .tex file are
+    counted (see expected_pages).
+
+    Args:
+        tex_file: Path to the .tex file
+        last_log: pdflatex log of the last build, or an empty string
+
+    Returns:
+        Estimated page count, at least 1
+    """
+    match = PAGE_COUNT.search(last_log)
+    if match:
+        return max(1, int(match.group(1)))
+
+    calendar_months = 0
+    table_rows: List[int] = []
+    in_table = False
+    with open(tex_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.startswith(r'\begin{longtable}'):
+                in_table = True
+                table_rows.append(0)
+            elif line.startswith(r'\end{longtable}'):
+                in_table = False
+            elif in_table:
+                if r'\donebox' in line:
+                    table_rows[-1] += 1
+            elif not table_rows and MONTH_COMMENT.match(line):
+                calendar_months += 1
+    return expected_pages(calendar_months, table_rows)
+
+
+class PageTracker:
+    """
+    Follows one pdflatex pass through its terminal output.
+
+    Output is fed in chunks as it arrives. pdflatex wraps its terminal
+    output at a fixed width, which can split a page marker, so line breaks
+    are dropped before matching. Pages are only counted in order, which
+    ignores bracketed numbers in warnings.
+    """
+
+    def __init__(self, tex_file: str, expected: int, callback: ProgressCallback, pass_number: int = 1) -> None:
+        """
+        Args:
+            tex_file: Path to the .tex file being compiled
+            expected: Pages expected in the finished PDF
+            callback: Receives an update for every page and at the end
+            pass_number: Number of this pass, starting at 1
+        """
+        self.tex_file = tex_file
+        self.expected = expected
+        self.callback = callback
+        self.pass_number = pass_number
+        self.page = 0
+        self._started = time.perf_counter()
+        self._tail = ''
+
+    def _report(self, done: bool = False) -> None:
+        self.callback(CompileProgress(self.tex_file, self.page, self.expected, self.pass_number,
+                                      time.perf_counter() - self._started, done))
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Scan a chunk of terminal output for shipped-out pages.
+
+        Args:
+            chunk: Bytes read from pdflatex's stdout
+        """
+        text = self._tail + chunk.decode('utf-8', errors='replace').replace('\r', '').replace('\n', '')
+        for match in PAGE_MARKER.finditer(text):
+            if int(match.group(1)) == self.page + 1:
+                self.page += 1
+                if self.page > self.expected:
+                    # The estimate was too low; keep the bar moving
+                    self.expected = self.page + 1
+                self._report()
+        # Keep a possibly incomplete marker for the next chunk
+        self._tail = text[-16:]
+
+    def finish(self) -> None:
+        """Report the end of the pass."""
+        self.expected = max(self.page, 1)
+        self._report(done=True)
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '--'
+    seconds = int(round(seconds))
+    return f"{seconds // 60}:{seconds % 60:02d}" if seconds >= 60 else f"{seconds}s"
+
+
+class TerminalProgress:
+    """
+    Progress callback drawing a bar for one job, or a status line for several.
+
+    Nothing is drawn unless the stream is a terminal, so redirected output
+    and CI logs stay clean. Updates may come from several threads.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        """
+        Args:
+            stream: Stream to draw on (defaults to sys.stdout)
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.enabled = self.stream.isatty()
+        self._jobs: Dict[str, CompileProgress] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, progress: CompileProgress) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if progress.done:
+                self._jobs.pop(progress.tex_file, None)
+            else:
+                self._jobs[progress.tex_file] = progress
+            if len(self._jobs) > 1:
+                line = self._status_line()
+            else:
+                line = self._bar(next(iter(self._jobs.values()), progress))
+            width = shutil.get_terminal_size().columns - 1
+            self.stream.write('\r' + line[:width].ljust(width))
+            if not self._jobs:
+                self.stream.write('\n')
+            self.stream.flush()
+
+    def _bar(self, progress: CompileProgress) -> str:
+        bar_length = config.LOADING_BAR_LENGTH
+        filled = int(progress.fraction * bar_length)
+        bar = config.LOADING_BAR_FILLED_CHAR * filled + config.LOADING_BAR_EMPTY_CHAR * (bar_length - filled)
+        passes = f", pass {progress.pass_number}" if progress.pass_number > 1 else ''
+        return (f"{bar} {progress.fraction * 100:3.0f}% page {progress.page}/{progress.expected_pages}{passes} "
+                f"ETA {_format_seconds(progress.eta)}")
+
+    def _status_line(self) -> str:
+        jobs = sorted(self._jobs.values(), key=lambda progress: progress.tex_file)
+        return f"{len(jobs)} compiling: " + ', '.join(
+            f"{os.path.splitext(os.path.basename(progress.tex_file))[0]} {progress.fraction * 100:.0f}% "
+            f"ETA {_format_seconds(progress.eta)}"
+            for progress in jobs
+        )
+
+
+def terminal_progress(quiet: bool = False) -> Optional[TerminalProgress]:
+    """
+    Progress display for stdout, if it is a terminal.
+
+    Args:
+        quiet: Never draw progress
+
+    Returns:
+        A TerminalProgress callback, or None when nothing would be shown
+    """
+    if quiet or not sys.stdout.isatty():
+        return None
+    return TerminalProgress()
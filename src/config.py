@@ -3,7 +3,7 @@ Configuration Module
 Centralized configuration for the schedule generator
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Default file paths
 DEFAULT_JSON_FILE = 'schedule_data.json'
@@ -13,14 +13,43 @@ DEFAULT_OUTPUT_FILE = 'Academic Schedule.tex'
 PDF_COMPILER = 'pdflatex'
 PDF_COMPILER_OPTIONS = ['-interaction=nonstopmode']
 
-# Loading bar settings
+# Seconds before an asynchronous pdflatex job is killed (None for no limit)
+COMPILE_TIMEOUT: Optional[float] = 120.0
+
+# Progress bar settings
 LOADING_BAR_LENGTH = 30
 LOADING_BAR_FILLED_CHAR = '█'
 LOADING_BAR_EMPTY_CHAR = '░'
-LOADING_BAR_DELAY = 0.05  # seconds
 
-# LaTeX auxiliary file extensions to clean up
-AUX_FILE_EXTENSIONS = ['.aux', '.log', '.out']
+# Compile progress is measured in pages; until a build has reported its page count,
+# pages are estimated from the calendar months and table rows of the document
+PROGRESS_ROWS_PER_PAGE = 20
+PROGRESS_CALENDAR_ROWS_PER_PAGE = 2
+
+# Characters read per chunk by the streaming schedule loader
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Characters buffered by the streaming LaTeX writer before each write
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Multi-pass compilation: auxiliary files are kept in a hidden per-document
+# build directory next to the .tex file, e.g. '.Academic Schedule.build'
+COMPILE_BUILD_DIR_SUFFIX = '.build'
+COMPILE_MAX_PASSES = 4
+RERUN_LOG_PATTERNS = ['Rerun to get', 'Rerun LaTeX', 'Label(s) may have changed']
+
+# Renderer: 'latex' (pdflatex, high fidelity) or 'draft' (pure-Python PDF preview)
+RENDERER = 'latex'
+
+# PDF output: 'standard' (hyperref form checkboxes), 'lean' (compressed object
+# streams, checkboxes sharing appearance streams) or 'glyph' (lean, printed boxes)
+PDF_MODE = 'standard'
+
+# Event grouping backend: 'dict' (standard library) or 'columnar' (requires NumPy)
+EVENT_BACKEND = 'dict'
+
+# Minutes assumed for events without a 'duration' field when checking for clashes
+DEFAULT_EVENT_DURATION = 90
 
 # Date format for JSON input
 DATE_FORMAT = '%Y-%m-%d'
@@ -39,3 +68,60 @@ COLUMN_WIDTHS: Dict[str, str] = {
 CALENDARS_PER_ROW = 3
 CALENDAR_X_SPACING = 10  # cm
 CALENDAR_Y_SPACING = 10  # cm
+
+# Build cache settings
+BUILD_CACHE_DIR = '.schedule_cache'
+# Size the cached fragments are pruned to, least recently used first; None keeps them all
+BUILD_CACHE_MAX_FRAGMENT_BYTES: Optional[int] = 64 * 1024 * 1024
+# Size the cached documents (.tex and PDF pairs) are pruned to, least recently used first; None keeps them all
+BUILD_CACHE_MAX_DOCUMENT_BYTES: Optional[int] = 256 * 1024 * 1024
+
+# Parsed-schedule cache, used for inputs of at least PARSED_CACHE_MIN_BYTES
+PARSED_CACHE = True
+PARSED_CACHE_SUFFIX = '.parsed'
+# Directory of the parsed-schedule cache; None uses the user's cache directory
+# ($XDG_CACHE_HOME or ~/.cache, under 'schedule-generator/parsed')
+PARSED_CACHE_DIR: Optional[str] = None
+PARSED_CACHE_MIN_BYTES = 1024 * 1024
+
+# Precompiled preamble format (opt-in, dumped with pdflatex -ini)
+USE_PREAMBLE_FORMAT = False
+PREAMBLE_FORMAT_DIR = '.schedule_cache/formats'
+
+# Warm pdflatex pool (opt-in): primed processes waiting for a document body
+WARM_POOL = False
+WARM_POOL_SIZE: Optional[int] = None  # idle workers; None means one per compile job
+
+# Calendar externalization (opt-in): per-month calendar PDFs shared by all builds
+EXTERNALIZE_CALENDARS = False
+CALENDAR_CACHE_DIR = '.schedule_cache/calendars'
+
+# Parallel fragment generation: calendars and month tables of schedules with at least
+# PARALLEL_FRAGMENTS_MIN_EVENTS events are rendered in a process pool
+PARALLEL_FRAGMENTS_MIN_EVENTS = 50000
+PARALLEL_FRAGMENT_WORKERS: Optional[int] = None  # None means one per CPU core
+
+# Batch rendering settings (None means one per CPU core)
+BATCH_RENDER_WORKERS: Optional[int] = None
+BATCH_COMPILE_JOBS: Optional[int] = None
+BATCH_OUTPUT_DIR = 'build'
+
+# Split compilation: sub-documents per pdflatex job, and PDF merge tools in order of preference
+SPLIT_PARTS_PER_JOB = 2
+PDF_MERGE_TOOLS = ['qpdf', 'pdfunite']
+
+# HTTP render service (--serve)
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8080
+SERVICE_WORKERS: Optional[int] = None
+SERVICE_CACHE_BYTES = 256 * 1024 * 1024
+SERVICE_MAX_REQUEST_BYTES = 16 * 1024 * 1024
+SERVICE_LATENCY_WINDOW = 1000  # most recent renders used for latency percentiles
+SERVICE_ACCESS_LOG = False
+
+# Chrome trace file written by --profile when no path is given
+PROFILE_OUTPUT_FILE = 'schedule_trace.json'
+
+# Watch mode settings (seconds)
+WATCH_POLL_INTERVAL = 0.5
+WATCH_DEBOUNCE = 0.3
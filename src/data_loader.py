@@ -5,8 +5,16 @@ Handles loading and processing of schedule data from JSON
 """
 
 import json
+from collections import defaultdict
 from datetime import datetime, date
-from typing import Dict, List, Set, Any
+from operator import attrgetter
+from typing import Dict, List, Set, Any, Tuple, Iterable
+
+from . import config
+from .records import Event, Subject, load_subjects
+from .event_processor import resolve_event, resolve_exam_event, bucket_events_by_day
+from .columnar import ColumnarEvents
+from .tracing import span, counter
 
 
 def load_schedule_data(json_file: str = 'schedule_data.json') -> Dict[str, Any]:
@@ -38,8 +46,21 @@ def load_schedule_data(json_file: str = 'schedule_data.json') -> Dict[str, Any]:
     if missing_keys:
         raise ValueError(f"Missing required fields in JSON: {', '.join(missing_keys)}")
     
+    validate_schedule_info(data['schedule_info'])
+    return data
+
+
+def validate_schedule_info(schedule_info: Dict[str, Any]) -> None:
+    """
+    Validate the schedule_info section.
+    
+    Args:
+        schedule_info: Schedule title, period and date range
+        
+    Raises:
+        ValueError: If required fields are missing or dates are malformed
+    """
     # Validate schedule_info structure
-    schedule_info = data['schedule_info']
     required_schedule_fields = ['title', 'period', 'start_date', 'end_date']
     missing_fields = [field for field in required_schedule_fields if field not in schedule_info]
     if missing_fields:
@@ -51,16 +72,39 @@ def load_schedule_data(json_file: str = 'schedule_data.json') -> Dict[str, Any]:
         datetime.strptime(schedule_info['end_date'], '%Y-%m-%d')
     except ValueError as e:
         raise ValueError(f"Invalid date format in schedule_info (use YYYY-MM-DD): {e}")
+
+
+def validate_event(event: Any, position: int) -> Dict[str, Any]:
+    """
+    Validate a single event entry.
     
-    return data
+    Args:
+        event: Decoded event entry
+        position: Zero-based position of the event in the input, for error messages
+        
+    Returns:
+        The event, unchanged
+        
+    Raises:
+        ValueError: If the event is not an object or lacks required fields
+    """
+    if not isinstance(event, dict):
+        raise ValueError(f"Event #{position + 1} must be a JSON object")
+    missing_fields = [field for field in ('date', 'subject', 'type') if field not in event]
+    if missing_fields:
+        raise ValueError(f"Event #{position + 1} is missing required fields: {', '.join(missing_fields)}")
+    duration = event.get('duration')
+    if duration is not None and (isinstance(duration, bool) or not isinstance(duration, int) or duration < 0):
+        raise ValueError(f"Event #{position + 1} has an invalid duration (use whole minutes)")
+    return event
 
 
-def get_event_dates(events: List[Dict[str, Any]]) -> Set[date]:
+def get_event_dates(events: Iterable[Dict[str, Any]]) -> Set[date]:
     """
     Extract all valid event dates from events list.
     
     Args:
-        events: List of event dictionaries
+        events: Iterable of event dictionaries
         
     Returns:
         Set of date objects for all valid events
@@ -110,3 +154,142 @@ def get_calendar_months(start_date_str: str, end_date_str: str) -> List[Dict[str
             current = current.replace(month=current.month + 1)
     
     return months
+
+
+class ScheduleIndex:
+    """
+    Single-pass index over loaded schedule data.
+    
+    Every event date is parsed exactly once and every bucket is sorted
+    exactly once, so the calendar and table generators can read from
+    the index instead of re-deriving the same information.
+    
+    Events are consumed from any iterable, so the index can be built
+    directly from a stream without holding the raw events in memory.
+    
+    Attributes:
+        schedule_info: Schedule title, period and date range
+        subjects: Subject records keyed by subject key
+        months: Calendar months in the schedule period
+        event_count: Number of events in the input
+        event_dates: Set of dates with scheduled events (exam period included)
+        event_dates_by_month: Sorted event dates keyed by (year, month)
+        events_by_month: Table-ready events sorted by (date, time), keyed by (year, month)
+        events_by_day: Per-day buckets of events_by_month, keyed by (year, month)
+        exam_events: Exam period event records in input order
+    """
+    
+    def __init__(self, data: Dict[str, Any], backend: str = config.EVENT_BACKEND) -> None:
+        """
+        Args:
+            data: Schedule data as returned by load_schedule_data; 'events'
+                  may be any iterable, such as the one from load_schedule_stream
+            backend: 'dict' to process events one by one, or 'columnar' to
+                     group and sort them with vectorized NumPy operations
+                     
+        Raises:
+            ValueError: If the backend is unknown
+            ImportError: If the columnar backend is requested without NumPy
+        """
+        self.schedule_info: Dict[str, Any] = data['schedule_info']
+        self.subjects: Dict[str, Subject] = load_subjects(data['subjects'])
+        self.months = get_calendar_months(self.schedule_info['start_date'], self.schedule_info['end_date'])
+        self.event_count = 0
+        self.event_dates: Set[date] = set()
+        self.events_by_month: Dict[Tuple[int, int], List[Event]] = defaultdict(list)
+        self.exam_events: List[Event] = []
+        
+        if backend == 'columnar':
+            with span('index_events', backend=backend):
+                columns = ColumnarEvents(data['events'], self.subjects)
+                self.event_count = columns.event_count
+                self.event_dates = columns.event_dates()
+                self.events_by_month.update(columns.events_by_month())
+                self.exam_events = columns.exam_events
+            with span('sort_events'):
+                self.finalize(presorted=True)
+        elif backend == 'dict':
+            with span('index_events', backend=backend):
+                for event in data['events']:
+                    self.add_event(event)
+            with span('sort_events'):
+                self.finalize()
+        else:
+            raise ValueError(f"Unknown event backend '{backend}' (use 'dict' or 'columnar')")
+        counter('events', processed=self.event_count, exam_period=len(self.exam_events))
+
+    @classmethod
+    def from_records(cls, schedule_info: Dict[str, Any], subjects: Dict[str, Subject], months: List[Dict[str, Any]],
+                     events_by_month: Dict[Tuple[int, int], List[Event]], exam_events: List[Event],
+                     event_dates: Set[date], event_count: int) -> 'ScheduleIndex':
+        """
+        Build an index from events that are already resolved and sorted.
+
+        Args:
+            schedule_info: Schedule title, period and date range
+            subjects: Subject records keyed by subject key
+            months: Calendar months in the schedule period
+            events_by_month: Event records sorted by (date, time), keyed by (year, month)
+            exam_events: Exam period event records in input order
+            event_dates: Set of dates with scheduled events (exam period included)
+            event_count: Number of events the records were built from
+
+        Returns:
+            ScheduleIndex equal to one built from the same events
+        """
+        index = cls.__new__(cls)
+        index.schedule_info = schedule_info
+        index.subjects = subjects
+        index.months = months
+        index.event_count = event_count
+        index.event_dates = event_dates
+        index.events_by_month = events_by_month
+        index.exam_events = exam_events
+        index.finalize(presorted=True)
+        return index
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        """
+        Parse and bucket a single event.
+        
+        Args:
+            event: Event dictionary from the JSON data
+        """
+        self.event_count += 1
+        date_str = event.get('date', '')
+        date_obj = None
+        if date_str and date_str != 'TBA':
+            try:
+                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+            except ValueError:
+                # Skip invalid dates silently
+                pass
+        
+        if date_obj is not None:
+            self.event_dates.add(date_obj.date())
+        
+        # Handle exam period separately
+        if event.get('section') == 'Exam Period':
+            self.exam_events.append(resolve_exam_event(event, date_obj, self.subjects))
+            return
+        
+        if date_obj is None:
+            return
+        self.events_by_month[(date_obj.year, date_obj.month)].append(resolve_event(event, date_obj, self.subjects))
+    
+    def finalize(self, presorted: bool = False) -> None:
+        """
+        Sort every bucket once and derive the per-day and per-month date views.
+        
+        Args:
+            presorted: Month buckets are already sorted by (date, time)
+        """
+        self.events_by_day: Dict[Tuple[int, int], List[Tuple[date, List[Event]]]] = {}
+        for month_key, month_events in self.events_by_month.items():
+            if not presorted:
+                month_events.sort(key=attrgetter('date', 'time'))
+            self.events_by_day[month_key] = bucket_events_by_day(month_events)
+        
+        self.event_dates_by_month: Dict[Tuple[int, int], List[date]] = defaultdict(list)
+        for event_date in sorted(self.event_dates):
+            self.event_dates_by_month[(event_date.year, event_date.month)].append(event_date)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Date Window
+Restricts a schedule to the events and calendar months inside a date range
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import config
+from .data_loader import ScheduleIndex, get_calendar_months
+from .event_processor import parse_event_date
+from .records import Event
+
+MonthKey = Tuple[int, int]
+
+
+class DateWindow(NamedTuple):
+    """Inclusive date range to render; None leaves that side at the schedule's own bound."""
+    start: Optional[date]
+    end: Optional[date]
+
+    @property
+    def label(self) -> str:
+        """Compact form such as '2025-10-01..2025-10-28', used in cache keys."""
+        return f"{self.start or ''}..{self.end or ''}"
+
+    def clamp(self, schedule_info: Dict[str, Any]) -> Tuple[date, date]:
+        """
+        Intersect the window with the schedule period.
+
+        Args:
+            schedule_info: Schedule title, period and date range
+
+        Returns:
+            Tuple of (first date, last date) to render
+
+        Raises:
+            ValueError: If the window lies outside the schedule period
+        """
+        schedule_start = datetime.strptime(schedule_info['start_date'], config.DATE_FORMAT).date()
+        schedule_end = datetime.strptime(schedule_info['end_date'], config.DATE_FORMAT).date()
+        start = max(self.start, schedule_start) if self.start else schedule_start
+        end = min(self.end, schedule_end) if self.end else schedule_end
+        if start > end:
+            raise ValueError(f"Date window {self.label} lies outside the schedule period "
+                             f"{schedule_start}..{schedule_end}")
+        return start, end
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, config.DATE_FORMAT).date()
+    except ValueError:
+        raise ValueError(f"Invalid window date '{value}' (use YYYY-MM-DD)")
+
+
+def parse_date_window(from_date: Optional[str] = None, to_date: Optional[str] = None,
+                      next_weeks: Optional[int] = None, today: Optional[date] = None) -> Optional[DateWindow]:
+    """
+    Build a date window from the --from, --to and --next-weeks options.
+
+    Args:
+        from_date: First date to render (YYYY-MM-DD)
+        to_date: Last date to render (YYYY-MM-DD)
+        next_weeks: Render this many weeks, starting at from_date or today
+        today: Date 'next weeks' counts from (defaults to the current date)
+
+    Returns:
+        The window, or None if no option was given
+
+    Raises:
+        ValueError: If a date is malformed or the options contradict each other
+    """
+    if from_date is None and to_date is None and next_weeks is None:
+        return None
+    start = _parse_date(from_date) if from_date is not None else None
+    end = _parse_date(to_date) if to_date is not None else None
+    if next_weeks is not None:
+        if end is not None:
+            raise ValueError("Use either --to or --next-weeks, not both")
+        if next_weeks < 1:
+            raise ValueError("--next-weeks must be at least 1")
+        start = start or today or date.today()
+        end = start + timedelta(weeks=next_weeks, days=-1)
+    if start is not None and end is not None and start > end:
+        raise ValueError(f"Date window {start}..{end} ends before it starts")
+    return DateWindow(start, end)
+
+
+def filter_events(events: Iterable[Dict[str, Any]], window: DateWindow) -> Iterator[Dict[str, Any]]:
+    """
+    Keep the raw events dated inside the window, mostly without parsing their dates.
+
+    Zero-padded ISO dates compare correctly as strings, so events outside
+    the window are dropped before any date parsing or subject lookup. Other
+    dates the loader accepts, such as '2025-1-15', are parsed and compared
+    as dates. Undated ('TBA') and invalid dates are dropped as well.
+
+    Args:
+        events: Raw event dictionaries, possibly a lazy stream
+        window: Date range to keep
+
+    Yields:
+        Events inside the window, in input order
+    """
+    low = window.start.isoformat() if window.start else ''
+    high = window.end.isoformat() if window.end else '9999-12-31'
+    for event in events:
+        date_str = event.get('date', '')
+        if not date_str or date_str == 'TBA':
+            continue
+        if len(date_str) == 10:
+            if low <= date_str <= high:
+                yield event
+            continue
+        date_obj = parse_event_date(date_str)
+        if date_obj is not None and low <= date_obj.date().isoformat() <= high:
+            yield event
+
+
+def window_schedule_info(schedule_info: Dict[str, Any], window: DateWindow) -> Dict[str, Any]:
+    """
+    Schedule info whose date range is the window clamped to the schedule period.
+
+    Args:
+        schedule_info: Schedule title, period and date range
+        window: Date range to render
+
+    Returns:
+        Copy of schedule_info with start_date and end_date replaced
+
+    Raises:
+        ValueError: If the window lies outside the schedule period
+    """
+    start, end = window.clamp(schedule_info)
+    return dict(schedule_info, start_date=start.isoformat(), end_date=end.isoformat())
+
+
+def window_month_keys(months: List[Dict[str, Any]], start: date, end: date) -> List[MonthKey]:
+    """
+    Keys of the calendar months that overlap a date range.
+
+    Args:
+        months: Calendar months in order, as from get_calendar_months
+        start: First date of the range
+        end: Last date of the range
+
+    Returns:
+        (year, month) keys in order
+    """
+    keys = [(month['year'], month['month']) for month in months]
+    return keys[bisect_left(keys, (start.year, start.month)):bisect_right(keys, (end.year, end.month))]
+
+
+def _trim_events(events: List[Event], start: date, end: date) -> List[Event]:
+    # Only the first and last month of a window need trimming; events are sorted by (date, time).
+    # Table events always have a date, so date.min never applies.
+    dates = [event.date.date() if event.date is not None else date.min for event in events]
+    low, high = bisect_left(dates, start), bisect_right(dates, end)
+    return events if (low, high) == (0, len(events)) else events[low:high]
+
+
+def window_index(index: ScheduleIndex, window: DateWindow) -> ScheduleIndex:
+    """
+    Restrict an index to the events and calendar months inside a window.
+
+    Month buckets are located by bisection and only the first and last
+    month are trimmed, so the cost grows with the window rather than the
+    whole schedule. Exam period events without a date are dropped.
+
+    Args:
+        index: Index of the whole schedule, or of every month the window touches
+        window: Date range to keep
+
+    Returns:
+        New index whose period is the window clamped to the schedule period
+
+    Raises:
+        ValueError: If the window lies outside the schedule period
+    """
+    schedule_info = window_schedule_info(index.schedule_info, window)
+    start, end = window.clamp(index.schedule_info)
+    months = get_calendar_months(schedule_info['start_date'], schedule_info['end_date'])
+    edges = {(start.year, start.month), (end.year, end.month)}
+
+    events_by_month: Dict[MonthKey, List[Event]] = defaultdict(list)
+    event_dates = set()
+    for month_key in window_month_keys(months, start, end):
+        month_events = index.events_by_month.get(month_key)
+        if month_events:
+            events_by_month[month_key] = _trim_events(month_events, start, end) if month_key in edges else month_events
+        month_dates = index.event_dates_by_month.get(month_key, [])
+        if month_key in edges:
+            month_dates = month_dates[bisect_left(month_dates, start):bisect_right(month_dates, end)]
+        event_dates.update(month_dates)
+
+    exam_events = [event for event in index.exam_events
+                   if event.date is not None and start <= event.date.date() <= end]
+    return ScheduleIndex.from_records(
+        schedule_info, index.subjects, months, events_by_month, exam_events, event_dates,
+        sum(len(month_events) for month_events in events_by_month.values()) + len(exam_events),
+    )
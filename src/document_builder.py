@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Document Builder
+Assembles the complete LaTeX document from schedule JSON data
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from . import config
+from .data_loader import ScheduleIndex
+from .stream_loader import load_schedule_stream
+from .parsed_cache import load_schedule_index
+from .date_window import DateWindow, filter_events, window_index
+from .latex_header import generate_latex_header
+from .calendar_generator import generate_calendars
+from .table_generators import event_row, generate_month_table, generate_exam_period_table, month_table_payload
+from .build_cache import FragmentStore
+from .records import Event
+from .calendar_externalize import externalize_calendars, generate_externalized_calendars
+from .clash_detection import mark_clashes
+from .latex_writer import LatexWriter
+from .parallel_fragments import PendingFragments, render_fragments
+from .tracing import span, counter
+
+# Absolute PDF path of each month's externalized calendar, keyed by (year, month)
+CalendarGraphics = Dict[Tuple[int, int], str]
+
+# Renders an event's table row without the date column
+RowRenderer = Callable[[Event], str]
+
+
+class DocumentSection(NamedTuple):
+    """A contiguous block of the document body."""
+    name: str
+    starts_page: bool
+    rows: int
+    lines: Iterator[str]
+
+
+def _title_and_calendars(index: ScheduleIndex, cache: Optional[FragmentStore],
+                         calendar_graphics: Optional[CalendarGraphics], pending: PendingFragments) -> Iterator[str]:
+    schedule_info = index.schedule_info
+
+    # Title
+    yield r"\begin{center}"
+    yield f"{{\\LARGE\\bfseries {schedule_info['title']}}}\\\\[0.2em]"
+    yield f"{{\\large {schedule_info['period']}}}"
+    yield r"\end{center}"
+    yield ""
+    yield r"\vspace{0.5em}"
+    yield ""
+
+    # Calendars
+    with span('calendars', months=len(index.months)):
+        if calendar_graphics is not None:
+            yield from generate_externalized_calendars(index.months, calendar_graphics)
+        else:
+            pending_calendars = {key: future for (kind, key), future in pending.items() if kind == 'calendar'}
+            yield from generate_calendars(index.months, index.event_dates, cache, index.event_dates_by_month,
+                                          pending_calendars)
+
+
+def _month_table(index: ScheduleIndex, month: Dict[str, Any], first_table: bool,
+                 cache: Optional[FragmentStore], row: RowRenderer, pending: PendingFragments) -> Iterator[str]:
+    month_key = (month['year'], month['month'])
+    month_events = index.events_by_month[month_key]
+    day_buckets = index.events_by_day[month_key]
+    future = pending.get(('month_table', month_key))
+    render: Callable[[], Iterable[str]]
+    if future is not None:
+        render = future.result
+    else:
+        render = lambda: generate_month_table(month['name'], month['year'], month_events, index.subjects, first_table, day_buckets, row)
+    with span('month_table', month=f"{month['year']}-{month['month']:02d}"):
+        # The fragment key only covers the events, so custom row renderers bypass the cache
+        if cache is not None and row is event_row:
+            yield from cache.fragment('month_table', month_table_payload(month, month_events, first_table), render)
+            if future is not None:
+                # Stored by a concurrent build after the pool started: its copy is not needed
+                future.cancel()
+        else:
+            yield from render()
+
+
+def _exam_period(index: ScheduleIndex, row: RowRenderer) -> Iterator[str]:
+    with span('exam_period_table', events=len(index.exam_events)):
+        yield from generate_exam_period_table(index.exam_events, index.subjects, row)
+
+
+def document_sections(index: ScheduleIndex, cache: Optional[FragmentStore] = None,
+                      calendar_graphics: Optional[CalendarGraphics] = None,
+                      row: RowRenderer = event_row) -> List[DocumentSection]:
+    """
+    Split the document body into its title/calendar block, month tables and exam period.
+
+    Every section except the first month table begins on a new page, and
+    'rows' counts the \\donebox checkboxes it contains, so the sections can
+    be compiled separately with unique form field names.
+
+    Schedules of at least config.PARALLEL_FRAGMENTS_MIN_EVENTS events have
+    their calendars and month tables rendered in a process pool, started
+    here. Fragments the cache already holds are not rendered again, and
+    custom row renderers keep the tables in this process.
+
+    Args:
+        index: Parsed and bucketed schedule data
+        cache: Optional fragment store, such as a BuildCache, for per-month fragments
+        calendar_graphics: Externalized calendar PDFs to include instead of
+                           drawing the calendars inline
+        row: Renders an event's table row without the date column
+
+    Returns:
+        Sections in document order; their lines are generated lazily
+    """
+    pending = render_fragments(index, tables=row is event_row, calendars=calendar_graphics is None, cache=cache)
+    sections = [DocumentSection('calendars', True, 0, _title_and_calendars(index, cache, calendar_graphics, pending))]
+
+    first_table = True
+    for month in index.months:
+        month_key = (month['year'], month['month'])
+        if month_key in index.events_by_month:
+            sections.append(DocumentSection(
+                f"{month['year']}-{month['month']:02d}", not first_table,
+                len(index.events_by_month[month_key]), _month_table(index, month, first_table, cache, row, pending),
+            ))
+            first_table = False
+
+    if index.exam_events:
+        sections.append(DocumentSection('exam-period', True, len(index.exam_events), _exam_period(index, row)))
+    return sections
+
+
+def document_begin() -> List[str]:
+    """
+    Lines opening the document body after the header.
+
+    Returns:
+        List of LaTeX lines
+    """
+    return [r"\begin{document}", r"\begin{Form}", ""]
+
+
+def document_end() -> List[str]:
+    """
+    Lines closing the document.
+
+    Returns:
+        List of LaTeX lines
+    """
+    return [r"\end{Form}", r"\end{document}"]
+
+
+def generate_document_lines(index: ScheduleIndex, cache: Optional[FragmentStore] = None,
+                            calendar_graphics: Optional[CalendarGraphics] = None,
+                            row: RowRenderer = event_row, pdf_mode: str = config.PDF_MODE) -> Iterator[str]:
+    """
+    Produce every line of the LaTeX document in order.
+
+    Args:
+        index: Parsed and bucketed schedule data
+        cache: Optional fragment store, such as a BuildCache, for per-month fragments
+        calendar_graphics: Externalized calendar PDFs, or None to draw inline
+        row: Renders an event's table row without the date column
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+
+    Yields:
+        LaTeX lines without trailing newlines
+    """
+    # Header
+    with span('header'):
+        yield from generate_latex_header(pdf_mode)
+
+    yield from document_begin()
+    for section in document_sections(index, cache, calendar_graphics, row):
+        yield from section.lines
+    yield from document_end()
+
+
+def write_latex_document(data: Dict[str, Any], sink: TextIO, cache: Optional[FragmentStore] = None,
+                         backend: str = config.EVENT_BACKEND, externalize: bool = config.EXTERNALIZE_CALENDARS,
+                         mark: bool = False, pdf_mode: str = config.PDF_MODE) -> int:
+    """
+    Stream the LaTeX document for loaded schedule data to a file-like sink.
+
+    Args:
+        data: Schedule data as returned by load_schedule_data; 'events' may
+              be a lazy iterator, which is consumed in a single pass
+        sink: File-like object the document is written to
+        cache: Optional fragment store, such as a BuildCache, for per-month fragments
+        backend: Event grouping backend ('dict' or 'columnar')
+        externalize: Include the calendars as cached per-month PDF graphics
+        mark: Report room and subject clashes and highlight the clashing rows
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+
+    Returns:
+        Number of lines written
+    """
+    row: RowRenderer = event_row
+    if mark:
+        data, row = mark_clashes(data)
+
+    # Parse and group every event in a single pass
+    index = ScheduleIndex(data, backend)
+    return _write_index_document(index, sink, cache, externalize, row, pdf_mode)
+
+
+def _write_index_document(index: ScheduleIndex, sink: TextIO, cache: Optional[FragmentStore], externalize: bool,
+                          row: RowRenderer, pdf_mode: str) -> int:
+    print(f"Loaded {index.event_count} events and {len(index.subjects)} subjects")
+    print(f"Schedule spans {len(index.months)} months")
+    print(f"Events grouped by month")
+
+    calendar_graphics = externalize_calendars(index) if externalize else None
+    return write_schedule_index(index, sink, cache, calendar_graphics, row, pdf_mode)
+
+
+def write_schedule_index(index: ScheduleIndex, sink: TextIO, cache: Optional[FragmentStore] = None,
+                         calendar_graphics: Optional[CalendarGraphics] = None,
+                         row: RowRenderer = event_row, pdf_mode: str = config.PDF_MODE) -> int:
+    """
+    Stream the LaTeX document for an already built index to a file-like sink.
+
+    Args:
+        index: Parsed and bucketed schedule data
+        sink: File-like object the document is written to
+        cache: Optional fragment store, such as a BuildCache, for per-month fragments
+        calendar_graphics: Externalized calendar PDFs, or None to draw inline
+        row: Renders an event's table row without the date column
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+
+    Returns:
+        Number of lines written
+    """
+    with span('emit_latex'):
+        with LatexWriter(sink) as writer:
+            writer.write_lines(generate_document_lines(index, cache, calendar_graphics, row, pdf_mode))
+    counter('latex', lines=writer.lines_written)
+    if cache is not None:
+        counter('fragment_cache', hits=cache.hits, misses=cache.misses)
+    return writer.lines_written
+
+
+def load_marked_index(json_file: str, backend: str = config.EVENT_BACKEND,
+                      window: Optional[DateWindow] = None) -> Tuple[ScheduleIndex, RowRenderer]:
+    """
+    Load a schedule, report its clashes and index it with clashing rows marked.
+
+    Clash detection needs the raw events, so the parsed-schedule cache is
+    bypassed and the file is streamed.
+
+    Args:
+        json_file: Path to input JSON or JSON Lines file with schedule data
+        backend: Event grouping backend ('dict' or 'columnar')
+        window: Only check and keep the events and calendar months inside this date range
+
+    Returns:
+        Tuple of (index, row renderer highlighting the clashing events)
+
+    Raises:
+        FileNotFoundError: If JSON file doesn't exist
+        ValueError: If JSON data is invalid or missing required fields, or
+                    the window lies outside the schedule period
+    """
+    with span('load_header'):
+        header, events = load_schedule_stream(json_file)
+    if window is not None:
+        events = filter_events(events, window)
+    data, row = mark_clashes(dict(header, events=events))
+    index = ScheduleIndex(data, backend)
+    if window is not None:
+        index = window_index(index, window)
+    return index, row
+
+
+def generate_latex_from_json(json_file: str = 'schedule_data.json', output_file: str = 'Academic Schedule.tex', cache: Optional[FragmentStore] = None,
+                             backend: str = config.EVENT_BACKEND, externalize: bool = config.EXTERNALIZE_CALENDARS,
+                             mark: bool = False, parsed_cache: bool = config.PARSED_CACHE,
+                             pdf_mode: str = config.PDF_MODE, window: Optional[DateWindow] = None) -> str:
+    """
+    Main function to generate LaTeX from JSON.
+
+    Args:
+        json_file: Path to input JSON or JSON Lines file with schedule data
+        output_file: Path to output .tex file
+        cache: Optional fragment store, such as a BuildCache, for per-month fragments
+        backend: Event grouping backend ('dict' or 'columnar')
+        externalize: Include the calendars as cached per-month PDF graphics
+        mark: Report room and subject clashes and highlight the clashing rows
+        parsed_cache: Read large inputs from the parsed-schedule cache
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+        window: Only render the events and calendar months inside this date range
+
+    Returns:
+        Path to the generated .tex file
+
+    Raises:
+        FileNotFoundError: If JSON file doesn't exist
+        ValueError: If JSON data is invalid or missing required fields, or
+                    the window lies outside the schedule period
+    """
+    print(f"Reading {json_file}...")
+    with span('generate_latex_from_json', json_file=json_file):
+        row: RowRenderer = event_row
+        if mark:
+            index, row = load_marked_index(json_file, backend, window)
+        else:
+            index = load_schedule_index(json_file, backend, parsed_cache, window)
+
+        # Stream straight to the output file
+        with open(output_file, 'w', encoding='utf-8') as f:
+            total_lines = _write_index_document(index, f, cache, externalize, row, pdf_mode)
+
+    print(f"\nGenerated {output_file}")
+    print(f"Total lines: {total_lines}")
+    return output_file
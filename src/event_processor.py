@@ -4,29 +4,120 @@ Event Processing Module
 Handles grouping and organizing events
 """
 
-from datetime import datetime
+from datetime import datetime, date
 from collections import defaultdict
-from typing import Dict, List, Tuple, Any
+from itertools import groupby
+from operator import attrgetter
+from typing import Dict, List, Tuple, Any, Iterable, Mapping, Optional
 
+from .records import Event, Subject, format_event_date, intern_text, load_subjects, unknown_subject
 
-def group_events_by_month(events: List[Dict[str, Any]], subjects: Dict[str, Dict[str, str]]) -> Tuple[Dict[Tuple[int, int], List[Dict[str, Any]]], List[Dict[str, Any]]]:
+
+def parse_event_date(date_str: str) -> Optional[datetime]:
+    """
+    Parse an event date, treating 'TBA' and invalid dates as unknown.
+    
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        
+    Returns:
+        Parsed date, or None
+    """
+    if not date_str or date_str == 'TBA':
+        return None
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def resolve_event(event: Dict[str, Any], date_obj: datetime, subjects: Dict[str, Subject]) -> Event:
+    """
+    Build the table-ready record for an event whose date is already parsed.
+    
+    Args:
+        event: Event dictionary from the JSON data
+        date_obj: Parsed event date
+        subjects: Subject records keyed by subject key
+        
+    Returns:
+        Event record with resolved subject name, code and room
+    """
+    subject_key = event['subject']
+    subject = subjects.get(subject_key) or unknown_subject(subject_key)
+    
+    return Event(
+        date_obj,
+        intern_text(event.get('time', '')),
+        intern_text(event['type']),
+        subject.name,
+        subject.code,
+        intern_text(event.get('room')) or subject.default_room,
+        format_event_date(date_obj),
+    )
+
+
+def resolve_exam_event(event: Dict[str, Any], date_obj: Optional[datetime], subjects: Dict[str, Subject]) -> Event:
+    """
+    Build the record for an exam period event.
+    
+    Exam period rows show the date exactly as written in the JSON (which
+    may be 'TBA'), so date_str holds the raw value.
+    
+    Args:
+        event: Event dictionary from the JSON data
+        date_obj: Parsed event date, or None if it is not a valid date
+        subjects: Subject records keyed by subject key
+        
+    Returns:
+        Event record with resolved subject name, code and room
+    """
+    subject_key = event['subject']
+    subject = subjects.get(subject_key) or unknown_subject(subject_key)
+    
+    return Event(
+        date_obj,
+        intern_text(event.get('time', '')),
+        intern_text(event['type']),
+        subject.name,
+        subject.code,
+        intern_text(event.get('room')) or subject.default_room,
+        event['date'],
+    )
+
+
+def bucket_events_by_day(month_events: Iterable[Event]) -> List[Tuple[date, List[Event]]]:
+    """
+    Split a sorted list of month events into per-day buckets.
+    
+    Args:
+        month_events: Events sorted by (date, time)
+        
+    Returns:
+        List of (date, events) tuples in date order
+    """
+    return [(day.date(), list(day_events)) for day, day_events in groupby(month_events, key=attrgetter('date'))]
+
+
+def group_events_by_month(events: Iterable[Dict[str, Any]], subjects: Mapping[str, Any]) -> Tuple[Dict[Tuple[int, int], List[Event]], List[Event]]:
     """
     Group events by month and sort them.
     
     Args:
-        events: List of event dictionaries
-        subjects: Dictionary of subject information
+        events: Iterable of event dictionaries, consumed in a single pass
+        subjects: Dictionary of subject information or Subject records
         
     Returns:
-        Tuple of (events_by_month dict, exam_period_events list)
+        Tuple of (events_by_month dict, exam_period_events list) of Event records
     """
+    subjects = load_subjects(subjects)
     events_by_month = defaultdict(list)
     exam_period_events = []
     
     for event in events:
         # Handle exam period separately
         if event.get('section') == 'Exam Period':
-            exam_period_events.append(event)
+            exam_period_events.append(resolve_exam_event(event, parse_event_date(event.get('date', '')), subjects))
             continue
         
         date_str = event['date']
@@ -37,27 +128,13 @@ def group_events_by_month(events: List[Dict[str, Any]], subjects: Dict[str, Dict
             date_obj = datetime.strptime(date_str, '%Y-%m-%d')
             month_key = (date_obj.year, date_obj.month)
             
-            # Get subject info
-            subject_key = event['subject']
-            subject_info = subjects.get(subject_key, {})
-            
             # Prepare event data
-            event_data = {
-                'date': date_obj,
-                'time': event.get('time', ''),
-                'type': event['type'],
-                'subject_name': subject_info.get('name', subject_key),
-                'subject_code': subject_info.get('code', ''),
-                'room': event.get('room') or subject_info.get('default_room', ''),
-                'date_str': date_obj.strftime('%d %b (%a)')
-            }
-            
-            events_by_month[month_key].append(event_data)
+            events_by_month[month_key].append(resolve_event(event, date_obj, subjects))
         except ValueError:
             continue
     
     # Sort events within each month
     for month_key in events_by_month:
-        events_by_month[month_key].sort(key=lambda e: (e['date'], e['time']))
+        events_by_month[month_key].sort(key=attrgetter('date', 'time'))
     
     return events_by_month, exam_period_events
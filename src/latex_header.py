@@ -4,16 +4,32 @@ LaTeX Header Generator
 Generates the LaTeX document preamble and header configuration
 """
 
-from typing import List
+from typing import List, Optional
 
+from . import config
 
-def generate_latex_header() -> List[str]:
+# 'standard': one hyperref form field pair per row with its own appearances
+# 'lean': compressed object streams, form fields sharing appearance streams
+# 'glyph': lean compression with printed boxes instead of form fields
+PDF_MODES = ('standard', 'lean', 'glyph')
+
+
+def generate_latex_header(pdf_mode: str = config.PDF_MODE) -> List[str]:
     """
     Generate LaTeX document header with all required packages and configurations.
     
+    Args:
+        pdf_mode: One of PDF_MODES; selects the \\donebox definition and
+                  PDF compression
+    
     Returns:
         List of LaTeX header lines
+        
+    Raises:
+        ValueError: If the PDF mode is unknown
     """
+    if pdf_mode not in PDF_MODES:
+        raise ValueError(f"Unknown PDF mode '{pdf_mode}' (use {', '.join(PDF_MODES)})")
     lines = []
     lines.append(r"\documentclass[landscape,a4paper,10pt]{article}")
     lines.append(r"\usepackage[utf8]{inputenc}")
@@ -49,16 +65,11 @@ def generate_latex_header() -> List[str]:
     lines.append(r"\newcolumntype{C}[1]{>{\centering\arraybackslash}p{#1}}")
     lines.append(r"\newcolumntype{M}[1]{>{\centering\arraybackslash}m{#1}}")
     lines.append("")
-    lines.append(r"% Define clickable checkboxes with custom symbols")
-    lines.append(r"% Using checkboxsymbol parameter: \ding{51} for checkmark, \ding{55} for cross")
-    lines.append(r"\newcommand{\donebox}{%")
-    lines.append(r"    \makebox[2cm][c]{%")
-    lines.append(r"        \CheckBox[name=done\thedone,width=0.35cm,height=0.35cm,borderwidth=1,bordercolor=0 0 0,checkboxsymbol=\ding{51}]{}%")
-    lines.append(r"        \hspace{0.35cm}%")
-    lines.append(r"        \CheckBox[name=notdone\thedone,width=0.35cm,height=0.35cm,borderwidth=1,bordercolor=0 0 0,checkboxsymbol=\ding{55}]{}%")
-    lines.append(r"    }%")
-    lines.append(r"    \stepcounter{done}%")
-    lines.append(r"}")
+    if pdf_mode == 'standard':
+        lines.extend(_form_donebox())
+    else:
+        lines.extend(_lean_output())
+        lines.extend(_shared_appearance_donebox() if pdf_mode == 'lean' else _glyph_donebox())
     lines.append(r"\newcounter{done}")
     lines.append("")
     lines.append(r"% Define macro for event day styling")
@@ -67,3 +78,91 @@ def generate_latex_header() -> List[str]:
     lines.append(r"}")
     lines.append("")
     return lines
+
+
+def _form_donebox() -> List[str]:
+    return [
+        r"% Define clickable checkboxes with custom symbols",
+        r"% Using checkboxsymbol parameter: \ding{51} for checkmark, \ding{55} for cross",
+        r"\newcommand{\donebox}{%",
+        r"    \makebox[2cm][c]{%",
+        r"        \CheckBox[name=done\thedone,width=0.35cm,height=0.35cm,borderwidth=1,bordercolor=0 0 0,checkboxsymbol=\ding{51}]{}%",
+        r"        \hspace{0.35cm}%",
+        r"        \CheckBox[name=notdone\thedone,width=0.35cm,height=0.35cm,borderwidth=1,bordercolor=0 0 0,checkboxsymbol=\ding{55}]{}%",
+        r"    }%",
+        r"    \stepcounter{done}%",
+        r"}",
+    ]
+
+
+def _lean_output() -> List[str]:
+    return [
+        r"% Lean output: pack objects into compressed object streams (PDF 1.5)",
+        r"\pdfminorversion=5",
+        r"\pdfcompresslevel=9",
+        r"\pdfobjcompresslevel=2",
+        "",
+    ]
+
+
+def _shared_appearance_donebox() -> List[str]:
+    # The appearances are written at \begin{document}, as PDF objects cannot be dumped into a format
+    return [
+        r"% Checkbox appearance streams, written once and shared by every widget",
+        r"\newcommand{\doneface}[1]{\hbox to 0.35cm{\vrule width 0.5bp\vbox to 0.35cm{\hrule height 0.5bp\vss"
+        r"\hbox to \dimexpr0.35cm-1bp\relax{\hss\scriptsize#1\hss}\vss\hrule height 0.5bp}\vrule width 0.5bp}}",
+        r"\AtBeginDocument{%",
+        r"    \setbox0=\doneface{\ding{51}}\immediate\pdfxform0 \xdef\doneyes{\the\pdflastxform}%",
+        r"    \setbox0=\doneface{\ding{55}}\immediate\pdfxform0 \xdef\doneno{\the\pdflastxform}%",
+        r"    \setbox0=\doneface{}\immediate\pdfxform0 \xdef\doneoff{\the\pdflastxform}%",
+        r"}",
+        r"% Checkbox widget annotation referencing the shared appearances, registered with the form",
+        r"\makeatletter",
+        r"\newcommand{\sharedcheckbox}[2]{%",
+        r"    \hbox to 0.35cm{%",
+        r"        \pdfannot width 0.35cm height 0.35cm depth 0pt {/Subtype/Widget/FT/Btn/F 4/T(#1)/V/Off/AS/Off"
+        r"/AP<</N<</Yes #2 0 R/Off \doneoff\space 0 R>>>>}%",
+        r"        \ifcsname HyField@AddToFields\endcsname\HyField@AddToFields\fi",
+        r"        \hss",
+        r"    }%",
+        r"}",
+        r"\makeatother",
+        r"\newcommand{\donebox}{%",
+        r"    \makebox[2cm][c]{%",
+        r"        \sharedcheckbox{done\thedone}{\doneyes}%",
+        r"        \hspace{0.35cm}%",
+        r"        \sharedcheckbox{notdone\thedone}{\doneno}%",
+        r"    }%",
+        r"    \stepcounter{done}%",
+        r"}",
+    ]
+
+
+def _glyph_donebox() -> List[str]:
+    return [
+        r"% Printed boxes to tick by hand; no form fields",
+        r"\newcommand{\glyphbox}{{\setlength{\fboxsep}{0pt}\setlength{\fboxrule}{0.5bp}\fbox{\rule{0pt}{0.35cm}\rule{0.35cm}{0pt}}}}",
+        r"\newcommand{\donebox}{%",
+        r"    \makebox[2cm][c]{\glyphbox\hspace{0.35cm}\glyphbox}%",
+        r"    \stepcounter{done}%",
+        r"}",
+    ]
+
+
+def header_pdf_mode(tex_file: str) -> Optional[str]:
+    """
+    PDF mode whose header a .tex file starts with.
+
+    Args:
+        tex_file: Path to a .tex file
+
+    Returns:
+        The matching entry of PDF_MODES, or None for any other preamble
+    """
+    headers = {mode: ''.join(line + '\n' for line in generate_latex_header(mode)) for mode in PDF_MODES}
+    with open(tex_file, 'r', encoding='utf-8') as f:
+        start = f.read(max(len(header) for header in headers.values()))
+    for mode, header in headers.items():
+        if start.startswith(header):
+            return mode
+    return None
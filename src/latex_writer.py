@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+LaTeX Writer
+Streams LaTeX lines to a file or any file-like sink through a bounded buffer
+"""
+
+from typing import Iterable, TextIO
+
+from . import config
+
+
+class LatexWriter:
+    """
+    Buffered line writer for LaTeX output.
+
+    Lines are joined with newlines exactly like '\\n'.join(lines), so the
+    output is identical to building the whole document in memory first,
+    but at most `buffer_size` characters are held at any time.
+    """
+
+    def __init__(self, sink: TextIO, buffer_size: int = config.WRITE_BUFFER_SIZE) -> None:
+        """
+        Args:
+            sink: File-like object with a write() method
+            buffer_size: Number of characters to buffer before writing to the sink
+        """
+        self._sink = sink
+        self._buffer_size = buffer_size
+        self._buffer: list = []
+        self._buffered = 0
+        self.lines_written = 0
+
+    def write_line(self, line: str) -> None:
+        """
+        Write a single line.
+
+        Args:
+            line: LaTeX line without a trailing newline
+        """
+        if self.lines_written:
+            self._buffer.append('\n')
+        self._buffer.append(line)
+        self._buffered += len(line) + 1
+        self.lines_written += 1
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """
+        Write every line from an iterable, consuming it lazily.
+
+        Args:
+            lines: Iterable of LaTeX lines
+        """
+        for line in lines:
+            self.write_line(line)
+
+    def flush(self) -> None:
+        """Write buffered lines to the sink."""
+        if self._buffer:
+            self._sink.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def __enter__(self) -> 'LatexWriter':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.flush()
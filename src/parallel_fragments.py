@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Parallel Fragments
+Renders the month tables and calendars of large schedules in a process pool
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import config
+from .build_cache import FragmentStore
+from .calendar_generator import calendar_payload, generate_month_calendar
+from .data_loader import ScheduleIndex
+from .table_generators import generate_month_table, month_table_payload
+from .tracing import span
+
+# Pending fragment lines keyed by (kind, (year, month)), kind being 'month_table' or 'calendar'
+PendingFragments = Dict[Tuple[str, Tuple[int, int]], Future]
+
+# Index of the worker process, set once by the pool initializer
+_index: Optional[ScheduleIndex] = None
+
+
+def _init_worker(index: ScheduleIndex) -> None:
+    global _index
+    _index = index
+
+
+def _worker_index() -> ScheduleIndex:
+    if _index is None:
+        raise RuntimeError("Fragment worker was started without a schedule index")
+    return _index
+
+
+def _render_month_table(position: int, first_table: bool) -> List[str]:
+    index = _worker_index()
+    month = index.months[position]
+    month_key = (month['year'], month['month'])
+    return list(generate_month_table(month['name'], month['year'], index.events_by_month[month_key],
+                                     index.subjects, first_table, index.events_by_day[month_key]))
+
+
+def _render_calendar(position: int) -> List[str]:
+    index = _worker_index()
+    month = index.months[position]
+    return list(generate_month_calendar(position, month,
+                                        index.event_dates_by_month.get((month['year'], month['month']), [])))
+
+
+def fragment_workers(index: ScheduleIndex) -> int:
+    """
+    Number of processes worth rendering an index's fragments with.
+
+    Schedules below config.PARALLEL_FRAGMENTS_MIN_EVENTS render faster in
+    a single process than it takes to start a pool. Inside a worker
+    process (batch mode, the render service) fragments always render
+    serially, so pools are never nested.
+
+    Args:
+        index: Parsed and bucketed schedule data
+
+    Returns:
+        Worker count, or 0 to render serially
+    """
+    if index.event_count < config.PARALLEL_FRAGMENTS_MIN_EVENTS or multiprocessing.parent_process() is not None:
+        return 0
+    workers = min(config.PARALLEL_FRAGMENT_WORKERS or os.cpu_count() or 1, len(index.months))
+    return workers if workers > 1 else 0
+
+
+def render_fragments(index: ScheduleIndex, tables: bool, calendars: bool,
+                     cache: Optional[FragmentStore] = None) -> PendingFragments:
+    """
+    Start rendering month tables and calendars in a process pool.
+
+    Each fragment is one task. The workers receive the index once, when
+    they start, and send back the finished lines, which are identical to
+    the serial generators' output. Results are collected in document
+    order by the caller while later fragments are still rendering.
+
+    Fragments the cache already holds are streamed from it by the caller,
+    so only the misses are submitted, and no pool is started when there
+    are none.
+
+    Args:
+        index: Parsed and bucketed schedule data
+        tables: Render the month tables (only with the default row renderer)
+        calendars: Render the inline calendars
+        cache: Fragment store the document is rendered with
+
+    Returns:
+        Futures of the fragment lines; empty if the schedule is below the
+        size threshold or there is nothing to render
+    """
+    workers = fragment_workers(index)
+    if not workers or not (tables or calendars):
+        return {}
+
+    tasks: List[Tuple[Tuple[str, Tuple[int, int]], Callable[..., List[str]], Tuple[Any, ...]]] = []
+    with span('check_fragment_cache'):
+        # Calendars come first in the document, so they are submitted first
+        if calendars:
+            for position, month in enumerate(index.months):
+                month_key = (month['year'], month['month'])
+                payload = calendar_payload(position, month, index.event_dates_by_month.get(month_key, []))
+                if cache is None or not cache.has_fragment('calendar', payload):
+                    tasks.append((('calendar', month_key), _render_calendar, (position,)))
+        if tables:
+            first_table = True
+            for position, month in enumerate(index.months):
+                month_key = (month['year'], month['month'])
+                if month_key in index.events_by_month:
+                    payload = month_table_payload(month, index.events_by_month[month_key], first_table)
+                    if cache is None or not cache.has_fragment('month_table', payload):
+                        tasks.append((('month_table', month_key), _render_month_table, (position, first_table)))
+                    first_table = False
+    if not tasks:
+        return {}
+
+    workers = min(workers, len(tasks))
+    with span('start_fragment_pool', workers=workers):
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(index,))
+    pending: PendingFragments = {key: pool.submit(render, *args) for key, render, args in tasks}
+    # Submitted tasks still run; the workers exit once the queue is drained
+    pool.shutdown(wait=False)
+    print(f"Rendering {len(pending)} fragments in {workers} processes")
+    return pending
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Parsed Schedule Cache
+Cache of the parsed and indexed schedule, skipping JSON decoding on repeat runs
+"""
+
+import hashlib
+import json
+import os
+import struct
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config
+from .build_cache import _atomic_write, config_fingerprint
+from .data_loader import ScheduleIndex, get_calendar_months
+from .date_window import DateWindow, MonthKey, filter_events, window_index, window_month_keys
+from .records import Event, Subject, intern_text
+from .stream_loader import load_schedule_stream
+from .tracing import span
+
+# Bump when the cached records or their layout change
+PARSED_CACHE_FORMAT = 1
+
+# Errors that mean the cache file is missing, damaged or written by another version
+_CACHE_ERRORS = (OSError, struct.error, UnicodeDecodeError, AttributeError, IndexError, KeyError, TypeError,
+                 ValueError)
+
+
+def parsed_cache_dir() -> str:
+    """
+    Directory holding the parsed-schedule cache.
+
+    Returns:
+        config.PARSED_CACHE_DIR, or 'schedule-generator/parsed' in the
+        user's cache directory ($XDG_CACHE_HOME, defaulting to ~/.cache)
+    """
+    if config.PARSED_CACHE_DIR:
+        return config.PARSED_CACHE_DIR
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'schedule-generator', 'parsed')
+
+
+def parsed_cache_path(json_file: str) -> str:
+    """
+    Path of the parsed-schedule cache for a schedule file.
+
+    Args:
+        json_file: Path to the schedule file
+
+    Returns:
+        File in parsed_cache_dir() named after the hash of the schedule's
+        absolute path
+    """
+    name = hashlib.sha256(os.path.realpath(json_file).encode('utf-8')).hexdigest()
+    return os.path.join(parsed_cache_dir(), f"{name}{config.PARSED_CACHE_SUFFIX}")
+
+
+def _source_stamp(json_file: str) -> Tuple[int, int]:
+    stat = os.stat(json_file)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_hash(json_file: str) -> str:
+    digest = hashlib.sha256()
+    with open(json_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_header(stamp: Tuple[int, int], digest: str, sections: Dict[str, Tuple[int, int]]) -> Dict[str, Any]:
+    return {
+        'format': PARSED_CACHE_FORMAT,
+        'config': config_fingerprint(),
+        'mtime_ns': stamp[0],
+        'size': stamp[1],
+        'sha256': digest,
+        'sections': sections,
+    }
+
+
+def _section_name(month_key: MonthKey) -> str:
+    return f"{month_key[0]:04d}-{month_key[1]:02d}"
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _event_row(event: Event) -> List[Any]:
+    return [event.date.toordinal() if event.date is not None else None, event.time, event.type,
+            event.subject_name, event.subject_code, event.room, event.date_str]
+
+
+class _EventDecoder:
+    """Rebuilds Event records from cached rows, sharing dates and interned strings."""
+
+    def __init__(self) -> None:
+        self._dates: Dict[int, datetime] = {}
+
+    def _date(self, ordinal: Optional[int]) -> Optional[datetime]:
+        if ordinal is None:
+            return None
+        date_obj = self._dates.get(ordinal)
+        if date_obj is None:
+            date_obj = self._dates[ordinal] = datetime.fromordinal(ordinal)
+        return date_obj
+
+    def events(self, rows: List[List[Any]]) -> List[Event]:
+        return [Event(self._date(ordinal), intern_text(time), intern_text(event_type), intern_text(subject_name),
+                      intern_text(subject_code), intern_text(room), intern_text(date_str))
+                for ordinal, time, event_type, subject_name, subject_code, room, date_str in rows]
+
+
+def _window_keys(schedule_info: Dict[str, Any], months: List[Dict[str, Any]], window: DateWindow) -> List[MonthKey]:
+    try:
+        start, end = window.clamp(schedule_info)
+    except ValueError:
+        # Reported by window_index once the cache is read
+        return []
+    return window_month_keys(months, start, end)
+
+
+def read_parsed_cache(json_file: str, window: Optional[DateWindow] = None) -> Optional[ScheduleIndex]:
+    """
+    Load the cached index of a schedule file if it is still valid.
+
+    The cache file starts with a small JSON header, followed by one JSON
+    section with the schedule metadata and one per calendar month. It only
+    holds plain values; the Event and Subject records are rebuilt from
+    them, so a damaged or crafted file cannot run code. The header is
+    checked first: a different modification time or size makes the cache
+    stale without reading the source, otherwise the source is hashed and
+    compared. Only then are sections decoded, and with a window only the
+    months it touches.
+
+    Args:
+        json_file: Path to the schedule file
+        window: Only load and keep the events inside this date range
+
+    Returns:
+        ScheduleIndex equal to parsing the file, or None if the cache is
+        missing, stale or unreadable
+
+    Raises:
+        ValueError: If the window lies outside the schedule period
+    """
+    cache_file = parsed_cache_path(json_file)
+    try:
+        with open(cache_file, 'rb') as f:
+            header_size, = struct.unpack('>Q', f.read(8))
+            header = json.loads(f.read(header_size).decode('utf-8'))
+            stamp = _source_stamp(json_file)
+            if (not isinstance(header, dict) or header.get('format') != PARSED_CACHE_FORMAT
+                    or [header.get('mtime_ns'), header.get('size')] != list(stamp)
+                    or header.get('config') != config_fingerprint()
+                    or header.get('sha256') != _file_hash(json_file)):
+                return None
+            data_start = 8 + header_size
+            sections: Dict[str, List[int]] = header['sections']
+
+            def section(name: str) -> Any:
+                offset, length = sections[name]
+                f.seek(data_start + offset)
+                return json.loads(f.read(length).decode('utf-8'))
+
+            schedule_info, subject_rows, exam_rows, event_dates, event_count = section('meta')
+            months = get_calendar_months(schedule_info['start_date'], schedule_info['end_date'])
+            month_keys = [(month['year'], month['month']) for month in months]
+            if window is not None:
+                month_keys = _window_keys(schedule_info, months, window)
+            decoder = _EventDecoder()
+            events_by_month: Dict[MonthKey, List[Event]] = defaultdict(list, {
+                month_key: decoder.events(section(_section_name(month_key)))
+                for month_key in month_keys if _section_name(month_key) in sections
+            })
+            subjects = {key: Subject(*(intern_text(field) for field in fields)) for key, fields in subject_rows.items()}
+            exam_events = decoder.events(exam_rows)
+            dates = {date.fromordinal(ordinal) for ordinal in event_dates}
+    except _CACHE_ERRORS:
+        return None
+    index = ScheduleIndex.from_records(schedule_info, subjects, months, events_by_month,
+                                       exam_events, dates, int(event_count))
+    return index if window is None else window_index(index, window)
+
+
+def write_parsed_cache(json_file: str, index: ScheduleIndex, stamp: Tuple[int, int], digest: str) -> bool:
+    """
+    Store an index in the parsed-schedule cache of its schedule file.
+
+    Args:
+        json_file: Path to the schedule file the index was built from
+        index: Index built from the whole file
+        stamp: (mtime_ns, size) of the file before it was parsed
+        digest: SHA-256 hex digest of the file before it was parsed
+
+    Returns:
+        True if the cache was written; False if the file changed while it
+        was parsed or the cache directory is not writable
+    """
+    try:
+        if _source_stamp(json_file) != stamp:
+            return False
+        payloads: List[Tuple[str, bytes]] = [('meta', _encode([
+            index.schedule_info,
+            {key: list(subject) for key, subject in index.subjects.items()},
+            [_event_row(event) for event in index.exam_events],
+            sorted(event_date.toordinal() for event_date in index.event_dates),
+            index.event_count,
+        ]))]
+        for month_key, month_events in index.events_by_month.items():
+            payloads.append((_section_name(month_key), _encode([_event_row(event) for event in month_events])))
+        sections: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for name, payload in payloads:
+            sections[name] = (offset, len(payload))
+            offset += len(payload)
+        header = _encode(_cache_header(stamp, digest, sections))
+        _atomic_write(parsed_cache_path(json_file),
+                      b''.join([struct.pack('>Q', len(header)), header] + [payload for _, payload in payloads]))
+    except OSError:
+        return False
+    return True
+
+
+def load_schedule_index(json_file: str, backend: str = config.EVENT_BACKEND,
+                        use_cache: bool = config.PARSED_CACHE, window: Optional[DateWindow] = None) -> ScheduleIndex:
+    """
+    Parse and index a schedule file, going through its parsed-schedule cache.
+
+    Files smaller than config.PARSED_CACHE_MIN_BYTES are always parsed, as
+    decoding them is cheaper than checking a cache. Larger files are read
+    from the cache when it is valid; otherwise they are parsed and the
+    cache is rebuilt.
+
+    With a window, a valid cache only loads the months inside it. When the
+    file is parsed without the cache, events outside the window are dropped
+    as they stream past, before their dates are parsed.
+
+    Args:
+        json_file: Path to input JSON or JSON Lines file with schedule data
+        backend: Event grouping backend ('dict' or 'columnar') used when parsing
+        use_cache: Read and write the parsed-schedule cache
+        window: Only keep the events and calendar months inside this date range
+
+    Returns:
+        ScheduleIndex of the file, or of the window
+
+    Raises:
+        FileNotFoundError: If JSON file doesn't exist
+        ValueError: If JSON data is invalid or missing required fields, or
+                    the window lies outside the schedule period
+    """
+    if use_cache and os.path.isfile(json_file):
+        stamp = _source_stamp(json_file)
+        if stamp[1] >= config.PARSED_CACHE_MIN_BYTES:
+            with span('read_parsed_cache'):
+                index = read_parsed_cache(json_file, window)
+            if index is not None:
+                print(f"Parsed schedule cache hit: {parsed_cache_path(json_file)}")
+                return index
+            digest = _file_hash(json_file)
+            index = _parse_index(json_file, backend)
+            with span('write_parsed_cache'):
+                write_parsed_cache(json_file, index, stamp, digest)
+            return index if window is None else window_index(index, window)
+    return _parse_index(json_file, backend, window)
+
+
+def _parse_index(json_file: str, backend: str, window: Optional[DateWindow] = None) -> ScheduleIndex:
+    with span('load_header'):
+        header, events = load_schedule_stream(json_file)
+    if window is None:
+        return ScheduleIndex(dict(header, events=events), backend)
+    index = ScheduleIndex(dict(header, events=filter_events(events, window)), backend)
+    return window_index(index, window)
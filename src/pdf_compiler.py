@@ -1,71 +1,372 @@
 #!/usr/bin/env python3
 """
 PDF Compiler
-Handles compilation of LaTeX to PDF with loading bar
+Handles compilation of LaTeX to PDF with page progress
 """
 
+import asyncio
+import functools
+import signal
 import subprocess
-import sys
 import time
 import os
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from . import config
+from .compile_progress import PageTracker, ProgressCallback, estimate_pages, terminal_progress
+from .latex_header import header_pdf_mode
+from .preamble_format import ensure_preamble_format, format_compiler_args, format_environment
+from .tracing import span
+from .build_dir import BuildDir
+from .warm_pool import WarmPool, WarmWorker
 
 
-def compile_pdf(tex_file: str) -> bool:
+class CompileResult(NamedTuple):
+    """Outcome of a single pdflatex run."""
+    tex_file: str
+    pdf_file: str
+    success: bool
+    returncode: Optional[int]
+    timed_out: bool
+    duration: float
+    stdout: str
+    log: str
+    passes: int = 1  # pdflatex passes run; 0 when the last build was reused
+
+
+def _compiler_command(tex_file: str, use_format: bool, quiet: bool = True) -> Tuple[List[str], str, Optional[Dict[str, str]]]:
+    """
+    Build the pdflatex command line for a .tex file.
+    
+    Returns:
+        Tuple of (argument list without the input file, working directory,
+        environment or None)
+    """
+    # Get directory and filename
+    tex_dir = os.path.dirname(tex_file) or '.'
+    
+    # Load the dumped preamble instead of reading the packages again
+    format_args: List[str] = []
+    env = None
+    pdf_mode = header_pdf_mode(tex_file) if use_format else None
+    if use_format and pdf_mode is None:
+        if not quiet:
+            print("Custom preamble, compiling without the preamble format")
+    elif pdf_mode is not None:
+        with span('ensure_preamble_format'):
+            fmt_file = ensure_preamble_format(pdf_mode=pdf_mode)
+        if fmt_file:
+            format_args = format_compiler_args(fmt_file)
+            env = format_environment(fmt_file)
+        elif not quiet:
+            print("Preamble format unavailable, compiling with the full preamble")
+    
+    return [config.PDF_COMPILER] + format_args + config.PDF_COMPILER_OPTIONS, tex_dir, env
+
+
+def _pass_command(command: List[str], build_dir: BuildDir) -> List[str]:
+    return command + [build_dir.output_option, os.path.basename(build_dir.tex_file)]
+
+
+def compile_pdf(tex_file: str, quiet: bool = False, use_format: bool = config.USE_PREAMBLE_FORMAT,
+                pool: Optional[WarmPool] = None, progress: Optional[ProgressCallback] = None) -> bool:
     """
-    Compile LaTeX file to PDF with loading bar.
+    Compile LaTeX file to PDF with a progress bar.
+    
+    pdflatex runs in the document's build directory, as many passes as the
+    .aux file and log require (see BuildDir); an unchanged document is not
+    compiled again.
+    
+    Progress is measured in pages: pdflatex's output is read as it is
+    written, and every page it ships out is compared with the pages
+    expected (see estimate_pages). Without a callback, a bar is drawn when
+    stdout is a terminal and not quiet.
     
     Args:
         tex_file: Path to the .tex file to compile
+        quiet: Suppress the progress bar and status messages
+        use_format: Start pdflatex from the precompiled preamble format
+        pool: Warm worker pool to run the passes on; documents that cannot use
+              the pool are compiled normally
+        progress: Receives a CompileProgress for every page of every pass,
+                  also when quiet
         
     Returns:
         True if compilation successful, False otherwise
     """
-    print("\nCompiling PDF...")
+    if progress is None:
+        progress = terminal_progress(quiet)
+    with span('compile_pdf', tex_file=tex_file, warm=pool is not None):
+        return _compile_pdf(tex_file, quiet, use_format, pool, progress)
+
+
+def _tracker(tex_file: str, last_log: str, progress: Optional[ProgressCallback],
+             pass_number: int = 1) -> Optional[PageTracker]:
+    if progress is None:
+        return None
+    return PageTracker(tex_file, estimate_pages(tex_file, last_log), progress, pass_number)
+
+
+def _listener(tracker: Optional[PageTracker]) -> Optional[Callable[[bytes], None]]:
+    return tracker.feed if tracker is not None else None
+
+
+def _follow_output(process: subprocess.Popen, tracker: Optional[PageTracker]) -> None:
+    if tracker is None:
+        process.wait()
+        return
+    stdout = process.stdout
+    assert stdout is not None  # Started with stdout=PIPE when tracking
+    # Blocking reads wake up only when pdflatex writes
+    for chunk in iter(lambda: os.read(stdout.fileno(), 64 * 1024), b''):
+        tracker.feed(chunk)
+    stdout.close()
+    process.wait()
+    tracker.finish()
+
+
+def _compile_pdf(tex_file: str, quiet: bool, use_format: bool, pool: Optional[WarmPool],
+                 progress: Optional[ProgressCallback]) -> bool:
+    if not quiet:
+        print("\nCompiling PDF...")
     
-    # Get directory and filename
-    tex_dir = os.path.dirname(tex_file) or '.'
-    tex_filename = os.path.basename(tex_file)
-    
-    # Start compilation in the correct directory
-    compile_process = subprocess.Popen(
-        [config.PDF_COMPILER] + config.PDF_COMPILER_OPTIONS + [tex_filename],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        cwd=tex_dir
+    pdf_file = f"{os.path.splitext(tex_file)[0]}.pdf"
+    success = _compile_passes(tex_file, pdf_file, quiet, use_format, pool, progress)
+    
+    if not quiet:
+        print(f"PDF compiled: {pdf_file}" if success else "PDF compilation failed")
+    return success
+
+
+def _finish_on_worker(worker: WarmWorker, build_dir: BuildDir, tracker: Optional[PageTracker]) -> None:
+    try:
+        worker.wait()
+        if tracker is not None:
+            tracker.finish()
+        worker.collect(build_dir)
+    finally:
+        worker.close()
+
+
+def _compile_passes(tex_file: str, pdf_file: str, quiet: bool, use_format: bool, pool: Optional[WarmPool],
+                    progress: Optional[ProgressCallback]) -> bool:
+    command, tex_dir, env = _compiler_command(tex_file, use_format, quiet)
+    build_dir = BuildDir(tex_file, command)
+    if build_dir.up_to_date():
+        if not quiet:
+            print(f"Unchanged since the last build, reusing {build_dir.path}")
+        return build_dir.finish(pdf_file, converged=True)
+    
+    build_dir.begin()
+    reason = None
+    for pass_number in range(1, config.COMPILE_MAX_PASSES + 1):
+        aux_before = build_dir.aux_digest()
+        tracker = _tracker(tex_file, build_dir.log(), progress, pass_number)
+        worker = pool.checkout(tex_file, _listener(tracker), build_dir) if pool is not None else None
+        with span('pdflatex_pass', tex_file=tex_file, number=pass_number, warm=worker is not None):
+            if worker is not None:
+                _finish_on_worker(worker, build_dir, tracker)
+            else:
+                # Start compilation in the correct directory
+                compile_process = subprocess.Popen(
+                    _pass_command(command, build_dir),
+                    stdout=subprocess.DEVNULL if tracker is None else subprocess.PIPE,
+                    stderr=subprocess.DEVNULL if tracker is None else subprocess.STDOUT,
+                    cwd=tex_dir,
+                    env=env
+                )
+                _follow_output(compile_process, tracker)
+        reason = build_dir.rerun_reason(aux_before)
+        if reason is None:
+            break
+        if not quiet and pass_number < config.COMPILE_MAX_PASSES:
+            print(f"Rerunning pdflatex: {reason}")
+    
+    if not quiet:
+        passes = f"{build_dir.passes} pass{'es' if build_dir.passes > 1 else ''}"
+        print(f"Compiled in {passes}; auxiliary files kept in {build_dir.path}")
+    return build_dir.finish(pdf_file, converged=reason is None)
+
+
+def _kill_process_tree(process: 'asyncio.subprocess.Process') -> None:
+    """Kill pdflatex together with any children it spawned (e.g. via shell escape)."""
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def compile_pdf_async(tex_file: str, timeout: Optional[float] = config.COMPILE_TIMEOUT,
+                            use_format: bool = config.USE_PREAMBLE_FORMAT,
+                            pool: Optional[WarmPool] = None,
+                            progress: Optional[ProgressCallback] = None) -> CompileResult:
+    """
+    Compile LaTeX file to PDF without blocking the event loop.
+    
+    The process is awaited rather than polled, and its output and log are
+    captured in the result. Passes are repeated as in compile_pdf. If the timeout expires the process is killed.
+    If the awaiting task is cancelled the process is killed as well and
+    the cancellation propagates.
+    
+    Args:
+        tex_file: Path to the .tex file to compile
+        timeout: Seconds before the job is killed (None for no limit)
+        use_format: Start pdflatex from the precompiled preamble format
+        pool: Warm worker pool to run the passes on; documents that cannot use
+              the pool are compiled normally
+        progress: Receives a CompileProgress for every page of every pass;
+                  on a warm worker it is called from the worker's reader thread
+        
+    Returns:
+        CompileResult describing the run
+    """
+    with span('compile_pdf_async', tex_file=tex_file, warm=pool is not None):
+        return await _compile_pdf_async(tex_file, timeout, use_format, pool, progress)
+
+
+async def _run_worker_pass(worker: WarmWorker, build_dir: BuildDir, timeout: Optional[float],
+                           tracker: Optional[PageTracker]) -> Tuple[Optional[int], bytes, bool]:
+    try:
+        try:
+            await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(None, worker.wait), timeout)
+        except asyncio.TimeoutError:
+            worker.kill()
+            return worker.process.returncode, b'', True
+        except asyncio.CancelledError:
+            worker.kill()
+            raise
+        if tracker is not None:
+            tracker.finish()
+        worker.collect(build_dir)
+        return worker.process.returncode, worker.output(), False
+    finally:
+        worker.close()
+
+
+async def _run_pass(command: List[str], tex_dir: str, env: Optional[Dict[str, str]],
+                    timeout: Optional[float], tracker: Optional[PageTracker]) -> Tuple[Optional[int], bytes, bool]:
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        cwd=tex_dir,
+        env=env,
+        start_new_session=(os.name == 'posix'),
     )
     
-    # Show loading bar while compiling
-    bar_length = config.LOADING_BAR_LENGTH
-    while compile_process.poll() is None:
-        for i in range(bar_length):
-            if compile_process.poll() is not None:
+    pipe = process.stdout
+    assert pipe is not None  # Started with stdout=PIPE
+
+    async def read_output() -> bytes:
+        chunks = []
+        while True:
+            chunk = await pipe.read(64 * 1024)
+            if not chunk:
                 break
-            percent = (i / bar_length) * 100
-            filled = config.LOADING_BAR_FILLED_CHAR * i
-            empty = config.LOADING_BAR_EMPTY_CHAR * (bar_length - i)
-            sys.stdout.write(f'\r{filled}{empty} {percent:.0f}%')
-            sys.stdout.flush()
-            time.sleep(config.LOADING_BAR_DELAY)
-    
-    # Show 100% completion
-    sys.stdout.write(f'\r{config.LOADING_BAR_FILLED_CHAR * bar_length} 100%\n')
-    sys.stdout.flush()
-    
-    # Check if PDF was created
-    base_name = tex_file.replace('.tex', '')
-    pdf_file = f"{base_name}.pdf"
-    
-    if os.path.exists(pdf_file):
-        print(f"PDF compiled: {pdf_file}")
-        
-        # Clean up auxiliary files
-        for ext in config.AUX_FILE_EXTENSIONS:
-            aux_file = f"{base_name}{ext}"
-            if os.path.exists(aux_file):
-                os.remove(aux_file)
-        print(f"Cleaned up auxiliary files ({', '.join(config.AUX_FILE_EXTENSIONS)})")
-        return True
+            chunks.append(chunk)
+            if tracker is not None:
+                tracker.feed(chunk)
+        await process.wait()
+        return b''.join(chunks)
+    
+    try:
+        stdout = await asyncio.wait_for(read_output(), timeout)
+    except asyncio.TimeoutError:
+        _kill_process_tree(process)
+        await process.wait()
+        return process.returncode, b'', True
+    except asyncio.CancelledError:
+        _kill_process_tree(process)
+        await process.wait()
+        raise
+    if tracker is not None:
+        tracker.finish()
+    return process.returncode, stdout, False
+
+
+async def _compile_pdf_async(tex_file: str, timeout: Optional[float], use_format: bool, pool: Optional[WarmPool],
+                             progress: Optional[ProgressCallback]) -> CompileResult:
+    # A missing preamble format is dumped with a blocking pdflatex run, so keep it off the event loop
+    command, tex_dir, env = await asyncio.get_running_loop().run_in_executor(None, _compiler_command, tex_file,
+                                                                             use_format)
+    pdf_file = f"{os.path.splitext(tex_file)[0]}.pdf"
+    started = time.perf_counter()
+    build_dir = BuildDir(tex_file, command)
+    
+    returncode: Optional[int] = 0
+    stdout = b''
+    timed_out = False
+    reason = None
+    if build_dir.up_to_date():
+        success = build_dir.finish(pdf_file, converged=True)
     else:
-        print("PDF compilation failed")
-        return False
+        build_dir.begin()
+        # The timeout covers all passes together
+        deadline = None if timeout is None else started + timeout
+        for pass_number in range(1, config.COMPILE_MAX_PASSES + 1):
+            aux_before = build_dir.aux_digest()
+            remaining = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            tracker = _tracker(tex_file, build_dir.log(), progress, pass_number)
+            worker = pool.checkout(tex_file, _listener(tracker), build_dir) if pool is not None else None
+            if worker is not None:
+                returncode, stdout, timed_out = await _run_worker_pass(worker, build_dir, remaining, tracker)
+            else:
+                returncode, stdout, timed_out = await _run_pass(_pass_command(command, build_dir), tex_dir, env,
+                                                                remaining, tracker)
+            if timed_out:
+                break
+            reason = build_dir.rerun_reason(aux_before)
+            if reason is None:
+                break
+        success = not timed_out and build_dir.finish(pdf_file, converged=reason is None)
+    
+    return CompileResult(
+        tex_file=tex_file,
+        pdf_file=pdf_file,
+        success=success,
+        returncode=returncode,
+        timed_out=timed_out,
+        duration=time.perf_counter() - started,
+        stdout=stdout.decode('utf-8', errors='replace'),
+        log=build_dir.log(),
+        passes=build_dir.passes,
+    )
+
+
+async def compile_pdfs_async(tex_files: Iterable[str], max_concurrency: int = 4,
+                             timeout: Optional[float] = config.COMPILE_TIMEOUT,
+                             use_format: bool = config.USE_PREAMBLE_FORMAT,
+                             pool: Optional[WarmPool] = None,
+                             progress: Optional[ProgressCallback] = None,
+                             pdf_mode: str = config.PDF_MODE) -> List[CompileResult]:
+    """
+    Compile several .tex files concurrently in one event loop.
+    
+    Args:
+        tex_files: Paths to the .tex files to compile
+        max_concurrency: Maximum number of pdflatex processes at once
+        timeout: Per-job timeout in seconds (None for no limit)
+        use_format: Start pdflatex from the precompiled preamble format
+        pool: Warm worker pool to compile on
+        progress: Receives the CompileProgress of every job, told apart by tex_file
+        pdf_mode: PDF mode the documents were generated with, whose preamble
+                  format is built before the jobs start
+        
+    Returns:
+        List of CompileResult in input order
+    """
+    if use_format:
+        # Build the format once before the jobs start, without blocking the event loop
+        fmt_file = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(ensure_preamble_format, pdf_mode=pdf_mode))
+        use_format = fmt_file is not None
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run(tex_file: str) -> CompileResult:
+        async with semaphore:
+            return await compile_pdf_async(tex_file, timeout, use_format, pool, progress)
+    
+    return list(await asyncio.gather(*(run(tex_file) for tex_file in tex_files)))
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Draft PDF Renderer
+Writes the schedule directly as a PDF in pure Python, without pdflatex
+"""
+
+import calendar
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config
+from .data_loader import ScheduleIndex
+from .parsed_cache import load_schedule_index
+from .date_window import DateWindow
+from .tracing import span
+
+# A4 landscape with the same 1.5cm margins as the LaTeX geometry
+PAGE_WIDTH = 841.89
+PAGE_HEIGHT = 595.28
+MARGIN = 42.52
+POINTS_PER_CM = 28.3465
+
+FONT_SIZE = 10.0
+LINE_HEIGHT = 12.0
+ROW_PADDING = 3.0
+
+# Standard Type 1 fonts every PDF viewer provides, so nothing is embedded
+FONTS = {
+    'regular': ('F1', 'Helvetica'),
+    'bold': ('F2', 'Helvetica-Bold'),
+    'italic': ('F3', 'Helvetica-Oblique'),
+}
+
+# Advance widths (1/1000 em) of printable ASCII, from the standard AFM metrics
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_WIDTHS = {
+    'regular': _HELVETICA_WIDTHS,
+    'bold': _HELVETICA_BOLD_WIDTHS,
+    'italic': _HELVETICA_WIDTHS,
+}
+_DEFAULT_WIDTH = 556
+
+Run = Tuple[str, str]
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    """
+    Measure a string set in one of the standard fonts.
+
+    Args:
+        text: Text to measure
+        font: 'regular', 'bold' or 'italic'
+        size: Font size in points
+
+    Returns:
+        Width in points
+    """
+    widths = _WIDTHS[font]
+    total = 0
+    for char in text:
+        code = ord(char) - 32
+        total += widths[code] if 0 <= code < len(widths) else _DEFAULT_WIDTH
+    return total * size / 1000
+
+
+def _pdf_string(text: str) -> str:
+    """Encode text as a WinAnsi PDF literal string."""
+    encoded = text.encode('cp1252', errors='replace').decode('latin-1')
+    return '(' + encoded.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def _wrap_runs(runs: List[Run], size: float, max_width: float) -> List[List[Run]]:
+    """Greedily wrap styled text runs into lines no wider than max_width."""
+    lines: List[List[Run]] = [[]]
+    width = 0.0
+    for font, text in runs:
+        for word in re.split(r'(\s+)', text):
+            if not word:
+                continue
+            if word.isspace():
+                if width == 0:
+                    continue
+                word = ' '
+            word_width = text_width(word, font, size)
+            if width > 0 and width + word_width > max_width and not word.isspace():
+                lines.append([])
+                width = 0.0
+            lines[-1].append((font, word))
+            width += word_width
+    return lines
+
+
+class PdfCanvas:
+    """
+    Minimal multi-page PDF writer.
+
+    Drawing operations are appended to the content stream of the current
+    page; coordinates are in points from the bottom-left corner.
+    """
+
+    def __init__(self, title: str = '') -> None:
+        """
+        Args:
+            title: Document title stored in the PDF metadata
+        """
+        self.title = title
+        self.pages: List[List[str]] = []
+        self._ops: List[str] = []
+
+    def new_page(self) -> None:
+        self._ops = []
+        self.pages.append(self._ops)
+
+    def text(self, x: float, y: float, text: str, font: str = 'regular', size: float = FONT_SIZE) -> None:
+        self._ops.append(f"BT /{FONTS[font][0]} {size:.2f} Tf {x:.2f} {y:.2f} Td {_pdf_string(text)} Tj ET")
+
+    def runs(self, x: float, y: float, runs: List[Run], size: float = FONT_SIZE) -> None:
+        for font, text in runs:
+            self.text(x, y, text, font, size)
+            x += text_width(text, font, size)
+
+    def centered_text(self, center_x: float, y: float, text: str, font: str = 'regular',
+                      size: float = FONT_SIZE) -> None:
+        self.text(center_x - text_width(text, font, size) / 2, y, text, font, size)
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.4) -> None:
+        self._ops.append(f"{width:.2f} w {x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S")
+
+    def rect(self, x: float, y: float, w: float, h: float, width: float = 0.8) -> None:
+        self._ops.append(f"{width:.2f} w {x:.2f} {y:.2f} {w:.2f} {h:.2f} re S")
+
+    def circle(self, cx: float, cy: float, r: float, width: float = 1.2, rgb: Tuple[float, float, float] = (1, 0, 0)) -> None:
+        k = 0.5523 * r
+        self._ops.append(
+            f"q {rgb[0]} {rgb[1]} {rgb[2]} RG {width:.2f} w "
+            f"{cx + r:.2f} {cy:.2f} m "
+            f"{cx + r:.2f} {cy + k:.2f} {cx + k:.2f} {cy + r:.2f} {cx:.2f} {cy + r:.2f} c "
+            f"{cx - k:.2f} {cy + r:.2f} {cx - r:.2f} {cy + k:.2f} {cx - r:.2f} {cy:.2f} c "
+            f"{cx - r:.2f} {cy - k:.2f} {cx - k:.2f} {cy - r:.2f} {cx:.2f} {cy - r:.2f} c "
+            f"{cx + k:.2f} {cy - r:.2f} {cx + r:.2f} {cy - k:.2f} {cx + r:.2f} {cy:.2f} c S Q"
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the document.
+
+        Returns:
+            Complete PDF file contents
+        """
+        objects: List[bytes] = []
+        font_refs = []
+        for index, (key, base_font) in enumerate(FONTS.values()):
+            font_refs.append(f"/{key} {3 + index} 0 R")
+            objects.append(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>".encode('ascii'))
+
+        first_page = 3 + len(FONTS)
+        kids = []
+        for number, ops in enumerate(self.pages):
+            page_id = first_page + 2 * number
+            kids.append(f"{page_id} 0 R")
+            objects.append(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << {' '.join(font_refs)} >> >> /Contents {page_id + 1} 0 R >>".encode('ascii')
+            )
+            stream = zlib.compress('\n'.join(ops).encode('latin-1'))
+            objects.append(f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode('ascii')
+                           + stream + b"\nendstream")
+
+        info_id = first_page + 2 * len(self.pages)
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode('ascii'),
+        ] + objects + [
+            f"<< /Title {_pdf_string(self.title)} /Producer (Academic Schedule Generator draft renderer) >>".encode('latin-1'),
+        ]
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+        for offset in offsets:
+            out += f"{offset:010d} 00000 n \n".encode('ascii')
+        out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info {info_id} 0 R >>\n"
+                f"startxref\n{xref}\n%%EOF\n").encode('ascii')
+        return bytes(out)
+
+
+class _DraftLayout:
+    """Flows titles, calendars and tables down the pages of a PdfCanvas."""
+
+    HEADER = ['Date', 'Time', 'Event', 'Room', 'Done']
+    ALIGN = ['left', 'center', 'left', 'center', 'center']
+
+    def __init__(self, canvas: PdfCanvas) -> None:
+        self.canvas = canvas
+        self.y = 0.0
+        self.widths = [float(config.COLUMN_WIDTHS[key][:-2]) * POINTS_PER_CM
+                       for key in ('date', 'time', 'event', 'room', 'done')]
+        table_width = sum(self.widths)
+        self.columns = []
+        x = (PAGE_WIDTH - table_width) / 2
+        for width in self.widths:
+            self.columns.append(x)
+            x += width
+        self.table_left = self.columns[0]
+        self.table_right = x
+        self.new_page()
+
+    def new_page(self) -> None:
+        self.canvas.new_page()
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def fits(self, height: float) -> bool:
+        return self.y - height >= MARGIN
+
+    def title(self, title: str, period: str) -> None:
+        self.canvas.centered_text(PAGE_WIDTH / 2, self.y - 16, title, 'bold', 17)
+        self.canvas.centered_text(PAGE_WIDTH / 2, self.y - 34, period.replace('--', '–'), 'regular', 12)
+        self.y -= 50
+
+    def calendars(self, months: List[Dict[str, Any]], dates_by_month: Dict[Tuple[int, int], List[Any]]) -> None:
+        cell_w, cell_h = 22.0, 18.0
+        block_h = 16 + 6 * cell_h + 10
+        slot_w = (PAGE_WIDTH - 2 * MARGIN) / config.CALENDARS_PER_ROW
+        for start in range(0, len(months), config.CALENDARS_PER_ROW):
+            if not self.fits(block_h):
+                self.new_page()
+            for slot, month in enumerate(months[start:start + config.CALENDARS_PER_ROW]):
+                left = MARGIN + slot * slot_w + (slot_w - 7 * cell_w) / 2
+                self.canvas.centered_text(left + 3.5 * cell_w, self.y - 12, f"{month['name']} {month['year']}", 'bold')
+                marked = {d.day for d in dates_by_month.get((month['year'], month['month']), [])}
+                weeks = calendar.Calendar(firstweekday=0).monthdayscalendar(month['year'], month['month'])
+                for row, week in enumerate(weeks):
+                    baseline = self.y - 16 - (row + 1) * cell_h + 5
+                    for col, day in enumerate(week):
+                        if day:
+                            center_x = left + (col + 0.5) * cell_w
+                            self.canvas.centered_text(center_x, baseline, str(day))
+                            if day in marked:
+                                self.canvas.circle(center_x, baseline + 3.5, 7.5)
+            self.y -= block_h
+        self.canvas.centered_text(PAGE_WIDTH / 2, self.y - 10, "Red circles indicate days with scheduled events",
+                                  'italic', 9)
+        self.y -= 24
+
+    def heading(self, text: str) -> None:
+        self.canvas.text(self.table_left, self.y - 13, text, 'bold', 12)
+        self.y -= 20
+
+    def _table_header(self) -> None:
+        self.canvas.line(self.table_left, self.y, self.table_right, self.y, 0.8)
+        self._cells([[[('bold', label)]] for label in self.HEADER], LINE_HEIGHT + 2 * ROW_PADDING)
+        self.canvas.line(self.table_left, self.y, self.table_right, self.y, 0.5)
+
+    def _cells(self, cells: List[List[List[Run]]], height: float, done_boxes: bool = False) -> None:
+        top = self.y
+        for col, lines in enumerate(cells):
+            for number, line_runs in enumerate(lines):
+                baseline = top - ROW_PADDING - 9 - number * LINE_HEIGHT
+                width = sum(text_width(text, font, FONT_SIZE) for font, text in line_runs)
+                x = self.columns[col] + 2
+                if self.ALIGN[col] == 'center':
+                    x = self.columns[col] + (self.widths[col] - width) / 2
+                self.canvas.runs(x, baseline, line_runs)
+        if done_boxes:
+            center_x = self.columns[4] + self.widths[4] / 2
+            box = 9.9
+            for x in (center_x - box - 5, center_x + 5):
+                self.canvas.rect(x, top - ROW_PADDING - box - 1, box, box)
+        self.y -= height
+
+    def table(self, rows: List[Tuple[bool, List[str], List[Run]]]) -> None:
+        """Draw a table; each row is (starts a new date group, [date, time, room], event runs)."""
+        header_h = LINE_HEIGHT + 2 * ROW_PADDING
+        if not self.fits(header_h + 2 * LINE_HEIGHT):
+            self.new_page()
+        self._table_header()
+        for number, (new_group, (date_col, time_col, room_col), event_runs) in enumerate(rows):
+            event_lines = _wrap_runs(event_runs, FONT_SIZE, self.widths[2] - 4)
+            height = max(1, len(event_lines)) * LINE_HEIGHT + 2 * ROW_PADDING
+            if not self.fits(height):
+                self.new_page()
+                self._table_header()
+            elif new_group and number > 0:
+                self.canvas.line(self.table_left, self.y, self.table_right, self.y, 0.5)
+            cells = [[[('regular', date_col)]], [[('regular', time_col)]], event_lines,
+                     [[('regular', room_col)]], []]
+            self._cells(cells, height, done_boxes=True)
+        self.canvas.line(self.table_left, self.y, self.table_right, self.y, 0.8)
+        self.y -= 14
+
+
+def _event_runs(event_type: str, subject_name: str, subject_code: str) -> List[Run]:
+    subject_display = f"{subject_name} ({subject_code})" if subject_code else subject_name
+    return [('bold', event_type), ('regular', ' – '), ('italic', subject_display)]
+
+
+def render_draft_pdf(index: ScheduleIndex, pdf_file: Optional[str] = None) -> bytes:
+    """
+    Render the schedule as a draft PDF without LaTeX.
+
+    The layout follows the LaTeX document: title, month-grid calendars with
+    circled event days, one table per month and the exam period table. It
+    uses the standard PDF fonts and draws plain boxes in place of the
+    clickable checkboxes, so it is meant for previews and high-volume jobs.
+
+    Args:
+        index: Parsed and bucketed schedule data
+        pdf_file: Optional path the PDF is written to
+
+    Returns:
+        PDF file contents
+    """
+    with span('render_draft_pdf'):
+        canvas = PdfCanvas(index.schedule_info['title'])
+        layout = _DraftLayout(canvas)
+        layout.title(index.schedule_info['title'], index.schedule_info['period'])
+        layout.calendars(index.months, index.event_dates_by_month)
+
+        first_table = True
+        for month in index.months:
+            month_key = (month['year'], month['month'])
+            if month_key not in index.events_by_month:
+                continue
+            if not first_table:
+                layout.new_page()
+            first_table = False
+            layout.heading(f"{month['name']} {month['year']}")
+            rows = []
+            for _, date_events in index.events_by_day[month_key]:
+                for i, event in enumerate(date_events):
+                    rows.append((i == 0, [event.date_str if i == 0 else '', event.time, event.room],
+                                 _event_runs(event.type, event.subject_name, event.subject_code)))
+            layout.table(rows)
+
+        if index.exam_events:
+            layout.new_page()
+            layout.heading("Exam Period")
+            rows = []
+            for event in index.exam_events:
+                rows.append((False, [event.date_str, event.time, event.room],
+                             _event_runs(event.type, event.subject_name, event.subject_code)))
+            layout.table(rows)
+
+        content = canvas.to_bytes()
+
+    if pdf_file:
+        with open(pdf_file, 'wb') as f:
+            f.write(content)
+    return content
+
+
+def draft_pdf_path(output_file: str) -> str:
+    """
+    PDF path the draft renderer writes for a given .tex output path.
+
+    Args:
+        output_file: Path of the .tex file the LaTeX renderer would write
+
+    Returns:
+        The same path with a .pdf extension
+    """
+    return os.path.splitext(output_file)[0] + '.pdf'
+
+
+def generate_draft_pdf_from_json(json_file: str, pdf_file: str, backend: str = config.EVENT_BACKEND,
+                                 parsed_cache: bool = config.PARSED_CACHE, window: Optional[DateWindow] = None) -> str:
+    """
+    Render a schedule JSON file straight to a draft PDF.
+
+    Args:
+        json_file: Path to input JSON or JSON Lines file with schedule data
+        pdf_file: Path to output .pdf file
+        backend: Event grouping backend ('dict' or 'columnar')
+        parsed_cache: Read large inputs from the parsed-schedule cache
+        window: Only render the events and calendar months inside this date range
+
+    Returns:
+        Path to the generated PDF
+
+    Raises:
+        FileNotFoundError: If JSON file doesn't exist
+        ValueError: If JSON data is invalid or missing required fields, or
+                    the window lies outside the schedule period
+    """
+    print(f"Reading {json_file}...")
+    index = load_schedule_index(json_file, backend, parsed_cache, window)
+    print(f"Loaded {index.event_count} events and {len(index.subjects)} subjects")
+
+    render_draft_pdf(index, pdf_file)
+    print(f"Draft PDF rendered: {pdf_file}")
+    return pdf_file
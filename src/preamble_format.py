@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Preamble Format
+Dumps the LaTeX preamble into a precompiled pdflatex format file
+"""
+
+import glob
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+
+from . import config
+from .latex_header import PDF_MODES, generate_latex_header
+
+FORMAT_PREFIX = 'schedule-preamble-'
+
+
+def preamble_format_name(pdf_mode: str = config.PDF_MODE) -> str:
+    """
+    Name of the format file for the current header.
+
+    The name embeds a hash of the header, so any change to
+    generate_latex_header produces a new format and the old one is
+    never loaded by mistake.
+
+    Args:
+        pdf_mode: PDF mode of the header
+
+    Returns:
+        Format name without the .fmt extension
+    """
+    header = '\n'.join(generate_latex_header(pdf_mode))
+    return FORMAT_PREFIX + hashlib.sha256(header.encode('utf-8')).hexdigest()[:16]
+
+
+def ensure_preamble_format(format_dir: str = config.PREAMBLE_FORMAT_DIR,
+                           pdf_mode: str = config.PDF_MODE) -> Optional[str]:
+    """
+    Make sure a format file for the current header exists, building it if needed.
+
+    The format is dumped with `pdflatex -ini` and mylatexformat, which makes
+    later runs skip the document preamble up to \\begin{document}. The .tex
+    files therefore stay unchanged and still compile without the format.
+
+    Args:
+        format_dir: Directory holding the dumped format files
+        pdf_mode: PDF mode of the header
+
+    Returns:
+        Absolute path to the .fmt file, or None if it could not be built
+    """
+    format_dir = os.path.abspath(format_dir)
+    name = preamble_format_name(pdf_mode)
+    fmt_file = os.path.join(format_dir, f"{name}.fmt")
+    if os.path.exists(fmt_file):
+        return fmt_file
+
+    os.makedirs(format_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix='.fmt-', dir=format_dir)
+    try:
+        preamble_tex = os.path.join(build_dir, f"{name}.tex")
+        with open(preamble_tex, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(generate_latex_header(pdf_mode) + [r"\begin{document}", r"\end{document}", ""]))
+
+        try:
+            subprocess.run(
+                [config.PDF_COMPILER, '-ini', f"-jobname={name}"] + config.PDF_COMPILER_OPTIONS
+                + [f"&{config.PDF_COMPILER}", 'mylatexformat.ltx', f"{name}.tex"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                cwd=build_dir,
+                check=False,
+            )
+        except FileNotFoundError:
+            return None
+
+        built = os.path.join(build_dir, f"{name}.fmt")
+        if not os.path.exists(built):
+            return None
+        os.replace(built, fmt_file)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    _remove_stale_formats(format_dir)
+    return fmt_file
+
+
+def _remove_stale_formats(format_dir: str) -> None:
+    # Formats of the other PDF modes are current too
+    keep = {os.path.join(format_dir, f"{preamble_format_name(mode)}.fmt") for mode in PDF_MODES}
+    for fmt_file in glob.glob(os.path.join(format_dir, f"{FORMAT_PREFIX}*.fmt")):
+        if fmt_file not in keep:
+            try:
+                os.remove(fmt_file)
+            except OSError:
+                pass
+
+
+def format_compiler_args(fmt_file: str) -> List[str]:
+    """
+    Extra pdflatex arguments that load a dumped format.
+
+    Args:
+        fmt_file: Path returned by ensure_preamble_format
+
+    Returns:
+        Command-line options selecting the format
+    """
+    return [f"-fmt={os.path.splitext(os.path.basename(fmt_file))[0]}"]
+
+
+def format_environment(fmt_file: str) -> Dict[str, str]:
+    """
+    Environment for a pdflatex process that should find the dumped format.
+
+    Args:
+        fmt_file: Path returned by ensure_preamble_format
+
+    Returns:
+        Copy of the current environment with the format directory on TEXFORMATS
+    """
+    env = dict(os.environ)
+    fmt_dir = os.path.dirname(fmt_file)
+    # Trailing separator keeps the default search path
+    env['TEXFORMATS'] = fmt_dir + os.pathsep + env.get('TEXFORMATS', '')
+    return env
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Schedule Records
+Compact record types for subjects and table-ready events
+"""
+
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Union
+
+
+class Subject(NamedTuple):
+    """A subject from the JSON 'subjects' table."""
+    name: str
+    code: str
+    default_room: str
+
+    @property
+    def display(self) -> str:
+        """Subject name followed by its code in parentheses, if it has one."""
+        return f"{self.name} ({self.code})" if self.code else self.name
+
+
+class Event(NamedTuple):
+    """
+    A table-ready event with its subject resolved.
+
+    Tuples carry no per-instance dictionary, and the repeated strings
+    (times, types, rooms, subject names and codes, formatted dates) are
+    interned, so a million events share a small set of string objects.
+    """
+    date: Optional[datetime]
+    time: str
+    type: str
+    subject_name: str
+    subject_code: str
+    room: str
+    date_str: str
+
+    @property
+    def subject_display(self) -> str:
+        """Subject name followed by its code in parentheses, if it has one."""
+        return f"{self.subject_name} ({self.subject_code})" if self.subject_code else self.subject_name
+
+
+def intern_text(value: Any) -> str:
+    """
+    Intern a string field, mapping None to the empty string.
+
+    Args:
+        value: String from the JSON data, or None
+
+    Returns:
+        The canonical instance of the string
+    """
+    return sys.intern(value) if value else ''
+
+
+@lru_cache(maxsize=4096)
+def format_event_date(date_obj: datetime) -> str:
+    """
+    Format an event date for the table's date column, once per distinct date.
+
+    Args:
+        date_obj: Parsed event date
+
+    Returns:
+        Date such as '06 Nov (Thu)'
+    """
+    return sys.intern(date_obj.strftime('%d %b (%a)'))
+
+
+def load_subjects(subjects: Mapping[str, Union[Mapping[str, Any], Subject]]) -> Dict[str, Subject]:
+    """
+    Convert the JSON subjects table into Subject records.
+
+    Args:
+        subjects: Dictionary of subject information; values that are
+                  already Subject records are kept as they are
+
+    Returns:
+        Subject records keyed by subject key
+    """
+    records: Dict[str, Subject] = {}
+    for key, info in subjects.items():
+        if isinstance(info, Subject):
+            records[key] = info
+        else:
+            records[key] = Subject(
+                intern_text(info.get('name', key)),
+                intern_text(info.get('code', '')),
+                intern_text(info.get('default_room', '')),
+            )
+    return records
+
+
+def unknown_subject(key: str) -> Subject:
+    """
+    Record used for events whose subject key is not in the subjects table.
+
+    Args:
+        key: The unknown subject key
+
+    Returns:
+        Subject named after the key, without code or default room
+    """
+    return Subject(intern_text(key), '', '')
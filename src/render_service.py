@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Render Service
+Long-running HTTP service that renders schedule JSON with warm worker processes
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.queues import SimpleQueue
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from . import config
+from .build_cache import config_fingerprint
+from .compile_progress import CompileProgress, ProgressCallback
+from .document_builder import generate_latex_from_json
+from .pdf_compiler import compile_pdf
+from .pdf_draft import generate_draft_pdf_from_json
+from .preamble_format import ensure_preamble_format
+
+CONTENT_TYPES = {'pdf': 'application/pdf', 'tex': 'application/x-tex'}
+
+
+class RenderError(Exception):
+    """Raised by a worker when a schedule cannot be compiled."""
+
+
+class LruBytesCache:
+    """
+    Thread-safe LRU cache of byte strings bounded by their total size.
+
+    Attributes:
+        max_bytes: Upper bound on the summed size of cached values
+        size: Current summed size of cached values
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Args:
+            max_bytes: Upper bound on the summed size of cached values
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a value and mark it as most recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached bytes, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """
+        Store a value, evicting least recently used entries to stay within max_bytes.
+
+        Values larger than the whole cache are not stored.
+
+        Args:
+            key: Cache key
+            value: Bytes to cache
+        """
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+# Queue carrying (job, CompileProgress) from the worker processes to the service; None stops the collector
+_progress_queue: Optional['SimpleQueue[Optional[Tuple[str, CompileProgress]]]'] = None
+
+
+def _init_worker(progress_queue: 'SimpleQueue[Optional[Tuple[str, CompileProgress]]]') -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _warm_worker() -> int:
+    """Runs once per worker at startup so the first request finds it ready."""
+    return os.getpid()
+
+
+def _job_progress(job: str) -> Optional[ProgressCallback]:
+    if _progress_queue is None:
+        return None
+    queue = _progress_queue
+    return lambda progress: queue.put((job, progress))
+
+
+def _render_job(payload: bytes, output_format: str, renderer: str, use_format: bool, job: str = '') -> bytes:
+    """
+    Worker-process job: render one schedule and return the file contents.
+
+    pdflatex progress is sent to the service under the job's cache key.
+
+    Raises:
+        ValueError: If the schedule JSON is invalid
+        RenderError: If pdflatex fails
+    """
+    with tempfile.TemporaryDirectory(prefix='schedule-render-') as work_dir:
+        json_file = os.path.join(work_dir, 'schedule.json')
+        tex_file = os.path.join(work_dir, 'schedule.tex')
+        pdf_file = os.path.join(work_dir, 'schedule.pdf')
+        with open(json_file, 'wb') as f:
+            f.write(payload)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            if renderer == 'draft':
+                generate_draft_pdf_from_json(json_file, pdf_file)
+            else:
+                generate_latex_from_json(json_file, tex_file)
+                if output_format == 'tex':
+                    pdf_file = tex_file
+                elif not compile_pdf(tex_file, quiet=True, use_format=use_format, progress=_job_progress(job)):
+                    raise RenderError("PDF compilation failed")
+
+        with open(pdf_file, 'rb') as f:
+            return f.read()
+
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RenderService:
+    """
+    Renders schedules in a pool of warm worker processes behind an LRU cache.
+
+    Results are keyed by a hash of the request body and render options, so
+    a repeated request is answered from memory. Identical requests that
+    arrive while the first is still rendering wait for the same job.
+    The page progress and ETA of running compiles are part of the metrics.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache_bytes: int = config.SERVICE_CACHE_BYTES,
+                 use_format: bool = config.USE_PREAMBLE_FORMAT, version: str = '') -> None:
+        """
+        Args:
+            workers: Number of worker processes (defaults to CPU count)
+            cache_bytes: Size bound of the rendered-output cache
+            use_format: Compile from the precompiled preamble format
+            version: Generator version, part of every cache key
+        """
+        self.workers = workers or config.SERVICE_WORKERS or os.cpu_count() or 1
+        self.cache = LruBytesCache(cache_bytes)
+        self.version = version
+        self._config_hash = config_fingerprint()
+
+        # Dump the format once before the workers start using it
+        self.use_format = use_format and ensure_preamble_format() is not None
+
+        self._progress_queue: 'SimpleQueue[Optional[Tuple[str, CompileProgress]]]' = multiprocessing.SimpleQueue()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(self._progress_queue,))
+        for future in [self._pool.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._progress: Dict[str, CompileProgress] = {}
+        self._progress_thread = threading.Thread(target=self._collect_progress, daemon=True)
+        self._progress_thread.start()
+        self._latencies: Deque[float] = deque(maxlen=config.SERVICE_LATENCY_WINDOW)
+        self._started = time.time()
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def cache_key(self, payload: bytes, output_format: str, renderer: str) -> str:
+        """
+        Content hash identifying a render request.
+
+        Args:
+            payload: Schedule JSON bytes
+            output_format: 'pdf' or 'tex'
+            renderer: 'latex' or 'draft'
+
+        Returns:
+            SHA-256 hex digest
+        """
+        digest = hashlib.sha256(payload)
+        for part in (output_format, renderer, self.version, self._config_hash):
+            digest.update(b'\0' + part.encode('utf-8'))
+        return digest.hexdigest()
+
+    def render(self, payload: bytes, output_format: str = 'pdf', renderer: str = config.RENDERER) -> Tuple[bytes, bool]:
+        """
+        Render a schedule, serving repeated requests from the cache.
+
+        Args:
+            payload: Schedule JSON bytes
+            output_format: 'pdf' or 'tex'
+            renderer: 'latex' or 'draft' (draft only produces PDFs)
+
+        Returns:
+            Tuple of (file contents, whether it came from the cache)
+
+        Raises:
+            ValueError: If the options or the schedule JSON are invalid
+            RenderError: If pdflatex fails
+        """
+        if output_format not in CONTENT_TYPES:
+            raise ValueError(f"Unknown format '{output_format}' (use 'pdf' or 'tex')")
+        if renderer not in ('latex', 'draft'):
+            raise ValueError(f"Unknown renderer '{renderer}' (use 'latex' or 'draft')")
+        if renderer == 'draft' and output_format == 'tex':
+            raise ValueError("The draft renderer only produces PDFs")
+
+        key = self.cache_key(payload, output_format, renderer)
+        with self._lock:
+            self.requests += 1
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached, True
+            self.misses += 1
+            inflight = self._inflight.get(key)
+            submitted = inflight is None
+            if inflight is None:
+                future = self._inflight[key] = self._pool.submit(_render_job, payload, output_format, renderer,
+                                                                 self.use_format, key)
+            else:
+                future = inflight
+
+        if submitted:
+            # Registered outside the lock: the callback runs immediately if the job already finished
+            started = time.perf_counter()
+            future.add_done_callback(lambda done: self._finish(key, done, started))
+
+        try:
+            return future.result(), False
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+
+    def _finish(self, key: str, future: Future, started: float) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._progress.pop(key, None)
+            self._latencies.append(time.perf_counter() - started)
+
+    def _collect_progress(self) -> None:
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                return
+            key, progress = item
+            with self._lock:
+                # Updates can arrive after the job has finished
+                if key in self._inflight and not progress.done:
+                    self._progress[key] = progress
+
+    def _compiling(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'job': key[:12],
+                'page': progress.page,
+                'expected_pages': progress.expected_pages,
+                'pass': progress.pass_number,
+                'percent': round(progress.fraction * 100, 1),
+                'eta_seconds': None if progress.eta is None else round(progress.eta, 1),
+            }
+            for key, progress in self._progress.items()
+        ]
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of queue, cache and latency statistics.
+
+        Returns:
+            JSON-serializable dictionary
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            lookups = self.hits + self.misses
+            return {
+                'uptime_seconds': round(time.time() - self._started, 3),
+                'workers': self.workers,
+                'queue_depth': len(self._inflight),
+                'compiling': self._compiling(),
+                'requests': self.requests,
+                'errors': self.errors,
+                'cache': {
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hits / lookups if lookups else 0.0,
+                    'entries': len(self.cache),
+                    'bytes': self.cache.size,
+                    'max_bytes': self.cache.max_bytes,
+                },
+                'render_latency_ms': {
+                    'samples': len(latencies),
+                    'p50': _scale(_percentile(latencies, 50)),
+                    'p90': _scale(_percentile(latencies, 90)),
+                    'p99': _scale(_percentile(latencies, 99)),
+                },
+            }
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._pool.shutdown(wait=True)
+        self._progress_queue.put(None)
+        self._progress_thread.join()
+
+
+def _scale(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end of a RenderService.
+
+    Routes:
+        POST /render?format=pdf|tex&renderer=latex|draft  (body: schedule JSON)
+        GET  /health
+        GET  /metrics
+    """
+
+    server_version = 'ScheduleRenderService'
+
+    @property
+    def service(self) -> RenderService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(data).encode('utf-8'), 'application/json')
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path == '/health':
+            metrics = self.service.metrics()
+            self._send_json(200, {'status': 'ok', 'workers': metrics['workers'], 'queue_depth': metrics['queue_depth']})
+        elif path == '/metrics':
+            self._send_json(200, self.service.metrics())
+        else:
+            self._send_json(404, {'error': f"Unknown path '{path}'"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != '/render':
+            self._send_json(404, {'error': f"Unknown path '{url.path}'"})
+            return
+
+        query = parse_qs(url.query)
+        output_format = query.get('format', ['pdf'])[0]
+        renderer = query.get('renderer', [config.RENDERER])[0]
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0:
+                self._send_json(400, {'error': "Request body must contain schedule JSON"})
+                return
+            if length > config.SERVICE_MAX_REQUEST_BYTES:
+                self._send_json(413, {'error': f"Request body exceeds {config.SERVICE_MAX_REQUEST_BYTES} bytes"})
+                return
+            payload = self.rfile.read(length)
+            content, cached = self.service.render(payload, output_format, renderer)
+        except (ValueError, KeyError) as e:
+            # json.JSONDecodeError is a ValueError
+            self._send_json(400, {'error': f"{type(e).__name__}: {e}"})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, content, CONTENT_TYPES[output_format], {'X-Cache': 'HIT' if cached else 'MISS'})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if config.SERVICE_ACCESS_LOG:
+            super().log_message(format, *args)
+
+
+def serve(host: str = config.SERVICE_HOST, port: int = config.SERVICE_PORT, workers: Optional[int] = None,
+          cache_bytes: int = config.SERVICE_CACHE_BYTES, use_format: bool = config.USE_PREAMBLE_FORMAT,
+          version: str = '') -> None:
+    """
+    Run the render service until interrupted.
+
+    Args:
+        host: Interface to listen on
+        port: TCP port to listen on
+        workers: Number of worker processes (defaults to CPU count)
+        cache_bytes: Size bound of the rendered-output cache
+        use_format: Compile from the precompiled preamble format
+        version: Generator version, part of every cache key
+    """
+    service = RenderService(workers, cache_bytes, use_format, version)
+    server = ThreadingHTTPServer((host, port), RenderRequestHandler)
+    server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+    print(f"Render service listening on http://{host}:{server.server_port} ({service.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping render service")
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Split Compilation
+Compiles one large schedule as parallel sub-documents and merges the PDFs
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+from typing import List, Optional
+
+from . import config
+from .build_cache import FragmentStore
+from .data_loader import ScheduleIndex
+from .calendar_externalize import externalize_calendars
+from .compile_progress import terminal_progress
+from .document_builder import (
+    CalendarGraphics,
+    DocumentSection,
+    RowRenderer,
+    document_begin,
+    document_end,
+    document_sections,
+    load_marked_index,
+)
+from .latex_header import generate_latex_header
+from .latex_writer import LatexWriter
+from .pdf_compiler import compile_pdfs_async
+from .table_generators import event_row
+from .parsed_cache import load_schedule_index
+from .date_window import DateWindow
+from .tracing import counter, span
+
+
+def plan_parts(sections: List[DocumentSection], max_parts: int) -> List[List[DocumentSection]]:
+    """
+    Group document sections into at most max_parts sub-documents.
+
+    A sub-document always starts at a section that begins a new page, so
+    the merged PDF paginates exactly like the single document. Consecutive
+    sections are packed so each part holds a similar number of table rows.
+
+    Args:
+        sections: Sections from document_sections, in order
+        max_parts: Upper bound on the number of parts
+
+    Returns:
+        List of parts, each a list of consecutive sections
+    """
+    # Units that cannot be split: a page-starting section plus any that follow it on the same page
+    units: List[List[DocumentSection]] = []
+    for section in sections:
+        if section.starts_page or not units:
+            units.append([section])
+        else:
+            units[-1].append(section)
+
+    max_parts = max(1, min(max_parts, len(units)))
+    weights = [sum(section.rows for section in unit) + 1 for unit in units]
+    total = sum(weights)
+
+    parts: List[List[DocumentSection]] = [[]]
+    done = 0
+    for unit, weight in zip(units, weights):
+        # Start a new part once the current one reaches its share of the rows
+        if parts[-1] and len(parts) < max_parts and done >= total * len(parts) / max_parts:
+            parts.append([])
+        parts[-1].extend(unit)
+        done += weight
+    return parts
+
+
+def write_parts(parts: List[List[DocumentSection]], output_file: str, tex_files: List[str],
+                pdf_mode: str = config.PDF_MODE) -> int:
+    """
+    Write the full document and its sub-documents in one pass over the sections.
+
+    Every section is rendered once and its lines go both to the full
+    document and to the sub-document of its part, so neither is read back
+    or rendered again. Each sub-document repeats the shared preamble, and
+    its done counter is set to the number of checkboxes in earlier parts,
+    so form field names stay unique after the PDFs are merged.
+
+    Args:
+        parts: Consecutive document sections, grouped by plan_parts
+        output_file: Path of the full .tex file
+        tex_files: Path of each part's sub-document
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+
+    Returns:
+        Number of lines in the full document
+    """
+    header = generate_latex_header(pdf_mode)
+    done_offset = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        with LatexWriter(f) as writer:
+            writer.write_lines(header)
+            writer.write_lines(document_begin())
+            for part, tex_file in zip(parts, tex_files):
+                with open(tex_file, 'w', encoding='utf-8') as part_f:
+                    with LatexWriter(part_f) as part_writer:
+                        part_writer.write_lines(header)
+                        part_writer.write_lines(document_begin())
+                        part_writer.write_line(f"\\setcounter{{done}}{{{done_offset}}}")
+                        for section in part:
+                            for line in section.lines:
+                                writer.write_line(line)
+                                part_writer.write_line(line)
+                        part_writer.write_lines(document_end())
+                done_offset += sum(section.rows for section in part)
+            writer.write_lines(document_end())
+    return writer.lines_written
+
+
+def find_merge_tool() -> Optional[str]:
+    """
+    Locate a PDF merge tool.
+
+    Returns:
+        Name of the first available tool from config.PDF_MERGE_TOOLS, or None
+    """
+    for tool in config.PDF_MERGE_TOOLS:
+        if shutil.which(tool):
+            return tool
+    return None
+
+
+def merge_pdfs(pdf_files: List[str], output_pdf: str) -> bool:
+    """
+    Concatenate PDFs into a single file with qpdf or pdfunite.
+
+    Args:
+        pdf_files: Input PDFs in page order
+        output_pdf: Path of the merged PDF
+
+    Returns:
+        True if the merged PDF was written, False otherwise
+    """
+    tool = find_merge_tool()
+    if tool is None:
+        print(f"No PDF merge tool found (install one of: {', '.join(config.PDF_MERGE_TOOLS)})")
+        return False
+
+    # Write next to the target first so a failed merge never leaves a truncated PDF
+    merged = output_pdf + '.partial'
+    if tool == 'qpdf':
+        command = ['qpdf', '--empty', '--pages'] + pdf_files + ['--', merged]
+    else:
+        command = [tool] + pdf_files + [merged]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    # qpdf exits with 3 for warnings but still writes the file
+    if result.returncode not in (0, 3) or not os.path.exists(merged):
+        if os.path.exists(merged):
+            os.remove(merged)
+        return False
+    os.replace(merged, output_pdf)
+    return True
+
+
+def write_index_split(index: ScheduleIndex, output_file: str, cache: Optional[FragmentStore] = None,
+                      jobs: Optional[int] = None, calendar_graphics: Optional[CalendarGraphics] = None,
+                      row: RowRenderer = event_row, pdf_mode: str = config.PDF_MODE) -> List[str]:
+    """
+    Write the full .tex file of an indexed schedule and its sub-documents.
+
+    Args:
+        index: Parsed and bucketed schedule data
+        output_file: Path of the full .tex file
+        cache: Optional fragment store, such as a BuildCache, for per-month fragments
+        jobs: Maximum concurrent pdflatex processes (defaults to CPU count)
+        calendar_graphics: Externalized calendar PDFs, or None to draw inline
+        row: Renders an event's table row without the date column
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+
+    Returns:
+        Paths of the sub-documents in page order
+    """
+    jobs = jobs or config.BATCH_COMPILE_JOBS or os.cpu_count() or 1
+    parts = plan_parts(document_sections(index, cache, calendar_graphics, row), jobs * config.SPLIT_PARTS_PER_JOB)
+
+    output_dir = os.path.dirname(output_file) or '.'
+    stem = os.path.splitext(os.path.basename(output_file))[0]
+    # Kept between builds, so unchanged parts are not compiled again
+    parts_dir = os.path.join(output_dir, f".{stem}{config.COMPILE_BUILD_DIR_SUFFIX}", 'parts')
+    os.makedirs(parts_dir, exist_ok=True)
+    tex_files = [os.path.join(parts_dir, f"part-{number:03d}.tex") for number in range(len(parts))]
+    with span('emit_latex', parts=len(parts)):
+        total_lines = write_parts(parts, output_file, tex_files, pdf_mode)
+    counter('latex', lines=total_lines)
+    if cache is not None:
+        counter('fragment_cache', hits=cache.hits, misses=cache.misses)
+    print(f"\nGenerated {output_file}")
+    print(f"Total lines: {total_lines}")
+    return tex_files
+
+
+def compile_parts(tex_files: List[str], output_file: str, jobs: Optional[int] = None,
+                  use_format: bool = config.USE_PREAMBLE_FORMAT, pdf_mode: str = config.PDF_MODE) -> bool:
+    """
+    Compile sub-documents in parallel and merge their PDFs.
+
+    Args:
+        tex_files: Paths of the sub-documents in page order
+        output_file: Path of the full .tex file; the merged PDF is written next to it
+        jobs: Maximum concurrent pdflatex processes (defaults to CPU count)
+        use_format: Compile from the precompiled preamble format
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+
+    Returns:
+        True if the merged PDF was written, False otherwise
+    """
+    jobs = jobs or config.BATCH_COMPILE_JOBS or os.cpu_count() or 1
+    output_dir = os.path.dirname(output_file) or '.'
+    stem = os.path.splitext(os.path.basename(output_file))[0]
+
+    print(f"\nCompiling {len(tex_files)} parts with up to {jobs} pdflatex processes...")
+    with span('compile_parts', parts=len(tex_files), jobs=jobs):
+        results = asyncio.run(compile_pdfs_async(tex_files, max_concurrency=jobs, use_format=use_format,
+                                                 progress=terminal_progress(), pdf_mode=pdf_mode))
+    failed = [result for result in results if not result.success]
+    if failed:
+        for result in failed:
+            reason = 'timed out' if result.timed_out else f"exit code {result.returncode}"
+            print(f"Part {os.path.basename(result.tex_file)} failed ({reason})")
+        print("PDF compilation failed")
+        return False
+    reused = sum(1 for result in results if result.passes == 0)
+    if reused:
+        print(f"Reused {reused} unchanged parts")
+
+    pdf_file = os.path.join(output_dir, f"{stem}.pdf")
+    with span('merge_pdfs', parts=len(tex_files)):
+        merged = merge_pdfs([result.pdf_file for result in results], pdf_file)
+    if not merged:
+        print("PDF merge failed")
+        return False
+    print(f"PDF compiled: {pdf_file}")
+    return True
+
+
+def compile_pdf_split(json_file: str, output_file: str, cache: Optional[FragmentStore] = None,
+                      jobs: Optional[int] = None, use_format: bool = config.USE_PREAMBLE_FORMAT,
+                      backend: str = config.EVENT_BACKEND, externalize: bool = config.EXTERNALIZE_CALENDARS,
+                      mark: bool = False, parsed_cache: bool = config.PARSED_CACHE,
+                      pdf_mode: str = config.PDF_MODE, window: Optional[DateWindow] = None) -> bool:
+    """
+    Generate a schedule and compile it across several pdflatex processes.
+
+    The full .tex file is still written to output_file. For compilation the
+    body is split at page boundaries into sub-documents that share the
+    preamble; they compile in parallel and the PDFs are merged in order.
+    The body is rendered once and written to both (see write_parts).
+
+    Args:
+        json_file: Path to input JSON or JSON Lines file with schedule data
+        output_file: Path to output .tex file
+        cache: Optional fragment store, such as a BuildCache, for per-month fragments
+        jobs: Maximum concurrent pdflatex processes (defaults to CPU count)
+        use_format: Compile from the precompiled preamble format
+        backend: Event grouping backend ('dict' or 'columnar')
+        externalize: Include the calendars as cached per-month PDF graphics
+        mark: Report room and subject clashes and highlight the clashing rows
+        parsed_cache: Read large inputs from the parsed-schedule cache
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+        window: Only render the events and calendar months inside this date range
+
+    Returns:
+        True if the merged PDF was written, False otherwise
+
+    Raises:
+        FileNotFoundError: If JSON file doesn't exist
+        ValueError: If JSON data is invalid or missing required fields, or
+                    the window lies outside the schedule period
+    """
+    print(f"Reading {json_file}...")
+    row: RowRenderer = event_row
+    if mark:
+        index, row = load_marked_index(json_file, backend, window)
+    else:
+        index = load_schedule_index(json_file, backend, parsed_cache, window)
+    print(f"Loaded {index.event_count} events and {len(index.subjects)} subjects")
+
+    calendar_graphics = externalize_calendars(index, jobs=jobs) if externalize else None
+    tex_files = write_index_split(index, output_file, cache, jobs, calendar_graphics, row, pdf_mode)
+    return compile_parts(tex_files, output_file, jobs, use_format, pdf_mode)
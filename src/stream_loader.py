@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Streaming Loader
+Loads schedule events incrementally from large JSON and JSON Lines files
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from . import config
+from .data_loader import validate_schedule_info, validate_event
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Scanner item kinds
+_VALUE = 'value'
+_ARRAY_START = 'array_start'
+_ITEM = 'item'
+
+
+class _JsonStreamReader:
+    """
+    Reads JSON values one at a time from a text stream using a bounded buffer.
+
+    The buffer holds at most about twice the largest single value: when a
+    value does not fit, the buffer is doubled rather than grown by a chunk,
+    so decoding it is retried a logarithmic number of times.
+    """
+
+    def __init__(self, f: TextIO, source: str, chunk_size: int = config.STREAM_CHUNK_SIZE) -> None:
+        self._f = f
+        self._source = source
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        # Position of the buffer start in the file, for error messages
+        self._offset = 0
+        self._line = 1
+        self._column = 0
+
+    def _fill(self, min_chars: int = 0) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(max(self._chunk_size, min_chars))
+        if not chunk:
+            self._eof = True
+            return False
+        newlines = self._buf.count('\n', 0, self._pos)
+        if newlines:
+            self._line += newlines
+            self._column = self._pos - self._buf.rfind('\n', 0, self._pos) - 1
+        else:
+            self._column += self._pos
+        self._offset += self._pos
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, msg: str, pos: Optional[int] = None) -> json.JSONDecodeError:
+        """
+        Build a decode error whose position is counted from the start of the file.
+
+        Args:
+            msg: Description of the problem
+            pos: Position of the problem in the buffer (defaults to the read position)
+
+        Returns:
+            Error with pos, lineno and colno in the file; doc is the buffer
+        """
+        if pos is None:
+            pos = self._pos
+        error = json.JSONDecodeError(f"Invalid JSON format in '{self._source}': {msg}", self._buf, pos)
+        newlines = self._buf.count('\n', 0, pos)
+        error.pos = self._offset + pos
+        error.lineno = self._line + newlines
+        if not newlines:
+            error.colno = self._column + pos + 1
+        error.args = (f"{error.msg}: line {error.lineno} column {error.colno} (char {error.pos})",)
+        return error
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end of input)."""
+        while True:
+            match = _WHITESPACE.match(self._buf, self._pos)
+            assert match is not None  # The pattern also matches the empty string
+            self._pos = match.end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, which must be one of chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            expected = ' or '.join(f"'{c}'" for c in chars)
+            raise self._error(f"Expecting {expected}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # The value may continue past the buffer; at least double what is pending
+                if self._fill(len(self._buf) - self._pos):
+                    continue
+                raise self._error(e.msg, e.pos)
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buf) and self._fill(len(self._buf) - self._pos):
+                continue
+            self._pos = end
+            return obj
+
+    def expect_end(self) -> None:
+        """Check that only whitespace is left in the input."""
+        if self.peek():
+            raise self._error("Extra data")
+
+
+def _scan_schedule_json(f: TextIO, source: str) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Walk the top-level object of a schedule JSON file.
+
+    Yields:
+        (kind, key, value) tuples: ('value', key, value) for ordinary keys,
+        ('array_start', 'events', None) when the events array opens and
+        ('item', 'events', event) for each element of it
+    """
+    reader = _JsonStreamReader(f, source)
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.expect('}')
+    else:
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key == 'events':
+                reader.expect('[')
+                yield _ARRAY_START, key, None
+                if reader.peek() == ']':
+                    reader.expect(']')
+                else:
+                    while True:
+                        yield _ITEM, key, reader.value()
+                        if reader.expect(',]') == ']':
+                            break
+            else:
+                yield _VALUE, key, reader.value()
+            if reader.expect(',}') == '}':
+                break
+    reader.expect_end()
+
+
+def _open(json_file: str) -> TextIO:
+    try:
+        return open(json_file, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Schedule file '{json_file}' not found")
+
+
+def _validate_header(header: Dict[str, Any], json_file: str) -> Dict[str, Any]:
+    missing_keys = [key for key in ('schedule_info', 'subjects') if key not in header]
+    if missing_keys:
+        raise ValueError(f"Missing required fields in JSON: {', '.join(missing_keys)}")
+    validate_schedule_info(header['schedule_info'])
+    return {'schedule_info': header['schedule_info'], 'subjects': header['subjects']}
+
+
+def _stream_json(json_file: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read a schedule JSON file in a single pass.
+
+    The first item is the validated header, yielded as soon as
+    schedule_info and subjects have been read; the events follow. Events
+    that precede the header in the file are held until it is complete.
+    """
+    header: Dict[str, Any] = {}
+    early_events: List[Any] = []
+    seen_events = False
+    with _open(json_file) as f:
+        scan = _scan_schedule_json(f, json_file)
+        for kind, key, value in scan:
+            if kind == _VALUE and key in ('schedule_info', 'subjects'):
+                header[key] = value
+                if len(header) == 2:
+                    break
+            elif kind == _ARRAY_START:
+                seen_events = True
+            elif kind == _ITEM:
+                early_events.append(value)
+        yield _validate_header(header, json_file)
+
+        position = 0
+        for value in early_events:
+            yield validate_event(value, position)
+            position += 1
+        early_events.clear()
+        for kind, _, value in scan:
+            if kind == _ARRAY_START:
+                seen_events = True
+            elif kind == _ITEM:
+                yield validate_event(value, position)
+                position += 1
+    if not seen_events:
+        raise ValueError("Missing required fields in JSON: events")
+
+
+def _read_jsonl_header(json_file: str) -> Dict[str, Any]:
+    with _open(json_file) as f:
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                return _validate_header(_decode_line(line, json_file, line_no), json_file)
+    raise ValueError("Missing required fields in JSON: schedule_info, subjects")
+
+
+def _iter_jsonl_events(json_file: str) -> Iterator[Dict[str, Any]]:
+    position = 0
+    header_seen = False
+    with _open(json_file) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            if not header_seen:
+                header_seen = True
+                continue
+            yield validate_event(_decode_line(line, json_file, line_no), position)
+            position += 1
+
+
+def _decode_line(line: str, json_file: str, line_no: int) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise json.JSONDecodeError(f"Invalid JSON format in '{json_file}' line {line_no}: {e.msg}", e.doc, e.pos)
+
+
+def is_jsonl_file(json_file: str) -> bool:
+    """
+    Check whether a schedule file uses the JSON Lines format.
+
+    Args:
+        json_file: Path to the schedule file
+
+    Returns:
+        True for .jsonl and .ndjson files
+    """
+    return json_file.lower().endswith(('.jsonl', '.ndjson'))
+
+
+def load_schedule_stream(json_file: str = 'schedule_data.json') -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """
+    Load schedule metadata eagerly and events lazily.
+
+    Two input formats are supported:
+
+    - JSON: the regular schedule file, read in a single pass. The events
+      array is decoded one element at a time from a bounded read buffer,
+      so memory does not depend on the file size. Anything but whitespace
+      after the top-level object is an error.
+    - JSON Lines (.jsonl/.ndjson): the first record holds schedule_info and
+      subjects, every following line holds one event.
+
+    Each event is validated as it is read.
+
+    Args:
+        json_file: Path to the schedule file
+
+    Returns:
+        Tuple of (dict with schedule_info and subjects, iterator over events)
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        json.JSONDecodeError: If the JSON is malformed
+        ValueError: If required fields are missing (event errors are raised
+                    while iterating)
+    """
+    if is_jsonl_file(json_file):
+        return _read_jsonl_header(json_file), _iter_jsonl_events(json_file)
+    stream = _stream_json(json_file)
+    return next(stream), stream
@@ -4,55 +4,97 @@ Table Generators
 Generates monthly event tables and exam period tables
 """
 
-from datetime import datetime
-from collections import defaultdict
-from typing import List, Dict, Any
+from datetime import date
+from typing import List, Dict, Any, Callable, Iterator, Iterable, Optional, Tuple
 
+from .event_processor import bucket_events_by_day
+from .records import Event
 
-def generate_month_table(month_name: str, year: int, month_events: List[Dict[str, Any]], subjects: Dict[str, Dict[str, str]], first_table: bool = True) -> List[str]:
+
+def event_row(event: Event, marked: bool = False) -> str:
+    """
+    Table row for an event, without its date column.
+    
+    Args:
+        event: Event record
+        marked: Highlight the row as clashing with another event
+        
+    Returns:
+        LaTeX row text starting at the column separator before the time
+    """
+    # Escape ampersands in event type and make it bold
+    event_type_escaped = event.type.replace('&', r'\&')
+    event_desc = f"\\textbf{{{event_type_escaped}}} -- \\textit{{{event.subject_display}}}"
+    if marked:
+        return (f" & \\textcolor{{red}}{{{event.time}}} & {event_desc} \\textcolor{{red}}{{\\ding{{72}}~clash}}"
+                f" & {event.room} & \\donebox \\\\")
+    return f" & {event.time} & {event_desc} & {event.room} & \\donebox \\\\"
+
+
+def month_table_payload(month: Dict[str, Any], month_events: List[Event], first_table: bool) -> List[Any]:
+    """
+    Data a month table fragment is rendered from, its fragment cache payload.
+
+    Args:
+        month: Month dictionary (year, month, name, date_obj)
+        month_events: Event records in this month, sorted by (date, time)
+        first_table: Whether this is the first table
+
+    Returns:
+        JSON-serializable payload
+    """
+    return [month['name'], month['year'], month_events, first_table]
+
+
+def generate_month_table(month_name: str, year: int, month_events: Iterable[Event], subjects: Dict[str, Any], first_table: bool = True,
+                         day_buckets: Optional[List[Tuple[date, List[Event]]]] = None,
+                         row: Callable[[Event], str] = event_row) -> Iterator[str]:
     """
     Generate a table for a specific month.
     
     Args:
         month_name: Name of the month
         year: Year number
-        month_events: List of events in this month
-        subjects: Dictionary of subject information
+        month_events: Event records in this month, sorted by (date, time)
+        subjects: Subject records (subjects are already resolved on the events)
         first_table: Whether this is the first table (affects page breaks)
+        day_buckets: Per-day buckets of month_events, e.g. from ScheduleIndex;
+                     derived from month_events if omitted
+        row: Renders an event's row without the date column, e.g. a memoized
+             event_row shared across documents
         
-    Returns:
-        List of LaTeX lines for the month table
+    Yields:
+        LaTeX lines for the month table
     """
-    lines = []
-    
     if not first_table:
-        lines.append(r"\newpage")
+        yield r"\newpage"
     
-    lines.append(f"% {month_name} {year}")
-    lines.append(f"\\noindent\\textbf{{\\large {month_name} {year}}}")
-    lines.append("")
-    lines.append(r"\vspace{0.3em}")
-    lines.append("")
-    lines.append(r"\begin{longtable}{@{} L{2.8cm} M{1.5cm} L{13cm} M{2cm} M{1.8cm} @{}}")
-    lines.append(r"\toprule")
-    lines.append(r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\")
-    lines.append(r"\midrule")
-    lines.append(r"\endfirsthead")
-    lines.append("")
-    lines.append(r"\toprule")
-    lines.append(r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\")
-    lines.append(r"\midrule")
-    lines.append(r"\endhead")
-    lines.append("")
+    yield f"% {month_name} {year}"
+    yield f"\\noindent\\textbf{{\\large {month_name} {year}}}"
+    yield ""
+    yield r"\vspace{0.3em}"
+    yield ""
+    yield r"\begin{longtable}{@{} L{2.8cm} M{1.5cm} L{13cm} M{2cm} M{1.8cm} @{}}"
+    yield r"\toprule"
+    yield r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\"
+    yield r"\midrule"
+    yield r"\endfirsthead"
+    yield ""
+    yield r"\toprule"
+    yield r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\"
+    yield r"\midrule"
+    yield r"\endhead"
     
     # Group events by date
-    events_by_date = defaultdict(list)
-    for event in month_events:
-        events_by_date[event['date_str']].append(event)
+    if day_buckets is None:
+        day_buckets = bucket_events_by_day(month_events)
     
-    # Generate table rows
-    for date_str in sorted(events_by_date.keys(), key=lambda d: datetime.strptime(d.split('(')[0].strip(), '%d %b')):
-        date_events = events_by_date[date_str]
+    # Generate table rows, separating dates with a rule
+    for date_idx, (_, date_events) in enumerate(day_buckets):
+        date_str = date_events[0].date_str
+        if date_idx > 0:
+            yield r"\midrule"
+        yield ""
         
         for i, event in enumerate(date_events):
             if i == 0:
@@ -60,84 +102,58 @@ def generate_month_table(month_name: str, year: int, month_events: List[Dict[str
             else:
                 date_col = ""
             
-            time_col = event['time']
-            # Escape ampersands in event type and make it bold
-            event_type_escaped = event['type'].replace('&', r'\&')
-            # Get subject display with code
-            subject_name = event.get('subject_name', '')
-            subject_code = event.get('subject_code', '')
-            subject_display = f"{subject_name} ({subject_code})" if subject_code else subject_name
-            event_desc = f"\\textbf{{{event_type_escaped}}} -- \\textit{{{subject_display}}}"
-            room_col = event['room']
-            
-            lines.append(f"{date_col} & {time_col} & {event_desc} & {room_col} & \\donebox \\\\")
-        
-        lines.append(r"\midrule")
-        lines.append("")
-    
-    # Remove last midrule and add bottomrule
-    if lines[-1] == "":
-        lines.pop()
-    if lines[-1] == r"\midrule":
-        lines.pop()
+            yield f"{date_col}{row(event)}"
     
-    lines.append(r"\bottomrule")
-    lines.append(r"\end{longtable}")
-    lines.append("")
-    lines.append(r"\vspace{0.5em}")
-    lines.append("")
-    
-    return lines
+    yield r"\bottomrule"
+    yield r"\end{longtable}"
+    yield ""
+    yield r"\vspace{0.5em}"
+    yield ""
+
 
+def _exam_period_table_head() -> Iterator[str]:
+    yield r"\newpage"
+    yield r"% Exam Period"
+    yield r"\noindent\textbf{\large Exam Period}"
+    yield ""
+    yield r"\vspace{0.3em}"
+    yield ""
+    yield r"\begin{longtable}{@{} L{2.8cm} M{1.5cm} L{13cm} M{2cm} M{1.8cm} @{}}"
+    yield r"\toprule"
+    yield r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\"
+    yield r"\midrule"
+    yield r"\endfirsthead"
+    yield ""
+    yield r"\toprule"
+    yield r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\"
+    yield r"\midrule"
+    yield r"\endhead"
+    yield ""
 
-def generate_exam_period_table(exam_events: List[Dict[str, Any]], subjects: Dict[str, Dict[str, str]]) -> List[str]:
+
+def generate_exam_period_table(exam_events: Iterable[Event], subjects: Dict[str, Any],
+                               row: Callable[[Event], str] = event_row) -> Iterator[str]:
     """
     Generate exam period table.
     
     Args:
-        exam_events: List of exam period events
-        subjects: Dictionary of subject information
+        exam_events: Iterable of exam period event records, consumed in a single pass
+        subjects: Subject records (subjects are already resolved on the events)
+        row: Renders an event's row without the date column
         
-    Returns:
-        List of LaTeX lines for exam period table (empty list if no exam events)
+    Yields:
+        LaTeX lines for exam period table (nothing if no exam events)
     """
-    if not exam_events:
-        return []
-    
-    lines = []
-    lines.append(r"\newpage")
-    lines.append(r"% Exam Period")
-    lines.append(r"\noindent\textbf{\large Exam Period}")
-    lines.append("")
-    lines.append(r"\vspace{0.3em}")
-    lines.append("")
-    lines.append(r"\begin{longtable}{@{} L{2.8cm} M{1.5cm} L{13cm} M{2cm} M{1.8cm} @{}}")
-    lines.append(r"\toprule")
-    lines.append(r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\")
-    lines.append(r"\midrule")
-    lines.append(r"\endfirsthead")
-    lines.append("")
-    lines.append(r"\toprule")
-    lines.append(r"\textbf{Date} & \textbf{Time} & \textbf{Event} & \textbf{Room} & \textbf{Done} \ding{51} \ding{55} \\")
-    lines.append(r"\midrule")
-    lines.append(r"\endhead")
-    lines.append("")
-    
+    table_started = False
     for event in exam_events:
-        subject_key = event['subject']
-        subject_info = subjects.get(subject_key, {})
-        subject_name = subject_info.get('name', subject_key)
-        subject_code = subject_info.get('code', '')
-        subject_display = f"{subject_name} ({subject_code})" if subject_code else subject_name
-        room = event.get('room') or subject_info.get('default_room', '')
+        # The table only exists once there is at least one row
+        if not table_started:
+            yield from _exam_period_table_head()
+            table_started = True
         
-        # Escape ampersands in event type and make it bold
-        event_type_escaped = event['type'].replace('&', r'\&')
-        event_desc = f"\\textbf{{{event_type_escaped}}} -- \\textit{{{subject_display}}}"
-        lines.append(f"{event['date']} & {event.get('time', '')} & {event_desc} & {room} & \\donebox \\\\")
-    
-    lines.append(r"\bottomrule")
-    lines.append(r"\end{longtable}")
-    lines.append("")
+        yield f"{event.date_str}{row(event)}"
     
-    return lines
+    if table_started:
+        yield r"\bottomrule"
+        yield r"\end{longtable}"
+        yield ""
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Stage Tracing
+Records spans and counters of the pipeline stages as Chrome trace events
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+TraceHook = Callable[[Dict[str, Any]], None]
+
+
+class _NullSpan:
+    """Span used while tracing is disabled; entering and leaving it does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times a block and records it as a complete ('X') trace event."""
+
+    __slots__ = ('_tracer', '_name', '_args', '_start')
+
+    def __init__(self, tracer: 'Tracer', name: str, args: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start = 0
+
+    def __enter__(self) -> '_Span':
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        end = time.perf_counter_ns()
+        event = self._tracer._event(self._name, 'X', self._start)
+        event['dur'] = (end - self._start) / 1000
+        if self._args:
+            event['args'] = self._args
+        self._tracer._record(event)
+
+
+class Tracer:
+    """
+    Collects trace events in the Chrome trace-event format.
+
+    The resulting file can be opened in chrome://tracing or Perfetto.
+    Timestamps are microseconds since the tracer was created.
+
+    Attributes:
+        events: Recorded trace events
+    """
+
+    def __init__(self, hook: Optional[TraceHook] = None) -> None:
+        """
+        Args:
+            hook: Optional callable invoked with every recorded event
+        """
+        self.events: List[Dict[str, Any]] = []
+        self._hook = hook
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def _event(self, name: str, phase: str, timestamp: int) -> Dict[str, Any]:
+        return {
+            'name': name,
+            'ph': phase,
+            'ts': (timestamp - self._origin) / 1000,
+            'pid': self._pid,
+            'tid': threading.get_ident(),
+        }
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        if self._hook is not None:
+            self._hook(event)
+
+    def span(self, name: str, **args: Any) -> _Span:
+        """
+        Context manager recording the duration of a block.
+
+        Args:
+            name: Span name shown in the trace viewer
+            **args: Extra values attached to the span
+
+        Returns:
+            Span context manager
+        """
+        return _Span(self, name, args)
+
+    def counter(self, name: str, **values: Any) -> None:
+        """
+        Record counter values at the current time.
+
+        Args:
+            name: Counter name shown in the trace viewer
+            **values: Numeric series values
+        """
+        event = self._event(name, 'C', time.perf_counter_ns())
+        event['args'] = values
+        self._record(event)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Build the Chrome trace JSON object.
+
+        Returns:
+            Dictionary with 'traceEvents' and 'displayTimeUnit'
+        """
+        return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def write(self, output_file: str) -> str:
+        """
+        Write the trace as Chrome trace-event JSON.
+
+        Args:
+            output_file: Path to the trace file
+
+        Returns:
+            The output path
+        """
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+        return output_file
+
+
+# Active tracer, or None while tracing is disabled
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, **args: Any) -> Any:
+    """
+    Context manager recording a span on the active tracer.
+
+    While tracing is disabled this returns a shared no-op object, so the
+    instrumentation in the pipeline costs a global lookup and nothing else.
+
+    Args:
+        name: Span name
+        **args: Extra values attached to the span
+
+    Returns:
+        Span context manager
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, **args)
+
+
+def counter(name: str, **values: Any) -> None:
+    """
+    Record counter values on the active tracer, if any.
+
+    Args:
+        name: Counter name
+        **values: Numeric series values
+    """
+    if _tracer is not None:
+        _tracer.counter(name, **values)
+
+
+def start_tracing(hook: Optional[TraceHook] = None) -> Tracer:
+    """
+    Enable tracing for the pipeline stages.
+
+    Args:
+        hook: Optional callable invoked with every recorded event, e.g. to
+              forward spans to another tracing system
+
+    Returns:
+        The new active tracer
+    """
+    global _tracer
+    _tracer = Tracer(hook)
+    return _tracer
+
+
+def stop_tracing(output_file: Optional[str] = None) -> Optional[Tracer]:
+    """
+    Disable tracing and optionally write the collected trace.
+
+    Args:
+        output_file: Path of the Chrome trace JSON file to write
+
+    Returns:
+        The tracer that was active, or None if tracing was not enabled
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None and output_file:
+        tracer.write(output_file)
+        print(f"Trace written to {output_file} ({len(tracer.events)} events)")
+    return tracer
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Warm pdflatex Pool
+Keeps pdflatex processes waiting with the preamble already loaded
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+from . import config
+from .build_dir import BuildDir
+from .latex_header import generate_latex_header
+from .tracing import span
+
+WARM_JOB_NAME = 'warm'
+
+
+def _preamble_text(pdf_mode: str) -> str:
+    return ''.join(line + '\n' for line in generate_latex_header(pdf_mode))
+
+
+def _worker_command() -> List[str]:
+    # Terminal input is only read in scroll mode; nonstop and batch mode abort on it
+    options = [option for option in config.PDF_COMPILER_OPTIONS if not option.startswith('-interaction')]
+    return [config.PDF_COMPILER, '-interaction=scrollmode', f"-jobname={WARM_JOB_NAME}"] + options
+
+
+class WarmWorker:
+    """
+    A pdflatex process that has read the preamble and waits for a body.
+
+    The process is started without an input file and reads its input from
+    stdin: first the preamble, which it processes right away, then a single
+    \\input of the document body. After that body the process ends, so every
+    worker runs exactly one pdflatex pass of one document.
+
+    Terminal output is copied to stdout.log by a reader thread as it
+    arrives, and passed on to a listener once a body has been started.
+
+    Attributes:
+        work_dir: Private directory holding the preamble, body and output
+        process: The pdflatex process
+    """
+
+    def __init__(self, root: str, pdf_mode: str = config.PDF_MODE) -> None:
+        """
+        Args:
+            root: Directory the worker's private directory is created in
+            pdf_mode: PDF mode of the preamble to load
+
+        Raises:
+            FileNotFoundError: If pdflatex is not installed
+        """
+        self.work_dir = tempfile.mkdtemp(prefix=f"worker-{uuid.uuid4().hex[:8]}-", dir=root)
+        with open(os.path.join(self.work_dir, 'preamble.tex'), 'w', encoding='utf-8') as f:
+            f.write(_preamble_text(pdf_mode))
+        self._stdout = open(os.path.join(self.work_dir, 'stdout.log'), 'wb')
+        try:
+            self.process = subprocess.Popen(
+                _worker_command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=self.work_dir,
+                start_new_session=(os.name == 'posix'),
+            )
+        except FileNotFoundError:
+            self._stdout.close()
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            raise
+        self._listener: Optional[Callable[[bytes], None]] = None
+        self._reader = threading.Thread(target=self._copy_output, daemon=True)
+        self._reader.start()
+        stdin = self.process.stdin
+        assert stdin is not None  # Opened with stdin=PIPE
+        self._input = stdin
+        self._input.write(b"\\input{preamble.tex}\n")
+        self._input.flush()
+
+    def _copy_output(self) -> None:
+        stdout = self.process.stdout
+        assert stdout is not None  # Opened with stdout=PIPE
+        # Blocking reads, so the thread only wakes when pdflatex writes
+        for chunk in iter(lambda: os.read(stdout.fileno(), 64 * 1024), b''):
+            self._stdout.write(chunk)
+            self._stdout.flush()
+            listener = self._listener
+            if listener is not None:
+                listener(chunk)
+
+    @property
+    def stdout_file(self) -> str:
+        """Path of the file collecting the worker's terminal output."""
+        return os.path.join(self.work_dir, 'stdout.log')
+
+    def alive(self) -> bool:
+        """Whether the process is still waiting for input."""
+        return self.process.poll() is None
+
+    def ready(self) -> bool:
+        """
+        Whether the preamble has been processed.
+
+        pdflatex shows its '*' prompt once it has read everything it was
+        given and waits for the next line.
+        """
+        with open(self.stdout_file, 'rb') as f:
+            return f.read().rstrip(b' ').endswith(b'\n*')
+
+    def start(self, body: str, listener: Optional[Callable[[bytes], None]] = None,
+              build_dir: Optional[BuildDir] = None) -> None:
+        """
+        Send the document body and let the worker compile it.
+
+        Args:
+            body: Document text following the preamble, from \\begin{document} on
+            listener: Receives the terminal output produced from here on, in
+                      chunks, on the worker's reader thread
+            build_dir: Build directory whose aux state the pass starts from
+        """
+        self._listener = listener
+        if build_dir is not None:
+            build_dir.export_state(self.work_dir, WARM_JOB_NAME)
+        with open(os.path.join(self.work_dir, 'body.tex'), 'w', encoding='utf-8') as f:
+            f.write(body)
+        try:
+            self._input.write(b"\\input{body.tex}\n")
+            self._input.close()
+        except BrokenPipeError:
+            # The worker died while priming; collect() reports the failure
+            pass
+
+    def wait(self) -> Optional[int]:
+        """
+        Wait for the process to end and its output to be copied.
+
+        Returns:
+            Exit code of the process
+        """
+        self.process.wait()
+        self._reader.join()
+        return self.process.returncode
+
+    def output(self) -> bytes:
+        """Terminal output of the worker so far."""
+        with open(self.stdout_file, 'rb') as f:
+            return f.read()
+
+    def collect(self, build_dir: BuildDir) -> None:
+        """
+        Move the finished pass's PDF, log and aux files into a build directory.
+
+        Args:
+            build_dir: Build directory of the compiled document
+        """
+        if self.process.poll() is None:
+            return
+        build_dir.import_pass(self.work_dir, WARM_JOB_NAME)
+
+    def kill(self) -> None:
+        """Stop the process if it is still running."""
+        if self.process.poll() is None:
+            try:
+                if os.name == 'posix':
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                else:
+                    self.process.kill()
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+
+    def close(self) -> None:
+        """Stop the process and remove the worker's directory."""
+        self.kill()
+        if not self._input.closed:
+            try:
+                self._input.close()
+            except BrokenPipeError:
+                pass
+        self._reader.join()
+        if self.process.stdout is not None:
+            self.process.stdout.close()
+        self._stdout.close()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def split_preamble(tex_file: str, pdf_mode: str = config.PDF_MODE) -> Optional[str]:
+    """
+    Body of a generated document, if it uses the generated preamble.
+
+    Args:
+        tex_file: Path to a .tex file
+        pdf_mode: PDF mode of the expected preamble
+
+    Returns:
+        Text after the generate_latex_header lines, or None if the file
+        starts with a different preamble
+    """
+    preamble = _preamble_text(pdf_mode)
+    with open(tex_file, 'r', encoding='utf-8') as f:
+        if f.read(len(preamble)) != preamble:
+            return None
+        return f.read()
+
+
+class WarmPool:
+    """
+    Pool of primed pdflatex workers.
+
+    The pool keeps `size` workers that have loaded the preamble. Checking a
+    worker out hands it a document body and immediately starts a fresh
+    worker in its place, so the next document again finds a primed process.
+    Only documents with the pool's generated preamble can use it;
+    callers fall back to a normal pdflatex run otherwise. Every pass of a
+    build checks out its own worker, which starts from the aux state of the
+    document's build directory and hands its output back to it.
+
+    Bodies are compiled in the worker's own directory, so paths in the
+    document must be absolute (as generated documents' paths are).
+    """
+
+    def __init__(self, size: Optional[int] = None, root: Optional[str] = None,
+                 pdf_mode: str = config.PDF_MODE) -> None:
+        """
+        Args:
+            size: Number of idle primed workers (defaults to config.WARM_POOL_SIZE
+                  or the CPU count)
+            root: Directory for the worker directories (defaults to a new
+                  temporary directory)
+            pdf_mode: PDF mode of the preamble the workers load
+        """
+        self.pdf_mode = pdf_mode
+        self.size = size or config.WARM_POOL_SIZE or os.cpu_count() or 1
+        self._own_root = root is None
+        self.root = tempfile.mkdtemp(prefix='schedule-warm-') if root is None else root
+        self._lock = threading.Lock()
+        self._idle: List[WarmWorker] = []
+        self._closed = False
+        self.available = True
+        with span('warm_pool_start', size=self.size):
+            for _ in range(self.size):
+                self._spawn()
+
+    def _spawn(self) -> None:
+        if not self.available or self._closed:
+            return
+        try:
+            self._idle.append(WarmWorker(self.root, self.pdf_mode))
+        except FileNotFoundError:
+            # No pdflatex: every checkout falls back to a normal run, which reports the error
+            self.available = False
+
+    def wait_ready(self, timeout: float = 60.0) -> bool:
+        """
+        Wait until every idle worker has processed the preamble.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if all idle workers are primed
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                workers = list(self._idle)
+            if all(worker.ready() or not worker.alive() for worker in workers):
+                return all(worker.alive() for worker in workers)
+            time.sleep(0.01)
+        return False
+
+    def checkout(self, tex_file: str, listener: Optional[Callable[[bytes], None]] = None,
+                 build_dir: Optional[BuildDir] = None) -> Optional[WarmWorker]:
+        """
+        Start compiling a document on a primed worker.
+
+        Args:
+            tex_file: Generated .tex file to compile
+            listener: Receives the worker's terminal output for the document
+                      (see WarmWorker.start)
+            build_dir: Build directory whose aux state the pass starts from
+
+        Returns:
+            The busy worker, or None if the document cannot use the pool and
+            should be compiled normally; the caller must close() the worker
+        """
+        body = split_preamble(tex_file, self.pdf_mode)
+        if body is None:
+            return None
+        with self._lock:
+            if not self._idle:
+                self._spawn()
+            if not self._idle:
+                return None
+            worker = self._idle.pop(0)
+            self._spawn()
+        if not worker.alive():
+            worker.close()
+            return None
+        worker.start(body, listener, build_dir)
+        return worker
+
+    def close(self) -> None:
+        """Stop every idle worker and remove the pool directory."""
+        with self._lock:
+            self._closed = True
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.close()
+        if self._own_root:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> 'WarmPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
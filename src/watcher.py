@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Schedule Watcher
+Rebuilds the schedule and reports the changed months whenever the file is saved
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import config
+from .build_cache import BuildCache, FragmentStore
+from .calendar_externalize import externalize_calendars
+from .data_loader import ScheduleIndex
+from .document_builder import write_schedule_index
+from .pdf_compiler import compile_pdf
+from .warm_pool import WarmPool
+from .pdf_draft import draft_pdf_path, render_draft_pdf
+from .stream_loader import load_schedule_stream
+
+FileSignature = Tuple[int, int]
+
+
+def _file_signature(json_file: str) -> Optional[FileSignature]:
+    try:
+        stat = os.stat(json_file)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _wait_until_stable(json_file: str, signature: Optional[FileSignature], debounce: float) -> Optional[FileSignature]:
+    """Wait until the file stops changing, so a burst of saves becomes one build."""
+    while True:
+        time.sleep(debounce)
+        current = _file_signature(json_file)
+        if current == signature:
+            return current
+        signature = current
+
+
+def diff_schedule_indexes(old: Optional[ScheduleIndex], new: ScheduleIndex) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Find the months whose table or calendar entry changed between two indexes.
+
+    Args:
+        old: Index of the previous build, or None for the first build
+        new: Index of the current file contents
+
+    Returns:
+        Dictionary with sorted 'tables' and 'calendars' lists of (year, month) keys
+    """
+    if old is None or old.schedule_info != new.schedule_info or old.subjects != new.subjects:
+        all_months = [(month['year'], month['month']) for month in new.months]
+        return {'tables': all_months, 'calendars': all_months}
+
+    table_keys: Set[Tuple[int, int]] = set(old.events_by_month) | set(new.events_by_month)
+    calendar_keys: Set[Tuple[int, int]] = set(old.event_dates_by_month) | set(new.event_dates_by_month)
+    return {
+        'tables': sorted(key for key in table_keys
+                         if old.events_by_month.get(key) != new.events_by_month.get(key)),
+        'calendars': sorted(key for key in calendar_keys
+                            if old.event_dates_by_month.get(key) != new.event_dates_by_month.get(key)),
+    }
+
+
+def _describe(keys: List[Tuple[int, int]]) -> str:
+    return ', '.join(f"{year}-{month:02d}" for year, month in keys) or 'none'
+
+
+def _rebuild(index: ScheduleIndex, output_file: str, cache: FragmentStore, use_format: bool, renderer: str,
+             externalize: bool, pool: Optional[WarmPool], pdf_mode: str) -> bool:
+    if renderer == 'draft':
+        render_draft_pdf(index, draft_pdf_path(output_file))
+        return True
+    calendar_graphics = externalize_calendars(index) if externalize else None
+    with open(output_file, 'w', encoding='utf-8') as f:
+        write_schedule_index(index, f, cache, calendar_graphics, pdf_mode=pdf_mode)
+    return compile_pdf(output_file, use_format=use_format, pool=pool)
+
+
+def watch_schedule(json_file: str, output_file: str, cache: Optional[FragmentStore] = None,
+                   use_format: bool = config.USE_PREAMBLE_FORMAT, backend: str = config.EVENT_BACKEND,
+                   poll_interval: float = config.WATCH_POLL_INTERVAL,
+                   debounce: float = config.WATCH_DEBOUNCE, renderer: str = config.RENDERER,
+                   externalize: bool = config.EXTERNALIZE_CALENDARS, warm_pool: bool = config.WARM_POOL,
+                   pdf_mode: str = config.PDF_MODE) -> None:
+    """
+    Rebuild the schedule every time the JSON file changes, until interrupted.
+
+    Every rebuild regenerates the whole document. Month tables and calendar
+    entries are cached as fragments keyed by their content, so unchanged
+    ones are read from the fragment cache instead of being rendered again.
+    The months that changed since the last successful build are reported
+    (see diff_schedule_indexes). Saves that arrive within `debounce`
+    seconds of each other are coalesced into a single build. A file that
+    cannot be read or parsed, or a build that fails, is reported and the
+    watcher waits for the next save. A session cache created here is
+    removed when watching stops.
+
+    Args:
+        json_file: Path to input JSON or JSON Lines file with schedule data
+        output_file: Path to output .tex file
+        cache: Fragment store for month fragments (a session BuildCache is used if None)
+        use_format: Compile from the precompiled preamble format
+        backend: Event grouping backend ('dict' or 'columnar')
+        poll_interval: Seconds between checks of the file
+        debounce: Seconds the file must stay unchanged before a build starts
+        renderer: 'latex' to write the .tex and run pdflatex, or 'draft' to
+                  render the PDF directly
+        externalize: Include the calendars as cached per-month PDF graphics
+        warm_pool: Keep a pdflatex process with the preamble loaded waiting
+                   for the next rebuild
+        pdf_mode: 'standard', 'lean' or 'glyph' output (see generate_latex_header)
+    """
+    session_dir = None
+    if cache is None:
+        session_dir = tempfile.mkdtemp(prefix='schedule-watch-')
+        cache = BuildCache(session_dir)
+    pool = WarmPool(1, pdf_mode=pdf_mode) if warm_pool and renderer == 'latex' else None
+
+    previous: Optional[ScheduleIndex] = None
+    signature = _file_signature(json_file)
+    print(f"Watching {json_file} (Ctrl+C to stop)")
+
+    try:
+        while True:
+            if signature is not None:
+                started = time.perf_counter()
+                try:
+                    header, events = load_schedule_stream(json_file)
+                    index = ScheduleIndex(dict(header, events=events), backend)
+                except (OSError, ValueError) as e:
+                    # json.JSONDecodeError is a ValueError; wait for the next save
+                    print(f"Error: {e}")
+                else:
+                    changes = diff_schedule_indexes(previous, index)
+                    print(f"\nChanged month tables: {_describe(changes['tables'])}")
+                    print(f"Changed calendar entries: {_describe(changes['calendars'])}")
+                    try:
+                        built = _rebuild(index, output_file, cache, use_format, renderer, externalize, pool,
+                                         pdf_mode)
+                    except OSError as e:
+                        # e.g. an unwritable output file or a missing pdflatex; wait for the next save
+                        print(f"Error: {e}")
+                        built = False
+                    if built:
+                        previous = index
+                        print(f"Rebuilt in {time.perf_counter() - started:.2f}s")
+                    else:
+                        print("Build failed, waiting for the next save")
+
+            # Poll until the file changes, then let the burst of saves settle
+            while True:
+                time.sleep(poll_interval)
+                current = _file_signature(json_file)
+                if current != signature:
+                    signature = _wait_until_stable(json_file, current, debounce)
+                    break
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        if pool is not None:
+            pool.close()
+        if session_dir is not None:
+            shutil.rmtree(session_dir, ignore_errors=True)
+
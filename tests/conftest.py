@@ -0,0 +1,50 @@
+"""
+Shared fixtures for the test suite
+"""
+
+import copy
+import io
+import json
+import os
+from typing import Any, Dict
+
+import pytest
+
+from benchmarks.synthetic import generate_synthetic_schedule
+from src.data_loader import ScheduleIndex
+from src.document_builder import write_schedule_index
+
+SAMPLE_SCHEDULE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'schedule_data.json')
+
+
+@pytest.fixture
+def sample_data() -> Dict[str, Any]:
+    """The schedule shipped with the repository."""
+    with open(SAMPLE_SCHEDULE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='session')
+def synthetic_master() -> Dict[str, Any]:
+    """A larger random schedule with TBA and exam period events."""
+    return generate_synthetic_schedule(3000, 6, seed=7)
+
+
+@pytest.fixture
+def synthetic_data(synthetic_master: Dict[str, Any]) -> Dict[str, Any]:
+    """A private copy of the synthetic schedule."""
+    return copy.deepcopy(synthetic_master)
+
+
+def write_json(path: str, data: Any) -> str:
+    """Write data as JSON and return the path."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+
+def render_index(index: ScheduleIndex) -> str:
+    """The LaTeX document of an index, as one string."""
+    sink = io.StringIO()
+    write_schedule_index(index, sink)
+    return sink.getvalue()
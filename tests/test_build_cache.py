@@ -0,0 +1,133 @@
+"""
+Tests for the content-addressed build cache
+"""
+
+import os
+
+from src.build_cache import BuildCache, document_variant
+from src.date_window import parse_date_window
+from tests.conftest import write_json
+
+
+def render_counting(lines, calls):
+    def render():
+        calls.append(1)
+        return list(lines)
+    return render
+
+
+def test_fragment_is_rendered_once(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    calls = []
+
+    first = list(cache.fragment('month_table', {'month': 11}, render_counting(['a', '', 'b'], calls)))
+    second = list(cache.fragment('month_table', {'month': 11}, render_counting(['a', '', 'b'], calls)))
+
+    assert first == second == ['a', '', 'b']
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_fragment_key_follows_payload_and_kind(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    calls = []
+
+    list(cache.fragment('month_table', {'month': 11}, render_counting(['a'], calls)))
+    list(cache.fragment('month_table', {'month': 12}, render_counting(['b'], calls)))
+    list(cache.fragment('calendar', {'month': 11}, render_counting(['c'], calls)))
+
+    assert len(calls) == 3
+
+
+def test_empty_fragment_round_trips(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    calls = []
+
+    list(cache.fragment('calendar', {}, render_counting([], calls)))
+
+    assert list(cache.fragment('calendar', {}, render_counting([], calls))) == []
+    assert len(calls) == 1
+
+
+def test_document_round_trip(tmp_path, sample_data):
+    cache = BuildCache(str(tmp_path / 'cache'))
+    json_file = write_json(str(tmp_path / 'schedule.json'), sample_data)
+    tex_file = tmp_path / 'schedule.tex'
+    tex_file.write_text('tex')
+    (tmp_path / 'schedule.pdf').write_bytes(b'%PDF')
+    key = cache.document_key(json_file)
+
+    assert not cache.restore_document(key, str(tmp_path / 'out.tex'))
+    cache.store_document(key, str(tex_file))
+
+    assert cache.restore_document(key, str(tmp_path / 'out.tex'))
+    assert (tmp_path / 'out.tex').read_text() == 'tex'
+    assert (tmp_path / 'out.pdf').read_bytes() == b'%PDF'
+
+
+def test_document_key_follows_input(tmp_path, sample_data):
+    cache = BuildCache(str(tmp_path / 'cache'))
+    json_file = write_json(str(tmp_path / 'schedule.json'), sample_data)
+    key = cache.document_key(json_file)
+
+    sample_data['events'][0]['room'] = 'elsewhere'
+    write_json(json_file, sample_data)
+
+    assert cache.document_key(json_file) != key
+
+
+def test_document_variant_names_every_enabled_option():
+    window = parse_date_window('2025-01-01', '2025-01-31')
+    assert window is not None
+
+    assert document_variant() == ''
+    assert document_variant(mark_clashes=True) == 'clashes'
+    assert document_variant(True, True, 'lean', window) == f"externalized+clashes+lean+{window.label}"
+
+
+def test_prune_evicts_least_recently_used_fragments(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    for month in range(4):
+        list(cache.fragment('calendar', {'month': month}, lambda: ['x' * 99]))
+    paths = sorted(os.scandir(tmp_path / 'fragments'), key=lambda entry: entry.name)
+    for age, entry in enumerate(paths):
+        os.utime(entry.path, (1000 + age, 1000 + age))
+
+    removed = cache.prune_fragments(max_bytes=250)
+
+    assert removed == 2
+    assert sorted(entry.name for entry in os.scandir(tmp_path / 'fragments')) == [entry.name for entry in paths[2:]]
+
+
+def test_hit_protects_fragment_from_pruning(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    list(cache.fragment('calendar', {'month': 1}, lambda: ['x' * 99]))
+    list(cache.fragment('calendar', {'month': 2}, lambda: ['x' * 99]))
+    for entry in os.scandir(tmp_path / 'fragments'):
+        os.utime(entry.path, (1000, 1000))
+
+    list(BuildCache(str(tmp_path)).fragment('calendar', {'month': 1}, lambda: ['y']))
+    cache.prune_fragments(max_bytes=150)
+
+    assert list(BuildCache(str(tmp_path)).fragment('calendar', {'month': 1}, lambda: ['y'])) == ['x' * 99]
+    assert list(BuildCache(str(tmp_path)).fragment('calendar', {'month': 2}, lambda: ['y'])) == ['y']
+
+
+def test_prune_evicts_least_recently_used_documents_with_their_pdf(tmp_path, sample_data):
+    cache = BuildCache(str(tmp_path / 'cache'))
+    tex_file = tmp_path / 'schedule.tex'
+    tex_file.write_text('x' * 90)
+    (tmp_path / 'schedule.pdf').write_bytes(b'%PDF')
+    keys = [f"{number:064x}" for number in range(3)]
+    for age, key in enumerate(keys):
+        cache.store_document(key, str(tex_file))
+        for ext in ('.tex', '.pdf'):
+            os.utime(tmp_path / 'cache' / 'documents' / f"{key}{ext}", (1000 + age, 1000 + age))
+
+    # Restoring the oldest document makes it the most recently used
+    assert cache.restore_document(keys[0], str(tmp_path / 'out.tex'))
+    removed = cache.prune_documents(max_bytes=200)
+
+    assert removed == 1
+    assert sorted(entry.name for entry in os.scandir(tmp_path / 'cache' / 'documents')) == \
+        sorted(f"{key}{ext}" for key in (keys[0], keys[2]) for ext in ('.tex', '.pdf'))
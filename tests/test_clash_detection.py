@@ -0,0 +1,69 @@
+"""
+Tests for interval overlap and clash detection
+"""
+
+from datetime import datetime, timedelta
+
+from src.clash_detection import IntervalIndex, TimedEvent, find_clashes
+
+
+def _interval(position, start_hour, minutes):
+    start = datetime(2025, 11, 6, start_hour)
+    return TimedEvent(position, start, start + timedelta(minutes=minutes), {})
+
+
+def _pairs(index):
+    return sorted((key, first.position, second.position) for key, first, second in index.overlaps())
+
+
+def test_overlapping_intervals_are_paired():
+    index = IntervalIndex()
+    index.add('A', _interval(0, 9, 120))
+    index.add('A', _interval(1, 10, 60))
+    index.add('A', _interval(2, 10, 30))
+
+    # Equal starts are ordered by end, so the shorter interval comes first
+    assert _pairs(index) == [('A', 0, 1), ('A', 0, 2), ('A', 2, 1)]
+
+
+def test_touching_intervals_do_not_overlap():
+    index = IntervalIndex()
+    index.add('A', _interval(0, 9, 60))
+    index.add('A', _interval(1, 10, 60))
+    index.add('A', _interval(2, 11, 0))
+
+    assert _pairs(index) == []
+
+
+def test_zero_length_events_never_clash():
+    index = IntervalIndex()
+    index.add('A', _interval(0, 9, 0))
+    index.add('A', _interval(1, 9, 0))
+    index.add('A', _interval(2, 9, 30))
+
+    assert _pairs(index) == []
+
+
+def test_groups_are_independent():
+    index = IntervalIndex()
+    index.add('A', _interval(0, 9, 60))
+    index.add('B', _interval(1, 9, 60))
+
+    assert _pairs(index) == []
+
+
+def test_find_clashes_reports_rooms_and_subjects():
+    subjects = {'prog1': {'name': 'Programming', 'default_room': 'IB028'}}
+    events = [
+        {'date': '2025-11-06', 'time': '10:15', 'subject': 'prog1', 'type': 'Lecture'},
+        {'date': '2025-11-06', 'time': '11:00', 'subject': 'other', 'type': 'Lab', 'room': 'IB028'},
+        {'date': '2025-11-06', 'time': '11:30', 'subject': 'prog1', 'type': 'Lecture', 'room': 'E1'},
+        {'date': 'TBA', 'time': '11:00', 'subject': 'prog1', 'type': 'Exam'},
+    ]
+
+    clashes = find_clashes(events, subjects, default_duration=90)
+
+    assert [(clash.kind, clash.key, clash.first.position, clash.second.position) for clash in clashes] == [
+        ('room', 'IB028', 0, 1),
+        ('subject', 'prog1', 0, 2),
+    ]
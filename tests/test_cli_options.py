@@ -0,0 +1,21 @@
+"""
+Tests for command-line option combinations that are rejected up front
+"""
+
+import pytest
+
+from generate_schedule import parse_args
+
+
+@pytest.mark.parametrize('options', [
+    ['--mark-clashes'],
+    ['--pdf-mode', 'lean'],
+])
+def test_draft_renderer_rejects_latex_only_options(options):
+    with pytest.raises(SystemExit):
+        parse_args(['--renderer', 'draft', *options])
+
+
+def test_draft_renderer_accepts_default_options():
+    args = parse_args(['--renderer', 'draft', 'schedule.json'])
+    assert args.renderer == 'draft'
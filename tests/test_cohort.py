@@ -0,0 +1,47 @@
+"""
+Tests that cohort documents match rendering each student's schedule alone
+"""
+
+import io
+
+import pytest
+
+from src.cohort import CohortRenderer
+from src.document_builder import write_latex_document
+
+
+def student_document(data, subject_keys):
+    """The document of a schedule that only contains the given subjects' events."""
+    sink = io.StringIO()
+    write_latex_document(dict(data, events=[event for event in data['events'] if event['subject'] in subject_keys]),
+                         sink)
+    return sink.getvalue()
+
+
+def test_cohort_documents_match_rendering_each_student_alone(synthetic_data):
+    renderer = CohortRenderer(synthetic_data)
+    subject_keys = sorted(synthetic_data['subjects'])
+    selections = [subject_keys[:3], subject_keys[2:5], subject_keys[::2], [subject_keys[-1]], []]
+
+    for selection in selections:
+        sink = io.StringIO()
+        renderer.write_student(selection, sink)
+        assert sink.getvalue() == student_document(synthetic_data, selection)
+
+
+def test_cohort_selection_order_does_not_change_the_document(synthetic_data):
+    renderer = CohortRenderer(synthetic_data)
+    subject_keys = sorted(synthetic_data['subjects'])[:4]
+
+    documents = []
+    for selection in (subject_keys, subject_keys[::-1], subject_keys + subject_keys[:1]):
+        sink = io.StringIO()
+        renderer.write_student(selection, sink)
+        documents.append(sink.getvalue())
+
+    assert documents[0] == documents[1] == documents[2]
+
+
+def test_cohort_rejects_unknown_subjects(sample_data):
+    with pytest.raises(ValueError, match="Unknown subject 'nope'"):
+        CohortRenderer(sample_data).student_index(['nope'])
@@ -0,0 +1,37 @@
+"""
+Tests for the NumPy columnar event backend
+"""
+
+import io
+
+import pytest
+
+from src.data_loader import ScheduleIndex
+from src.document_builder import write_latex_document
+
+pytest.importorskip('numpy')
+
+
+def test_columnar_index_matches_dict_backend(sample_data):
+    by_dict = ScheduleIndex(sample_data, 'dict')
+    by_columns = ScheduleIndex(sample_data, 'columnar')
+
+    assert by_columns.event_count == by_dict.event_count
+    assert by_columns.event_dates == by_dict.event_dates
+    assert dict(by_columns.events_by_month) == dict(by_dict.events_by_month)
+    assert by_columns.exam_events == by_dict.exam_events
+
+
+def test_columnar_document_is_byte_identical(sample_data):
+    documents = []
+    for backend in ('dict', 'columnar'):
+        sink = io.StringIO()
+        write_latex_document(sample_data, sink, backend=backend)
+        documents.append(sink.getvalue())
+
+    assert documents[0] == documents[1]
+
+
+def test_unknown_backend_is_rejected(sample_data):
+    with pytest.raises(ValueError):
+        ScheduleIndex(sample_data, 'sparse')
@@ -0,0 +1,67 @@
+"""
+Tests for pdflatex progress tracking
+"""
+
+from src.compile_progress import PageTracker, estimate_pages, expected_pages
+
+
+def track(chunks, expected=3):
+    updates = []
+    tracker = PageTracker('schedule.tex', expected, updates.append)
+    for chunk in chunks:
+        tracker.feed(chunk)
+    return tracker, updates
+
+
+def test_pages_are_counted_in_order():
+    tracker, updates = track([b'(./schedule.tex [1{/pdftex.map}] [2] [3] )'])
+
+    assert tracker.page == 3
+    assert [progress.page for progress in updates] == [1, 2, 3]
+    assert not any(progress.done for progress in updates)
+
+
+def test_markers_split_across_chunks():
+    tracker, updates = track([b'text [', b'1] more [1', b'0', b'] [2', b'] [', b'3', b'] done'], expected=5)
+
+    assert [progress.page for progress in updates] == [1, 2, 3]
+    assert tracker.page == 3
+
+
+def test_markers_wrapped_across_lines():
+    # pdflatex wraps its terminal output at a fixed width
+    tracker, _ = track([b'[1] [\n2] [3\r\n] [4\n', b']'], expected=4)
+
+    assert tracker.page == 4
+
+
+def test_out_of_order_numbers_are_ignored():
+    tracker, updates = track([b'[1] Overfull \\hbox [12] [5] [2] [2] [3]'])
+
+    assert [progress.page for progress in updates] == [1, 2, 3]
+
+
+def test_low_estimate_keeps_the_bar_below_done():
+    tracker, updates = track([b'[1] [2] [3] [4] '], expected=2)
+
+    assert tracker.expected >= tracker.page == 4
+    assert all(progress.fraction < 1 for progress in updates)
+
+
+def test_finish_reports_completion():
+    tracker, updates = track([b'[1] [2] '], expected=6)
+    tracker.finish()
+
+    final = updates[-1]
+    assert final.done
+    assert final.fraction == 1.0
+    assert final.eta == 0.0
+    assert final.expected_pages == 2
+
+
+def test_page_estimate_from_last_log(tmp_path):
+    tex_file = tmp_path / 'schedule.tex'
+    tex_file.write_text('')
+
+    assert estimate_pages(str(tex_file), 'Output written on schedule.pdf (7 pages, 1234 bytes).') == 7
+    assert expected_pages(0, []) == 1
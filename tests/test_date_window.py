@@ -0,0 +1,83 @@
+"""
+Tests for date windows
+"""
+
+from datetime import date
+
+import pytest
+
+from src.data_loader import ScheduleIndex
+from src.date_window import DateWindow, filter_events, parse_date_window, window_index
+
+SCHEDULE_INFO = {'start_date': '2025-11-01', 'end_date': '2026-01-31'}
+
+
+def test_window_is_clamped_to_schedule_period():
+    window = DateWindow(date(2025, 10, 1), date(2025, 11, 15))
+
+    assert window.clamp(SCHEDULE_INFO) == (date(2025, 11, 1), date(2025, 11, 15))
+
+
+def test_open_sides_take_the_schedule_bounds():
+    assert DateWindow(None, date(2025, 12, 24)).clamp(SCHEDULE_INFO) == (date(2025, 11, 1), date(2025, 12, 24))
+    assert DateWindow(date(2026, 1, 5), None).clamp(SCHEDULE_INFO) == (date(2026, 1, 5), date(2026, 1, 31))
+
+
+def test_window_outside_schedule_period_is_an_error():
+    with pytest.raises(ValueError, match='outside the schedule period'):
+        DateWindow(date(2026, 3, 1), date(2026, 3, 31)).clamp(SCHEDULE_INFO)
+
+
+def test_next_weeks_counts_from_start_or_today():
+    assert parse_date_window(next_weeks=2, today=date(2025, 12, 1)) == DateWindow(date(2025, 12, 1), date(2025, 12, 14))
+    assert parse_date_window('2025-11-10', next_weeks=1) == DateWindow(date(2025, 11, 10), date(2025, 11, 16))
+
+
+@pytest.mark.parametrize('options', [
+    {'from_date': '2025-11-10', 'to_date': '2025-11-01'},
+    {'to_date': '2025-11-30', 'next_weeks': 2},
+    {'next_weeks': 0},
+    {'from_date': '10/11/2025'},
+])
+def test_invalid_window_options(options):
+    with pytest.raises(ValueError):
+        parse_date_window(**options)
+
+
+def test_no_options_means_no_window():
+    assert parse_date_window() is None
+
+
+def test_filter_events_keeps_unpadded_dates():
+    window = parse_date_window('2025-01-10', '2025-02-01')
+    events = [{'date': value} for value in
+              ('2025-1-15', '2025-01-15', '2025-1-5', '2025-2-1', '2025-02-02', 'TBA', '', '2025-13-1', '2025-01-10')]
+
+    kept = [event['date'] for event in filter_events(events, window)]
+
+    assert kept == ['2025-1-15', '2025-01-15', '2025-2-1', '2025-01-10']
+
+
+def test_window_index_clamps_period_and_events(sample_data):
+    index = ScheduleIndex(sample_data)
+    window = parse_date_window('2025-10-01', '2025-11-20')
+
+    windowed = window_index(index, window)
+
+    assert windowed.schedule_info['start_date'] == '2025-11-01'
+    assert windowed.schedule_info['end_date'] == '2025-11-20'
+    assert [(month['year'], month['month']) for month in windowed.months] == [(2025, 11)]
+    dates = [event.date.date() for events in windowed.events_by_month.values() for event in events]
+    assert dates and all(date(2025, 11, 1) <= day <= date(2025, 11, 20) for day in dates)
+    assert all(date(2025, 11, 1) <= day <= date(2025, 11, 20) for day in windowed.event_dates)
+
+
+def test_filtering_while_streaming_matches_windowing_the_index(synthetic_data):
+    window = parse_date_window('2025-03-03', '2025-05-20')
+    full = window_index(ScheduleIndex(synthetic_data), window)
+    streamed = window_index(ScheduleIndex(dict(synthetic_data, events=filter_events(synthetic_data['events'], window))),
+                            window)
+
+    assert dict(streamed.events_by_month) == dict(full.events_by_month)
+    assert streamed.event_dates == full.event_dates
+    assert streamed.exam_events == full.exam_events
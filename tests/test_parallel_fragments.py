@@ -0,0 +1,48 @@
+"""
+Tests that parallel fragment rendering produces the serial document byte for byte
+and only renders fragments the cache misses
+"""
+
+import io
+import os
+
+from src import config
+from src.build_cache import BuildCache
+from src.calendar_generator import calendar_payload
+from src.data_loader import ScheduleIndex
+from src.document_builder import write_schedule_index
+from src.parallel_fragments import render_fragments
+from tests.conftest import render_index
+
+
+def test_parallel_fragments_match_serial_rendering(monkeypatch, synthetic_data):
+    index = ScheduleIndex(synthetic_data)
+    serial = render_index(index)
+
+    monkeypatch.setattr(config, 'PARALLEL_FRAGMENTS_MIN_EVENTS', 1)
+    monkeypatch.setattr(config, 'PARALLEL_FRAGMENT_WORKERS', 2)
+
+    assert render_index(index) == serial
+
+
+def test_parallel_fragments_only_render_cache_misses(monkeypatch, tmp_path, synthetic_data):
+    index = ScheduleIndex(synthetic_data)
+    serial = render_index(index)
+    monkeypatch.setattr(config, 'PARALLEL_FRAGMENTS_MIN_EVENTS', 1)
+    monkeypatch.setattr(config, 'PARALLEL_FRAGMENT_WORKERS', 2)
+
+    cache = BuildCache(str(tmp_path))
+    sink = io.StringIO()
+    write_schedule_index(index, sink, cache)
+    assert sink.getvalue() == serial
+
+    # Every fragment is cached now, so no pool is started
+    assert render_fragments(index, tables=True, calendars=True, cache=cache) == {}
+
+    month = index.months[0]
+    month_key = (month['year'], month['month'])
+    payload = calendar_payload(0, month, index.event_dates_by_month.get(month_key, []))
+    os.remove(cache._fragment_path('calendar', payload))
+    pending = render_fragments(index, tables=True, calendars=True, cache=cache)
+    assert list(pending) == [('calendar', month_key)]
+    pending['calendar', month_key].result()
@@ -0,0 +1,101 @@
+"""
+Tests for the parsed-schedule cache
+"""
+
+import os
+import struct
+
+import pytest
+
+from src import config
+from src.data_loader import ScheduleIndex
+from src.date_window import parse_date_window
+from src.parsed_cache import load_schedule_index, parsed_cache_path, read_parsed_cache
+from tests.conftest import render_index, write_json
+
+
+@pytest.fixture
+def cached_schedule(tmp_path, monkeypatch, synthetic_data):
+    """A schedule file large enough to be cached, with the cache in a private directory."""
+    monkeypatch.setattr(config, 'PARSED_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(config, 'PARSED_CACHE_MIN_BYTES', 0)
+    return write_json(str(tmp_path / 'schedule.json'), synthetic_data)
+
+
+def test_cache_is_kept_outside_the_input_directory(cached_schedule, tmp_path):
+    load_schedule_index(cached_schedule)
+
+    assert os.path.dirname(parsed_cache_path(cached_schedule)) == str(tmp_path / 'cache')
+    assert os.path.exists(parsed_cache_path(cached_schedule))
+    assert sorted(os.listdir(tmp_path)) == ['cache', 'schedule.json']
+
+
+def test_cache_hit_matches_parsing(cached_schedule, synthetic_data):
+    load_schedule_index(cached_schedule)
+
+    cached = read_parsed_cache(cached_schedule)
+
+    assert cached is not None
+    assert render_index(cached) == render_index(ScheduleIndex(synthetic_data))
+
+
+def test_windowed_cache_hit_matches_parsing(cached_schedule):
+    window = parse_date_window('2025-02-10', '2025-04-03')
+    load_schedule_index(cached_schedule)
+
+    cached = read_parsed_cache(cached_schedule, window)
+
+    assert cached is not None
+    assert render_index(cached) == render_index(load_schedule_index(cached_schedule, use_cache=False, window=window))
+
+
+def test_modified_time_makes_cache_stale(cached_schedule):
+    load_schedule_index(cached_schedule)
+    stat = os.stat(cached_schedule)
+    os.utime(cached_schedule, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert read_parsed_cache(cached_schedule) is None
+
+
+def test_same_size_edit_with_restored_time_is_caught_by_hash(cached_schedule):
+    load_schedule_index(cached_schedule)
+    stat = os.stat(cached_schedule)
+    with open(cached_schedule, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(cached_schedule, 'w', encoding='utf-8') as f:
+        f.write(text.replace('Synthetic Schedule', 'Synthetic Schedulf'))
+    os.utime(cached_schedule, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert os.path.getsize(cached_schedule) == stat.st_size
+    assert read_parsed_cache(cached_schedule) is None
+    assert load_schedule_index(cached_schedule).schedule_info['title'] == 'Synthetic Schedulf'
+
+
+def test_stale_cache_is_rebuilt(cached_schedule, synthetic_data):
+    load_schedule_index(cached_schedule)
+    synthetic_data['events'] = synthetic_data['events'][:100]
+    write_json(cached_schedule, synthetic_data)
+
+    rebuilt = load_schedule_index(cached_schedule)
+
+    assert rebuilt.event_count == 100
+    assert read_parsed_cache(cached_schedule) is not None
+
+
+def test_damaged_cache_is_ignored(cached_schedule):
+    load_schedule_index(cached_schedule)
+    with open(parsed_cache_path(cached_schedule), 'r+b') as f:
+        f.seek(12)
+        f.write(b'\xff\xff\xff')
+
+    assert read_parsed_cache(cached_schedule) is None
+
+
+def test_pickled_cache_is_never_unpickled(cached_schedule):
+    # A pickle that would run code if it were loaded
+    payload = b"cos\nsystem\n(S'exit 1'\ntR."
+    os.makedirs(os.path.dirname(parsed_cache_path(cached_schedule)), exist_ok=True)
+    with open(parsed_cache_path(cached_schedule), 'wb') as f:
+        f.write(struct.pack('>Q', len(payload)) + payload)
+
+    assert read_parsed_cache(cached_schedule) is None
@@ -0,0 +1,44 @@
+"""
+Tests for the render service's HTTP request validation
+"""
+
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.render_service import RenderRequestHandler
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RenderRequestHandler)
+    # Requests rejected during validation never reach the render service
+    httpd.service = None  # type: ignore[attr-defined]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _post(server, headers):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    try:
+        connection.putrequest('POST', '/render')
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders()
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize('length', ['abc', '-1', '0'])
+def test_invalid_content_length_is_a_bad_request(server, length):
+    status, body = _post(server, {'Content-Length': length})
+    assert status == 400
+    assert 'error' in body
@@ -0,0 +1,39 @@
+"""
+Tests that split compilation renders the document once and writes the same .tex file
+"""
+
+import os
+import re
+
+from src import split_compile
+from src.data_loader import ScheduleIndex
+from src.document_builder import document_begin, document_end
+from tests.conftest import render_index
+
+
+def test_split_writes_full_document_and_parts_in_one_render(monkeypatch, tmp_path, sample_data):
+    index = ScheduleIndex(sample_data)
+    calls = []
+    document_sections = split_compile.document_sections
+    monkeypatch.setattr(split_compile, 'document_sections',
+                        lambda *args: calls.append(args) or document_sections(*args))
+
+    output_file = str(tmp_path / 'schedule.tex')
+    tex_files = split_compile.write_index_split(index, output_file, jobs=2)
+
+    assert len(calls) == 1
+    with open(output_file, 'r', encoding='utf-8') as f:
+        full = f.read()
+    assert full == render_index(index)
+
+    # The part bodies, without their preamble and counter line, make up the full body
+    begin, end = '\n'.join(document_begin()), '\n'.join(document_end())
+    bodies = []
+    for tex_file in tex_files:
+        assert os.path.dirname(tex_file).endswith(os.path.join('.schedule.build', 'parts'))
+        with open(tex_file, 'r', encoding='utf-8') as f:
+            part = f.read()
+        body = part.split(begin + '\n', 1)[1].rsplit('\n' + end, 1)[0]
+        bodies.append(re.sub(r'^\\setcounter\{done\}\{\d+\}\n', '', body))
+    assert len(tex_files) > 1
+    assert full.split(begin + '\n', 1)[1].rsplit('\n' + end, 1)[0] == '\n'.join(bodies)
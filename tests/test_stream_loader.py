@@ -0,0 +1,119 @@
+"""
+Tests for the streaming JSON and JSON Lines loader
+"""
+
+import json
+
+import pytest
+
+import src.stream_loader as stream_loader
+from src.stream_loader import load_schedule_stream
+from tests.conftest import write_json
+
+
+def test_stream_matches_json_load(tmp_path, sample_data):
+    json_file = write_json(str(tmp_path / 'schedule.json'), sample_data)
+
+    header, events = load_schedule_stream(json_file)
+
+    assert header == {'schedule_info': sample_data['schedule_info'], 'subjects': sample_data['subjects']}
+    assert list(events) == sample_data['events']
+
+
+def test_json_lines_input(tmp_path, sample_data):
+    jsonl_file = tmp_path / 'schedule.jsonl'
+    records = [{'schedule_info': sample_data['schedule_info'], 'subjects': sample_data['subjects']}]
+    jsonl_file.write_text('\n'.join(json.dumps(record) for record in records + sample_data['events']) + '\n')
+
+    _, events = load_schedule_stream(str(jsonl_file))
+
+    assert list(events) == sample_data['events']
+
+
+def test_missing_file():
+    with pytest.raises(FileNotFoundError):
+        load_schedule_stream('does-not-exist.json')
+
+
+def test_missing_header_fields(tmp_path, sample_data):
+    del sample_data['subjects']
+    json_file = write_json(str(tmp_path / 'schedule.json'), sample_data)
+
+    with pytest.raises(ValueError, match='subjects'):
+        load_schedule_stream(json_file)
+
+
+def test_invalid_event_is_reported_while_iterating(tmp_path, sample_data):
+    del sample_data['events'][3]['subject']
+    json_file = write_json(str(tmp_path / 'schedule.json'), sample_data)
+
+    _, events = load_schedule_stream(json_file)
+    with pytest.raises(ValueError, match='Event #4'):
+        list(events)
+
+
+@pytest.mark.parametrize('chunk_size', [5, 64, 1 << 20])
+def test_decode_error_position_is_counted_from_file_start(tmp_path, sample_data, monkeypatch, chunk_size):
+    text = json.dumps(sample_data, indent=2)
+    position = text.rindex('},')
+    broken = text[:position + 1] + ' x' + text[position + 2:]
+    json_file = tmp_path / 'schedule.json'
+    json_file.write_text(broken)
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(broken)
+    # The reader binds its chunk size when the module is imported
+    monkeypatch.setattr(stream_loader._JsonStreamReader.__init__, '__defaults__', (chunk_size,))
+
+    _, events = load_schedule_stream(str(json_file))
+    with pytest.raises(json.JSONDecodeError) as error:
+        list(events)
+
+    assert (error.value.lineno, error.value.colno, error.value.pos) == \
+        (expected.value.lineno, expected.value.colno, expected.value.pos)
+
+
+def test_json_lines_error_names_the_line(tmp_path, sample_data):
+    jsonl_file = tmp_path / 'schedule.jsonl'
+    header = {'schedule_info': sample_data['schedule_info'], 'subjects': sample_data['subjects']}
+    jsonl_file.write_text(json.dumps(header) + '\n' + json.dumps(sample_data['events'][0]) + '\n{"date": \n')
+
+    _, events = load_schedule_stream(str(jsonl_file))
+    with pytest.raises(json.JSONDecodeError, match='line 3'):
+        list(events)
+
+
+def test_trailing_data_after_the_object_is_rejected(tmp_path, sample_data):
+    json_file = tmp_path / 'schedule.json'
+    json_file.write_text(json.dumps(sample_data) + '\n{}\n')
+
+    _, events = load_schedule_stream(str(json_file))
+    with pytest.raises(json.JSONDecodeError, match='Extra data'):
+        list(events)
+
+
+def test_header_after_events_is_read_in_the_same_pass(tmp_path, sample_data):
+    reordered = {'events': sample_data['events'], 'subjects': sample_data['subjects'],
+                 'schedule_info': sample_data['schedule_info']}
+    json_file = write_json(str(tmp_path / 'schedule.json'), reordered)
+
+    header, events = load_schedule_stream(json_file)
+
+    assert header == {'schedule_info': sample_data['schedule_info'], 'subjects': sample_data['subjects']}
+    assert list(events) == sample_data['events']
+
+
+def test_large_value_buffer_grows_geometrically(tmp_path, sample_data, monkeypatch):
+    sample_data['schedule_info']['title'] = 'x' * (1 << 16)
+    json_file = write_json(str(tmp_path / 'schedule.json'), sample_data)
+    monkeypatch.setattr(stream_loader._JsonStreamReader.__init__, '__defaults__', (16,))
+    fills = []
+    fill = stream_loader._JsonStreamReader._fill
+    monkeypatch.setattr(stream_loader._JsonStreamReader, '_fill',
+                        lambda self, *args: fills.append(args) or fill(self, *args))
+
+    header, events = load_schedule_stream(json_file)
+
+    assert header['schedule_info']['title'] == sample_data['schedule_info']['title']
+    assert list(events) == sample_data['events']
+    # A fixed chunk per retry would need thousands of fills for the title alone
+    assert len(fills) < 50
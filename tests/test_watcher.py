@@ -0,0 +1,41 @@
+"""
+Tests for watch mode's change detection and its handling of failed builds
+"""
+
+import pytest
+
+from src import watcher
+from src.data_loader import ScheduleIndex
+from tests.conftest import SAMPLE_SCHEDULE
+
+
+def test_diff_reports_only_the_changed_month(sample_data):
+    old = ScheduleIndex(sample_data)
+    event = next(event for event in sample_data['events'] if event['date'] != 'TBA')
+    event['room'] = 'Moved'
+    new = ScheduleIndex(sample_data)
+
+    month_key = next(key for key, events in new.events_by_month.items()
+                     if any(record.room == 'Moved' for record in events))
+    assert watcher.diff_schedule_indexes(old, new) == {'tables': [month_key], 'calendars': []}
+
+
+@pytest.mark.parametrize('failure', [OSError("pdflatex not found"), None])
+def test_failed_build_keeps_watching(monkeypatch, tmp_path, capsys, failure):
+    def compile_pdf(*args, **kwargs):
+        if failure is not None:
+            raise failure
+        return False
+
+    def stop(seconds):
+        # The first poll after the build stops the watcher
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(watcher, 'compile_pdf', compile_pdf)
+    monkeypatch.setattr(watcher.time, 'sleep', stop)
+
+    watcher.watch_schedule(SAMPLE_SCHEDULE, str(tmp_path / 'schedule.tex'))
+
+    output = capsys.readouterr().out
+    assert "Build failed, waiting for the next save" in output
+    assert "Stopped watching" in output